@@ -7,6 +7,7 @@ from appauto.manager.utils_manager.format_output import format_time
 from appauto.manager.notify_manager import LarkClient
 from appauto.manager.config_manager import LoggingConfig, AllureReport
 from appauto.manager.utils_manager.network_utils import NetworkUtils
+from appauto.manager.connection_manager.circuit_breaker import CircuitBreaker, Deadline
 from time import sleep
 
 logger = LoggingConfig.get_logger()
@@ -27,6 +28,22 @@ def pytest_addoption(parser):
     parser.addoption("--interval", action="store", default=0, help="Delay in seconds between test cases")
     parser.addoption("--topic", action="store", default=None, help="The test topic")
     parser.addoption("--lark_user", action="store", default=None, help="Lark user")
+    parser.addoption(
+        "--circuit_breaker", action="store_true", help="Fail fast on a model that keeps failing (see CircuitBreaker)"
+    )
+    parser.addoption("--deadline", action="store", default=0, help="Time budget (s) of each test case, 0 for none")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """指定 --deadline 时, 用例中的请求(包括线程池中的)共用该时间预算, 用完后剩下的请求直接失败"""
+    seconds = float(item.config.getoption("--deadline", default=0) or 0)
+    if not seconds:
+        yield
+        return
+
+    with Deadline.within(seconds):
+        yield
 
 
 @pytest.hookimpl(hookwrapper=True)
@@ -111,6 +128,9 @@ def gen_report_and_send_lark(
 def pytest_configure(config):
     config.test_start_time = time()
 
+    if config.getoption("--circuit_breaker", default=False):
+        CircuitBreaker.configure(enabled=True)
+
 
 def pytest_terminal_summary(terminalreporter: TerminalReporter, exitstatus, config):
     """统计用例执行结果"""
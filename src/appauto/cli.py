@@ -40,6 +40,28 @@ def evalscope():
     pass
 
 
+@bench.group(name="amaas")
+@click.option(
+    "--dashboard-interval", type=float, default=0, show_default=True, help="后台采样 dashboard 的间隔(S), 0 不采样"
+)
+@click.option("--dashboard-output", type=str, default=None, help="dashboard 采样结果文件, 默认写到当前目录")
+@click.pass_context
+def amaas_bench(ctx, dashboard_interval, dashboard_output):
+    """直接通过 AMaaS API 跑的 benchmark, 比如冷启动耗时"""
+    ctx.obj = dict(dashboard_interval=dashboard_interval, dashboard_output=dashboard_output)
+
+
+def dashboard_sampler(amaas):
+    """按 bench amaas --dashboard-interval 在压测期间后台采样 dashboard, 未指定时什么都不做"""
+    from contextlib import nullcontext
+    from appauto.tool.bench.dashboard_sampler import DashboardSampler
+
+    obj = click.get_current_context().obj or {}
+    if not obj.get("dashboard_interval"):
+        return nullcontext()
+    return DashboardSampler(amaas, obj["dashboard_interval"], obj["dashboard_output"])
+
+
 @cli.command(
     context_settings=dict(ignore_unknown_options=True, allow_extra_args=True, help_option_names=["-h", "--help"])
 )
@@ -522,6 +544,235 @@ def eval(
             raise e
 
 
+@amaas_bench.command(name="cold-start")
+@click.option("--ip", default="192.168.110.15", show_default=True, help="服务器 IP")
+@click.option("--port", default=10001, show_default=True, help="AMaaS API 端口")
+@click.option("--api-user", default="admin", show_default=True, help="AMaaS 用户名")
+@click.option("--api-passwd", default="123456", show_default=True, help="AMaaS 密码")
+@click.option("--model", type=str, required=True, help="模型名称, 多个用逗号分隔, 比如: Qwen3-8B,Qwen3-32B")
+@click.option("--tp", type=str, default="1", show_default=True, help="几卡拉起模型, 多个用空格分隔, 比如: 1 2 4")
+@click.option("--repeat", type=int, default=1, show_default=True, help="每个 model x tp 重复次数")
+@click.option("--interval", type=float, default=0.5, show_default=True, help="状态轮询间隔(S)")
+@click.option("--launch-timeout", type=int, default=900, show_default=True, help="模型拉起超时时间(S)")
+@click.option("--version", "version_", type=str, default=None, help="写入结果的版本号, 比如: v3.3.1")
+@click.option("--output", type=str, default=None, help="结果文件(jsonl), 默认写到当前目录")
+def cold_start(ip, port, api_user, api_passwd, model, tp, repeat, interval, launch_timeout, version_, output):
+    """
+    冷启动耗时: run -> 各状态 -> running -> 首 token, 按阶段输出耗时
+    """
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.tool.bench.cold_start import ColdStartBench
+
+    amaas = AMaaS(ip, port, api_user, api_passwd)
+    names = model.split(",")
+    model_stores = [m_s for m_s in amaas.init_model_store.llm if m_s.name in names]
+    assert model_stores, f"model not found: {model}"
+
+    with dashboard_sampler(amaas):
+        results = ColdStartBench.sweep(
+            amaas,
+            model_stores,
+            [int(t) for t in tp.split()],
+            repeat,
+            output,
+            version=version_,
+            interval_s=interval,
+            timeout_s=launch_timeout,
+        )
+    for r in results:
+        print(f"{r.model} tp={r.tp}: {r.error or r.phases()}")
+
+
+@amaas_bench.command(name="replica-scaling")
+@click.option("--ip", default="192.168.110.15", show_default=True, help="服务器 IP")
+@click.option("--port", default=10001, show_default=True, help="AMaaS API 端口")
+@click.option("--api-user", default="admin", show_default=True, help="AMaaS 用户名")
+@click.option("--api-passwd", default="123456", show_default=True, help="AMaaS 密码")
+@click.option("--model", type=str, required=True, help="运行中的 LLM 模型名称")
+@click.option("--max-replicas", type=int, required=True, help="最多扩到几个副本")
+@click.option("--rate", type=float, default=4, show_default=True, help="每一步的请求速率(req/s)")
+@click.option("--duration", type=float, default=60, show_default=True, help="每一步的压测时长(S)")
+@click.option("--tp", type=int, default=1, show_default=True, help="新副本几卡拉起")
+@click.option("--scale-rate", is_flag=True, default=False, help="速率随副本数线性增加(--rate 为每副本速率)")
+@click.option("--keep-replicas", is_flag=True, default=False, help="结束后保留新增的副本")
+@click.option("--output", type=str, default=None, help="结果文件(jsonl), 默认写到当前目录")
+def replica_scaling(
+    ip, port, api_user, api_passwd, model, max_replicas, rate, duration, tp, scale_rate, keep_replicas, output
+):
+    """
+    副本扩容收益: 逐个增加副本, 每一步记录扩容耗时、吞吐、扩容效率和延迟
+    """
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.tool.bench.replica_scaling import ReplicaScalingBench
+
+    amaas = AMaaS(ip, port, api_user, api_passwd)
+    llm_model = amaas.model.llm.get(name=model)
+
+    with dashboard_sampler(amaas):
+        steps = ReplicaScalingBench(
+            amaas,
+            llm_model,
+            max_replicas,
+            rate,
+            duration_s=duration,
+            tp=tp,
+            keep_replicas=keep_replicas,
+            scale_rate=scale_rate,
+            output=output,
+        ).run()
+    for s in steps:
+        print(
+            f"replicas={s['replicas']}: throughput={s['throughput_rps']} req/s, efficiency={s['efficiency']}, "
+            f"p99={s['latency']['p99']}"
+        )
+
+
+@amaas_bench.command(name="multi-tenant")
+@click.option("--ip", default="192.168.110.15", show_default=True, help="服务器 IP")
+@click.option("--port", default=10001, show_default=True, help="AMaaS API 端口")
+@click.option("--api-user", default="admin", show_default=True, help="AMaaS 用户名")
+@click.option("--api-passwd", default="123456", show_default=True, help="AMaaS 密码")
+@click.option("--model", type=str, required=True, help="运行中的 LLM 模型名称")
+@click.option("--tenants", type=int, default=4, show_default=True, help="租户数量")
+@click.option("--weights", type=str, default=None, help="每个租户的权重, 空格分隔, 比如: 1 1 2 4; 默认都为 1")
+@click.option("--rate", type=float, default=8, show_default=True, help="所有租户的总请求速率(req/s)")
+@click.option("--duration", type=float, default=60, show_default=True, help="压测时长(S)")
+@click.option("--auth", type=click.Choice(["api_key", "user"]), default="api_key", show_default=True, help="认证方式")
+@click.option("--keys-only", is_flag=True, default=False, help="不创建用户, 只用当前用户创建多个密钥")
+@click.option("--output", type=str, default=None, help="结果文件(jsonl), 默认写到当前目录")
+def multi_tenant(ip, port, api_user, api_passwd, model, tenants, weights, rate, duration, auth, keys_only, output):
+    """
+    多租户压测: 创建租户用户 + 密钥, 按权重并发压测, 输出每个租户的吞吐、延迟、429 比例和公平性指数
+    """
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.tool.bench.multi_tenant import MultiTenantBench, TenantPool
+
+    amaas = AMaaS(ip, port, api_user, api_passwd)
+    weights = [float(w) for w in weights.split()] if weights else None
+
+    with dashboard_sampler(amaas), TenantPool(amaas, tenants, weights, create_users=not keys_only) as pool:
+        result = MultiTenantBench(amaas, model, pool, rate, duration_s=duration, auth=auth, output=output).run()
+
+    for name, row in result["per_tenant"].items():
+        print(
+            f"{name}: weight={row['weight']}, throughput={row['throughput_rps']} req/s, "
+            f"429={row['rate_429']}, queued={row['queued_rate']}, p99={row['latency']['p99']}"
+        )
+    print(f"fairness(jain): {result['fairness']}")
+
+
+@amaas_bench.command(name="hicache-sweep")
+@click.option("--ip", default="192.168.110.15", show_default=True, help="服务器 IP")
+@click.option("--port", default=10001, show_default=True, help="AMaaS API 端口")
+@click.option("--api-user", default="admin", show_default=True, help="AMaaS 用户名")
+@click.option("--api-passwd", default="123456", show_default=True, help="AMaaS 密码")
+@click.option("--model", type=str, required=True, help="LLM 模型名称(未运行)")
+@click.option("--tp", type=int, default=1, show_default=True, help="几卡拉起模型")
+@click.option("--worker-id", type=int, default=None, help="在哪个 worker 上拉起, 默认选择空闲 GPU 最多的 worker")
+@click.option("--max-total-tokens", type=int, default=50000, show_default=True, help="max_total_tokens")
+@click.option("--sizes", type=str, default=None, help="cache_storage 列表, 空格分隔; 默认为最小值 x --multipliers")
+@click.option("--multipliers", type=str, default="1 2 4 8", show_default=True, help="最小 cache_storage 的倍数")
+@click.option("--sessions", type=int, default=16, show_default=True, help="会话数")
+@click.option("--turns", type=int, default=4, show_default=True, help="每个会话的轮数")
+@click.option("--prefix-chars", type=int, default=8000, show_default=True, help="共享前缀(系统提示)字符数")
+@click.option("--passes", type=int, default=2, show_default=True, help="负载重复几遍")
+@click.option("--concurrency", type=int, default=8, show_default=True, help="同时进行的会话数")
+@click.option("--output", type=str, default=None, help="结果文件(jsonl), 默认写到当前目录")
+def hicache_sweep(
+    ip,
+    port,
+    api_user,
+    api_passwd,
+    model,
+    tp,
+    worker_id,
+    max_total_tokens,
+    sizes,
+    multipliers,
+    sessions,
+    turns,
+    prefix_chars,
+    passes,
+    concurrency,
+    output,
+):
+    """
+    HiCache 容量扫描: 以不同 cache_storage 拉起模型, 跑共享前缀多轮对话, 输出命中率、TTFT 和吞吐随容量的变化
+    """
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.tool.bench.hicache_sweep import HiCacheSweep, SharedPrefixWorkload
+
+    amaas = AMaaS(ip, port, api_user, api_passwd)
+    model_stores = [m_s for m_s in amaas.init_model_store.llm if m_s.name == model]
+    assert model_stores, f"model not found: {model}"
+
+    workload = SharedPrefixWorkload(sessions, turns, prefix_chars, concurrency=concurrency)
+    sweep = HiCacheSweep(
+        amaas,
+        model_stores[0],
+        tp,
+        sizes=[int(s) for s in sizes.split()] if sizes else None,
+        multipliers=[float(m) for m in multipliers.split()],
+        worker_id=worker_id,
+        max_total_tokens=max_total_tokens,
+        workload=workload,
+        passes=passes,
+        output=output,
+    )
+    with dashboard_sampler(amaas):
+        sweep.run()
+    for row in sweep.curve():
+        print(
+            f"cache_storage={row['cache_storage']}: hit rate={row['cache_hit_rate']}, "
+            f"ttft p50={row['ttft_p50']}, throughput={row['throughput_rps']} req/s"
+        )
+
+
+@amaas_bench.command(name="colocation")
+@click.option("--ip", default="192.168.110.15", show_default=True, help="服务器 IP")
+@click.option("--port", default=10001, show_default=True, help="AMaaS API 端口")
+@click.option("--api-user", default="admin", show_default=True, help="AMaaS 用户名")
+@click.option("--api-passwd", default="123456", show_default=True, help="AMaaS 密码")
+@click.option("--model", type=str, required=True, help="LLM 模型名称(未运行), 至少 2 个, 逗号分隔")
+@click.option("--worker-id", type=int, default=None, help="所有模型拉起在该 worker 上, 默认选择空闲 GPU 最多的 worker")
+@click.option("--tp", type=int, default=1, show_default=True, help="几卡拉起模型")
+@click.option("--rate", type=float, default=2, show_default=True, help="每个模型的请求速率(req/s)")
+@click.option("--duration", type=float, default=60, show_default=True, help="每个阶段的压测时长(S)")
+@click.option("--tolerance", type=float, default=1.5, show_default=True, help="同时压测时允许的 p99 延迟比例")
+@click.option("--output", type=str, default=None, help="结果文件(jsonl), 默认写到当前目录")
+def colocation(ip, port, api_user, api_passwd, model, worker_id, tp, rate, duration, tolerance, output):
+    """
+    多模型同节点干扰: 单独运行 / 同节点常驻 / 同时压测, 输出每个模型的延迟、吞吐相对单独运行的比例
+    """
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.tool.bench.colocation import ColocationBench
+
+    amaas = AMaaS(ip, port, api_user, api_passwd)
+    names = model.split(",")
+    model_stores = [m_s for m_s in amaas.init_model_store.llm if m_s.name in names]
+    assert len(model_stores) == len(names), f"model not found: {model}"
+
+    with dashboard_sampler(amaas):
+        result = ColocationBench(
+            amaas,
+            model_stores,
+            worker_id,
+            tp,
+            rate,
+            duration_s=duration,
+            tolerance=tolerance,
+            output=output,
+        ).run()
+
+    for name, rows in result["interference"].items():
+        for phase, row in rows.items():
+            print(
+                f"{name} {phase}: latency p99 x{row['latency_p99']}, ttft p50 x{row['ttft_p50']}, "
+                f"throughput x{row['throughput']}"
+            )
+    print(f"compatible: {result['compatible']}, errors: {result['errors']}")
+
+
 def parse_extra_args(args: List[str]) -> Dict[str, str | bool]:
     """解析额外参数
     支持以下格式：
@@ -1,12 +1,14 @@
 from uuid import uuid4
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .base_component import BaseComponent
-from .models import Worker, ModelStore, Model
+from .models import Worker, ModelStore, Model, InstanceIndex, TopologySnapshot
+from .models.base import BaseModelStore
 from .scene import Scene
 from .api_key import APIKey
 from .dashboard import DashBoard
 from .users import AMaaSUser
 from .license import License
+from .records import ModelRecord, WorkerRecord
 from ....config_manager.config_logging import LoggingConfig
 from ....utils_manager.custom_list import CustomList
 
@@ -19,6 +21,16 @@ class AMaaS(BaseComponent):
     def __str__(self):
         return self.mgt_ip
 
+    def enable_cache(self, ttls: Dict[str, float] = None):
+        """
+        开启控制面 GET 缓存(init_model_store / model / workers / scene / api_keys 等).
+        ttls: 覆盖默认 TTL, key 为 url 模板, 比如 {"/v1/kllm/models": 10}
+        """
+        self.response_cache.enable(ttls)
+
+    def disable_cache(self):
+        self.response_cache.disable()
+
     def license(self) -> License:
         """许可证管理"""
         res = self.get("get_self", url_map=License.GET_URL_MAP)
@@ -27,23 +39,37 @@ class AMaaS(BaseComponent):
     @property
     def init_model_store(self) -> ModelStore:
         """模型管理 - 模型中心"""
-        params = dict(page=1, perPage=100, source="init")
-        res = self.get("get_self", params, ModelStore.GET_URL_MAP)
-        return ModelStore(self.mgt_ip, self.port, data=res.data.get("items"), amaas=self)
+        items = list(self.paginate("get_self", dict(source="init"), ModelStore.GET_URL_MAP))
+        return ModelStore(self.mgt_ip, self.port, data=items, amaas=self)
 
     @property
     def upload_model_store(self) -> ModelStore:
         """模型管理 - 私有模型"""
-        params = dict(page=1, perPage=100, source="upload")
-        res = self.get("get_self", params, ModelStore.GET_URL_MAP)
-        return ModelStore(self.mgt_ip, self.port, data=res.data.get("items"), amaas=self)
+        items = list(self.paginate("get_self", dict(source="upload"), ModelStore.GET_URL_MAP))
+        return ModelStore(self.mgt_ip, self.port, data=items, amaas=self)
+
+    def find_model_store(self, name: str, source: str = "init") -> Optional[BaseModelStore]:
+        """按名称查找模型中心 / 私有模型(source="upload")中的模型, 找到后不再请求后续页"""
+        items = self.paginate("get_self", dict(source=source), ModelStore.GET_URL_MAP, until=lambda i: i.name == name)
+        if (item := next((i for i in items if i.name == name), None)) is None:
+            return None
+        store = ModelStore(self.mgt_ip, self.port, data=[item], amaas=self)
+        return next(iter(getattr(store, item.type, None) or []), None)
 
     @property
     def model(self) -> Model:
         """模型管理-模型运行"""
-        res = self.get("get_self", url_map=Model.GET_URL_MAP)
+        res = self.get("get_self", url_map=Model.GET_URL_MAP, encode_result=ModelRecord)
         return Model(self.mgt_ip, self.port, data=res.data.get("items"), amaas=self)
 
+    def instance_index(self) -> InstanceIndex:
+        """所有模型实例的索引, 可按名称 / worker / GPU 查找"""
+        return InstanceIndex(self)
+
+    def topology(self, concurrency: int = 8) -> TopologySnapshot:
+        """worker / GPU / 模型实例的一致性快照"""
+        return TopologySnapshot.take(self, concurrency)
+
     @property
     def scene(self) -> Scene:
         """试验场景"""
@@ -52,7 +78,7 @@ class AMaaS(BaseComponent):
     @property
     def workers(self) -> Optional[CustomList[Worker]]:
         """模型管理-模型加速"""
-        res = self.get(alias="get_self", url_map=Worker.GET_URL_MAP)
+        res = self.get(alias="get_self", url_map=Worker.GET_URL_MAP, encode_result=WorkerRecord)
         if res.retcode == 0:
             return CustomList(
                 [
@@ -64,27 +90,21 @@ class AMaaS(BaseComponent):
     @property
     def api_keys(self) -> CustomList[APIKey]:
         """API 密钥"""
-        params = dict(page=1, perpage=1000)
-        res = self.get("get_self", url_map=APIKey.GET_URL_MAP, params=params)
-        return CustomList(
-            [APIKey(self.mgt_ip, self.port, object_id=item.id, data=item, amaas=self) for item in res.data.get("items")]
-        )
+        items = self.paginate("get_self", url_map=APIKey.GET_URL_MAP, per_page_key="perpage")
+        return CustomList([APIKey(self.mgt_ip, self.port, object_id=item.id, data=item, amaas=self) for item in items])
 
     def create_api_key(self, name: str = None, expires_in=None, timeout: int = None):
         # TODO 时间戳有点诡异，是个 1970 年的时间戳？
         data = {"expires_in": expires_in or "30761967", "name": name or str(uuid4())}
         res = self.post("create", url_map=APIKey.POST_URL_MAP, json_data=data, timeout=timeout)
-        return APIKey(self.mgt_ip, self.port, object_id=res.data.id, data=res.data, amaas=self)
+        # 密钥属于当前登录用户, 之后的 refresh / delete 也以该用户身份请求
+        return APIKey(self.mgt_ip, self.port, self.user, self.passwd, object_id=res.data.id, data=res.data, amaas=self)
 
     @property
     def users(self) -> List[AMaaSUser]:
         """用户管理"""
-        params = dict(page=1, perpage=1000)
-        res = self.get("get_self", url_map=AMaaSUser.GET_URL_MAP, params=params)
-        return [
-            AMaaSUser(self.mgt_ip, self.port, object_id=item.id, data=item, amaas=self)
-            for item in res.data.get("items")
-        ]
+        items = self.paginate("get_self", url_map=AMaaSUser.GET_URL_MAP, per_page_key="perpage")
+        return [AMaaSUser(self.mgt_ip, self.port, object_id=item.id, data=item, amaas=self) for item in items]
 
     def create_user(self, username, passwd, is_admin: bool, desc: str = None, timeout: int = None):
         data = {
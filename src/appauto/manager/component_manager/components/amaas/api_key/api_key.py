@@ -19,7 +19,7 @@ class APIKey(BaseComponent):
         return res
 
     def delete(self, timeout: int = None):
-        return self.delete("delete", timeout=timeout)
+        return super().delete("delete", timeout=timeout)
 
     @cached_property
     def value(self) -> str:
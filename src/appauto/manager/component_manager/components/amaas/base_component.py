@@ -1,10 +1,17 @@
 import addict
-from tenacity import stop_after_attempt, retry, retry_if_result, after_log, RetryCallState
+import logging
+from tenacity import stop_after_attempt, retry, retry_if_exception, after_log, RetryCallState
+import asyncio
 import functools
+from collections import deque
 from httpx import Response
-from typing import TYPE_CHECKING
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, TYPE_CHECKING
 from functools import cached_property
-from appauto.manager.connection_manager.http import HttpClient
+from appauto.manager.connection_manager.http import bearer_token
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
+from appauto.manager.utils_manager.custom_thread_pool_executor import CustomThreadPoolExecutor
+from .response_cache import ResponseCache
+from .token_manager import TokenManager
 from appauto.manager.error_manager.errors import NeedRetryOnHttpRC401
 from appauto.manager.config_manager.config_logging import LoggingConfig
 
@@ -16,7 +23,6 @@ if TYPE_CHECKING:
 
 class BaseComponent(object):
     OBJECT_TOKEN = None
-    ACCESS_TOKEN = None
 
     GET_URL_MAP = {}
     PUT_URL_MAP = {}
@@ -25,87 +31,180 @@ class BaseComponent(object):
 
     REFRESH_ALIAS = "get_self"
 
+    # paginate 的默认每页条数和预取页数
+    PAGE_SIZE = 100
+    PAGE_PREFETCH = 4
+
     def __init__(
         self,
         mgt_ip=None,
         port=None,
-        username="admin",
-        passwd="123456",
+        username=None,
+        passwd=None,
         object_id=None,
         data=None,
         ssl_enabled=False,
         parent_tokens=None,
         amaas: "AMaaS" = None,
     ):
+        """
+        username / passwd: 不指定时使用所属 amaas 的登录用户, 没有 amaas 时为 admin / 123456
+        """
         self.mgt_ip = mgt_ip
         self.port = port
         self.object_id = object_id
-        self.user = username
-        self.passwd = passwd
+        self.user = username or (amaas.user if amaas is not None else "admin")
+        self.passwd = passwd or (amaas.passwd if amaas is not None else "123456")
         self.data = data
         self.ssl_enabled = ssl_enabled
         self.parent_tokens = parent_tokens or {}
         self.amaas = amaas
 
     def refresh(self, alias=None):
-        res = self.get(alias or self.REFRESH_ALIAS)
+        res = self.get(alias or self.REFRESH_ALIAS, cache=False)
 
         if not alias:
             self.data = res.data
 
         return res
 
-    def refresh_token(self):
-        del self.__dict__["http"]
-        del self.__dict__["headers"]
-        del self.__dict__["token"]
-
-        self.login(refresh=True)
+    def refresh_token(self, stale=None):
+        """
+        收到 401 后刷新 token. 新的认证头会替换进所有登记过的 client, 不需要重建 client.
+        stale: 失败请求使用的 token, 已经被其他对象/线程刷新过时不会重复登录
+        """
+        self.token_manager.invalidate(stale)
 
-    @cached_property
+    @property
     def headers(self):
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-            "Cookie": f"AMES_session={self.token}",
-        }
+        return {**self.token_manager.headers, "Content-Type": "application/json"}
 
     def login(self, refresh=False):
         if refresh:
-            BaseComponent.ACCESS_TOKEN = None
+            self.refresh_token()
 
-        if BaseComponent.ACCESS_TOKEN is None:
-            data = {"username": self.user, "password": self.passwd}
-            res = HttpClient().post(f"{self.url_prefix}/api/auth/login", data=data)
-            BaseComponent.ACCESS_TOKEN = res.data.access_token
-
-        return BaseComponent.ACCESS_TOKEN
+        return self.token_manager.token
 
     def request_callback(self, response: Response):
         retry = False
         try:
             if response.status_code == 401:
-                self.refresh_token()
+                self.refresh_token(bearer_token(response.request))
                 retry = True
         finally:
             return addict.Dict(retry=retry, token=self.token)
 
-    @cached_property
+    @property
     def token(self):
-        return self.login()
+        return self.token_manager.token
+
+    @property
+    def login_owner(self) -> Optional["BaseComponent"]:
+        """以相同用户登录的所属对象(一般是 AMaaS), 子对象与其共用 token 和 GET 缓存"""
+        owner = self.amaas
+        if owner is None or owner is self or (owner.user, owner.passwd) != (self.user, self.passwd):
+            return None
+        return owner
 
+    @cached_property
+    def token_manager(self) -> TokenManager:
+        """同一 AMaaS 地址 & 用户下所有组件对象共用的 token, 过期前主动刷新"""
+        if (owner := self.login_owner) is not None:
+            return owner.token_manager
+        return TokenManager.of(self.url_prefix, self.user, self.passwd)
+
+    @property
+    def breaker_scope(self) -> Optional[str]:
+        """熔断范围(见 CircuitBreaker), 默认按请求路径区分"""
+        return None
+
+    # 同一个 AMaaS/sglang 地址的所有组件对象共享连接池(见 HttpPoolRegistry), 每个对象只维护自己的 headers
+    # 带 token 的 client 登记到 token_manager, token 刷新时统一替换认证头
     @cached_property
     def http(self):
-        return HttpClient(headers=self.headers)
+        return self.token_manager.register(
+            HttpPoolRegistry.client(self.url_prefix, self.headers, identity=self.user, breaker_scope=self.breaker_scope)
+        )
 
     @cached_property
     def http_with_file(self):
-        return HttpClient(headers={"Authorization": f"Bearer {self.token}", "Cookie": f"AMES_session={self.token}"})
+        return self.token_manager.register(
+            HttpPoolRegistry.client(
+                self.url_prefix, self.token_manager.headers, identity=self.user, breaker_scope=self.breaker_scope
+            )
+        )
 
     # 测试 sglang 不需要带前端
     @cached_property
     def http_without_token(self):
-        return HttpClient(headers={"accept": "application/json", "Content-Type": "application/json"})
+        return HttpPoolRegistry.client(
+            self.url_prefix,
+            {"accept": "application/json", "Content-Type": "application/json"},
+            breaker_scope=self.breaker_scope,
+        )
+
+    # 异步 client 绑定创建时的事件循环, 按事件循环缓存, 由 aclose 释放; 已关闭的事件循环的 client 直接丢弃
+    @cached_property
+    def _async_clients(self) -> Dict[asyncio.AbstractEventLoop, Dict[str, Any]]:
+        return {}
+
+    def _async_client(self, name: str, factory: Callable[[], Any]):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return factory()
+
+        for closed in [lp for lp in self._async_clients if lp.is_closed()]:
+            del self._async_clients[closed]
+        clients = self._async_clients.setdefault(loop, {})
+        if (client := clients.get(name)) is None:
+            client = clients[name] = factory()
+        return client
+
+    @property
+    def async_http(self):
+        return self._async_client(
+            "async_http",
+            lambda: self.token_manager.register(
+                HttpPoolRegistry.client(
+                    self.url_prefix, self.headers, identity=self.user, is_async=True, breaker_scope=self.breaker_scope
+                )
+            ),
+        )
+
+    @property
+    def async_http_with_file(self):
+        return self._async_client(
+            "async_http_with_file",
+            lambda: self.token_manager.register(
+                HttpPoolRegistry.client(
+                    self.url_prefix,
+                    self.token_manager.headers,
+                    identity=self.user,
+                    is_async=True,
+                    breaker_scope=self.breaker_scope,
+                )
+            ),
+        )
+
+    @property
+    def async_http_without_token(self):
+        return self._async_client(
+            "async_http_without_token",
+            lambda: HttpPoolRegistry.client(
+                self.url_prefix,
+                {"accept": "application/json", "Content-Type": "application/json"},
+                is_async=True,
+                breaker_scope=self.breaker_scope,
+            ),
+        )
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        """所属 AMaaS 及其子对象共用的 GET 缓存, 默认关闭"""
+        if (owner := self.login_owner) is not None:
+            return owner.response_cache
+        return ResponseCache.of(f"{self.url_prefix}@{self.user}")
 
     @cached_property
     def url_prefix(self):
@@ -131,17 +230,17 @@ class BaseComponent(object):
         return isinstance(exc, NeedRetryOnHttpRC401)
 
     def _retry_before_sleep(self, retry_state: RetryCallState):
-        """重试前回调：刷新 Token + 打印日志"""
+        """重试前回调：刷新 Token + 打印日志. 带上收到 401 的 token, 其他线程已经刷新过时不重复登录"""
         logger.info(f"request {retry_state.fn.__name__} failed {retry_state.attempt_number}")
-        self.refresh_token()
+        self.refresh_token(getattr(retry_state.outcome.exception(), "token", None))
 
     def http_retry_on_401(self, func):
         @functools.wraps(func)
         @retry(
             stop=stop_after_attempt(2),
-            retry=retry_if_result(self._retry_condition),
+            retry=retry_if_exception(self._retry_condition),
             before_sleep=self._retry_before_sleep,
-            after=after_log(logger, logger.ERROR),
+            after=after_log(logger, logging.ERROR),
             reraise=True,
         )
         def wrapper(*args, **kwargs):
@@ -158,10 +257,28 @@ class BaseComponent(object):
 
         return wrapper
 
-    def get(self, alias, params=None, url_map=None, timeout=None, headers=None, encode_result=True, **kwargs):
+    def get(
+        self, alias, params=None, url_map=None, timeout=None, headers=None, encode_result=True, cache=True, **kwargs
+    ):
+        """
+        cache: 开启 response_cache 时是否允许使用缓存, 需要最新数据时(比如轮询状态)指定为 False
+        encode_result: 也可以指定 record 类(见 records.py), 列表接口解析为紧凑的 record
+        """
         url_map = url_map or self.GET_URL_MAP
+        url = self.full_url(url_map, alias)
+        self.token_manager.ensure_fresh()
+
+        if cache and encode_result and self.response_cache.enabled:
+            text = self.response_cache.get_or_fetch(
+                url_map[alias],
+                url,
+                params,
+                lambda: self.http.get(url, params, headers, False, timeout, **kwargs).text,
+            )
+            return self.http.encode_result(text, encode_result)
+
         return self.http.get(
-            self.full_url(url_map, alias),
+            url,
             params,
             headers,
             encode_result,
@@ -169,6 +286,65 @@ class BaseComponent(object):
             **kwargs,
         )
 
+    def paginate(
+        self,
+        alias,
+        params=None,
+        url_map=None,
+        per_page: int = None,
+        per_page_key: str = "perPage",
+        prefetch: int = None,
+        until: Callable[[Any], bool] = None,
+        timeout=None,
+        encode_result=True,
+        cache=True,
+    ) -> Iterator:
+        """
+        按页懒加载列表接口(响应为 data.items)的所有 item.
+        第一页单独请求, 之后在后台并发预取最多 prefetch 页; 某一页不足 per_page 条或已达到 data.total 时结束.
+        until: 对每个 item 调用, 返回 True 时产出该 item 后不再请求后续页. 消费方提前 break 时同样会取消未开始的预取.
+        per_page_key: 每页条数的参数名, 不同接口不一致(perPage / perpage)
+
+        用法:
+            for item in amaas.paginate("get_self", dict(source="init"), ModelStore.GET_URL_MAP):
+                ...
+            store = next((i for i in amaas.paginate(...) if i.name == name), None)
+        """
+        per_page = per_page or self.PAGE_SIZE
+        window = max(prefetch or self.PAGE_PREFETCH, 1)
+        base_params = dict(params or {})
+
+        def fetch(page: int):
+            page_params = {**base_params, "page": page, per_page_key: per_page}
+            return self.get(alias, page_params, url_map, timeout, encode_result=encode_result, cache=cache)
+
+        executor = CustomThreadPoolExecutor(max_workers=window)
+        pending: Deque = deque()
+        next_page, last_page, size = 1, None, 1
+        try:
+            while True:
+                while len(pending) < size and (last_page is None or next_page <= last_page):
+                    pending.append(executor.submit(fetch, next_page))
+                    next_page += 1
+                if not pending:
+                    return
+
+                data = pending.popleft().result().data
+                items = data.get("items") or []
+                if isinstance(total := data.get("total"), int):
+                    last_page = max((total + per_page - 1) // per_page, 1)
+                size = window
+
+                for item in items:
+                    yield item
+                    if until is not None and until(item):
+                        return
+
+                if len(items) < per_page:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def post(
         self,
         alias,
@@ -190,7 +366,10 @@ class BaseComponent(object):
         if not stream:
             if kwargs.get("files"):
                 hdrs.pop("Content-Type", None)
-            return self.http_with_file.post(url, params, data, json_data, hdrs, encode_result, timeout, **kwargs)
+            try:
+                return self.http_with_file.post(url, params, data, json_data, hdrs, encode_result, timeout, **kwargs)
+            finally:
+                self.response_cache.on_write(url_map[alias])
 
         return self.http.stream_request("POST", url, params, data, json_data, hdrs, timeout, **kwargs)
 
@@ -231,8 +410,101 @@ class BaseComponent(object):
         **kwargs,
     ):
         url_map = url_map or self.DELETE_URL_MAP
+        self.token_manager.ensure_fresh()
+
+        try:
+            return self.http.delete(
+                self.full_url(url_map, alias),
+                params,
+                data,
+                json_data=json_data,
+                headers=headers,
+                encode_result=encode_result,
+                timeout=timeout,
+                **kwargs,
+            )
+        finally:
+            self.response_cache.on_write(url_map[alias])
+
+    # 以下为异步版本, 参数与同步版本一致.
+    # 非 stream 时返回 coroutine, 需要 await; stream 时返回异步上下文管理器, 需要 async with.
+    def aget(self, alias, params=None, url_map=None, timeout=None, headers=None, encode_result=True, **kwargs):
+        url_map = url_map or self.GET_URL_MAP
+        self.token_manager.ensure_fresh()
+        return self.async_http.get(
+            self.full_url(url_map, alias),
+            params,
+            headers,
+            encode_result,
+            timeout,
+            **kwargs,
+        )
+
+    def apost(
+        self,
+        alias,
+        params=None,
+        data=None,
+        json_data=None,
+        url_map=None,
+        timeout=None,
+        headers=None,
+        encode_result=True,
+        stream=False,
+        **kwargs,
+    ):
+        url_map = url_map or self.POST_URL_MAP
+        url = self.full_url(url_map, alias)
+        hdrs = dict(self.headers) if headers is None else dict(headers)
+
+        if not stream:
+            if kwargs.get("files"):
+                hdrs.pop("Content-Type", None)
+            return self.async_http_with_file.post(url, params, data, json_data, hdrs, encode_result, timeout, **kwargs)
+
+        return self.async_http.stream_request("POST", url, params, data, json_data, hdrs, timeout, **kwargs)
+
+    def apost_without_token(
+        self,
+        alias,
+        params=None,
+        data=None,
+        json_data=None,
+        url_map=None,
+        timeout=None,
+        headers=None,
+        encode_result=True,
+        stream=False,
+        **kwargs,
+    ):
+        url_map = url_map or self.POST_URL_MAP
+        url = url_map[alias]
+        url = f"{self.url_prefix}/{url.format(**self.object_tokens)}"
+        if not stream:
+            return self.async_http_without_token.post(
+                url, params, data, json_data, headers, encode_result, timeout, **kwargs
+            )
+
+        return self.async_http_without_token.stream_request(
+            "POST", url, params, data, json_data=json_data, headers=headers, timeout=timeout, **kwargs
+        )
+
+    def adelete(
+        self,
+        alias,
+        params=None,
+        data=None,
+        json_data=None,
+        url_map=None,
+        timeout=None,
+        headers=None,
+        encode_result=True,
+        **kwargs,
+    ):
+        url_map = url_map or self.DELETE_URL_MAP
+        self.token_manager.ensure_fresh()
 
-        return self.http.delete(
+        return self.async_http.delete(
             self.full_url(url_map, alias),
             params,
             data,
@@ -242,3 +514,11 @@ class BaseComponent(object):
             timeout=timeout,
             **kwargs,
         )
+
+    async def aclose(self):
+        """
+        释放当前对象在当前事件循环下的 async client, 其他对象仍在使用的共享连接池不受影响.
+        异步连接池不能跨事件循环复用, 一般在 asyncio.run 的主协程结束前调用(或者使用 HttpPoolRegistry.run).
+        """
+        for client in self._async_clients.pop(asyncio.get_running_loop(), {}).values():
+            await HttpPoolRegistry.arelease(client)
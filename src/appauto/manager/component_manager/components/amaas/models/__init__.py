@@ -3,3 +3,7 @@ from .model_store import ModelStore
 from .worker import Worker
 from .model import Model
 from .gpu import GPU
+from .instance_index import InstanceIndex
+from .topology import TopologySnapshot, TopologyDiff
+from .running_poller import RunningPoller
+from .log_follower import LogFollower
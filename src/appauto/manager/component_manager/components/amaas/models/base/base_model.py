@@ -3,19 +3,19 @@
 """
 
 import abc
-from time import time, sleep
 from typing import Literal, Dict, List, TYPE_CHECKING
 from ......utils_manager.custom_list import CustomList
 from ...base_component import BaseComponent
 from ..model_instance import ModelInstance
+from ...records import InstanceRecord
 from appauto.manager.config_manager.config_logging import LoggingConfig
-from appauto.manager.error_manager.model_store import ModelRunError
 
 logger = LoggingConfig.get_logger()
 
 
 if TYPE_CHECKING:
     from ..model_store import ModelStore
+    from appauto.manager.connection_manager.adaptive_concurrency import AdaptiveConcurrency
 
 
 # TODO 要继承 BaseComponent
@@ -64,28 +64,17 @@ class BaseModel(BaseComponent):
     def wait_for_running(self, interval_s: int = 30, timeout_s: int = 600):
         """
         使用 model.wait_for_running 时不要有已经在运行的该 model
+        interval_s: 最大轮询间隔. 多个模型同时等待时共用同一个轮询(见 RunningPoller), 每轮只请求一次模型列表.
         """
-        start_time = time()
+        from ..running_poller import RunningPoller
 
-        while time() - start_time <= timeout_s:
+        RunningPoller.of(self).watch(self, timeout_s, interval_s).result()
 
-            self.refresh()
+    def concurrency(self, **kwargs) -> "AdaptiveConcurrency":
+        """以 access_limit 为上限的自适应并发控制, 用于替代手动指定大小的线程池(见 AdaptiveConcurrency)"""
+        from appauto.manager.connection_manager.adaptive_concurrency import AdaptiveConcurrency
 
-            if self.status == "running":
-                logger.info(f"model: {self.name}, running succeed".center(100, "="))
-                return
-
-            elif self.status == "error":
-                logger.info(f"model: {self.name}, running failed: error".center(100, "="))
-                raise ModelRunError(f"{self.name} running failed, status is error.")
-
-            elif self.status in ["loading", "pending", "analyzing"]:
-                logger.info(f"model: {self.name}, still loading".center(100, "="))
-                sleep(interval_s)
-                continue
-
-        logger.error(f"Timeout while waiting for {self.name} running.")
-        raise TimeoutError(f"Timeout while waiting for {self.name} running.")
+        return AdaptiveConcurrency.of_model(self, **kwargs)
 
     @property
     def model_store(self) -> "ModelStore":
@@ -94,10 +83,10 @@ class BaseModel(BaseComponent):
     @property
     def instances(self) -> CustomList[ModelInstance]:
         """模型实例"""
-        res = self.get("get_instances")
+        res = self.get("get_instances", encode_result=InstanceRecord)
         return CustomList(
             [
-                ModelInstance(self.mgt_ip, self.port, data=item, object_id=item.id, model=self)
+                ModelInstance(self.mgt_ip, self.port, data=item, object_id=item.id, amaas=self.amaas, model=self)
                 for item in res.data.get("items")
             ]
         )
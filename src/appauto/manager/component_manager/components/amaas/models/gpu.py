@@ -6,6 +6,7 @@ from .....utils_manager.custom_list import CustomList
 if TYPE_CHECKING:
     from .worker import Worker
     from .model_instance import ModelInstance
+    from .instance_index import InstanceIndex
 
 
 class GPU(BaseComponent):
@@ -20,8 +21,8 @@ class GPU(BaseComponent):
         self,
         mgt_ip=None,
         port=None,
-        username="admin",
-        passwd="123456",
+        username=None,
+        passwd=None,
         object_id=None,
         data=None,
         ssl_enabled=False,
@@ -99,41 +100,43 @@ class GPU(BaseComponent):
     def model_instances(self) -> Optional[List[Dict]]:
         return self.data.model_instances
 
+    def instances_obj(self, category: str = None, index: "InstanceIndex" = None) -> CustomList["ModelInstance"]:
+        """当前 GPU 上的模型实例. index: 复用已经获取的索引, 不指定时重新获取(见 Worker.instance_index)"""
+        index = self.worker.instance_index() if index is None else index
+        return index.of_names([item.name for item in self.model_instances or []], category)
+
+    def _category_instances_obj(self, category: str) -> Optional[CustomList["ModelInstance"]]:
+        # 与之前一致: GPU 上没有实例, 或者 worker 上没有该类别的实例时为 None
+        if not self.model_instances:
+            return None
+        index = self.worker.instance_index()
+        if not index.of_category(category) or not self.worker.instances_obj(category, index):
+            return None
+        return self.instances_obj(category, index)
+
     @property
-    def llm_instances_obj(self) -> CustomList["ModelInstance"]:
-        if ins_dict := self.model_instances:
-            if ins_obj := self.worker.llm_instances_obj:
-                return CustomList([ins for ins in ins_obj if ins.name in [item.name for item in ins_dict]])
+    def llm_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("llm")
 
     @property
-    def embedding_instances_obj(self) -> CustomList["ModelInstance"]:
-        if ins_dict := self.model_instances:
-            if ins_obj := self.worker.embedding_instances_obj:
-                return CustomList([ins for ins in ins_obj if ins.name in [item.name for item in ins_dict]])
+    def embedding_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("embedding")
 
     @property
-    def rerank_instances_obj(self) -> CustomList["ModelInstance"]:
-        if ins_dict := self.model_instances:
-            if ins_obj := self.worker.rerank_instances_obj:
-                return CustomList([ins for ins in ins_obj if ins.name in [item.name for item in ins_dict]])
+    def rerank_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("rerank")
 
     @property
-    def parser_instances_obj(self) -> CustomList["ModelInstance"]:
-        if ins_dict := self.model_instances:
-            if ins_obj := self.worker.parser_instances_obj:
-                return CustomList([ins for ins in ins_obj if ins.name in [item.name for item in ins_dict]])
+    def parser_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("parser")
 
     @property
-    def vlm_instances_obj(self) -> CustomList["ModelInstance"]:
-        if ins_dict := self.model_instances:
-            if ins_obj := self.worker.vlm_instances_obj:
-                return CustomList([ins for ins in ins_obj if ins.name in [item.name for item in ins_dict]])
+    def vlm_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("vlm")
 
     @property
-    def audio_instances_obj(self) -> CustomList["ModelInstance"]:
-        if ins_dict := self.model_instances:
-            if ins_obj := self.worker.audio_instances_obj:
-                return CustomList([ins for ins in ins_obj if ins.name in [item.name for item in ins_dict]])
+    def audio_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("audio")
 
     @property
     def gpu_id(self) -> str:
@@ -0,0 +1,90 @@
+"""
+模型实例索引.
+
+一次 GET /v1/kllm/model-instances 取回所有实例(加一次 GET /v1/kllm/models 用于关联所属模型和类别),
+之后按名称 / worker / GPU 的查找都是 dict 查找, 不再对每个模型逐个请求 instances.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from .....utils_manager.custom_list import CustomList
+from .model_instance import ModelInstance
+from ..records import InstanceRecord
+
+if TYPE_CHECKING:
+    from ..amaas import AMaaS
+    from .base import BaseModel
+
+
+class InstanceIndex:
+    """
+    用法:
+        index = amaas.instance_index()
+        index.get("Qwen3-8B-xxxx")
+        index.of_worker("worker-1", "llm")
+        index.of_gpu("worker-1", 0)
+    """
+
+    CATEGORIES = ("llm", "vlm", "embedding", "rerank", "parser", "audio")
+
+    def __init__(self, amaas: "AMaaS"):
+        self.amaas = amaas
+
+        model = amaas.model
+        self.models: Dict[int, "BaseModel"] = {}
+        self.categories: Dict[int, str] = {}
+        for category in self.CATEGORIES:
+            for m in getattr(model, category):
+                self.models[m.object_id] = m
+                self.categories[m.object_id] = category
+
+        items = amaas.paginate("get_instances", url_map=ModelInstance.GET_URL_MAP, encode_result=InstanceRecord)
+        self.instances = CustomList(
+            [
+                ModelInstance(
+                    amaas.mgt_ip,
+                    amaas.port,
+                    object_id=item.id,
+                    data=item,
+                    amaas=amaas,
+                    model=self.models.get(item.model_id),
+                )
+                for item in items
+            ]
+        )
+
+        self.by_name: Dict[str, ModelInstance] = {}
+        self.by_worker: Dict[str, List[ModelInstance]] = defaultdict(list)
+        self.by_gpu: Dict[Tuple[str, int], List[ModelInstance]] = defaultdict(list)
+        for ins in self.instances:
+            self.by_name[ins.name] = ins
+            self.by_worker[ins.worker_name].append(ins)
+            for gpu_index in ins.gpu_indexes or []:
+                self.by_gpu[(ins.worker_name, int(str(gpu_index).split(":")[-1]))].append(ins)
+
+    def __len__(self):
+        return len(self.instances)
+
+    def category_of(self, ins: ModelInstance) -> Optional[str]:
+        return self.categories.get(ins.model_id)
+
+    def _filter(self, instances: List[ModelInstance], category: str = None) -> CustomList[ModelInstance]:
+        if category is None:
+            return CustomList(instances)
+        return CustomList([ins for ins in instances if self.category_of(ins) == category])
+
+    def get(self, name: str) -> Optional[ModelInstance]:
+        return self.by_name.get(name)
+
+    def of_category(self, category: str) -> CustomList[ModelInstance]:
+        return self._filter(self.instances, category)
+
+    def of_names(self, names: List[str], category: str = None) -> CustomList[ModelInstance]:
+        """按名称批量查找, 忽略不存在的名称"""
+        return self._filter([ins for name in names if (ins := self.by_name.get(name))], category)
+
+    def of_worker(self, worker_name: str, category: str = None) -> CustomList[ModelInstance]:
+        return self._filter(self.by_worker.get(worker_name, []), category)
+
+    def of_gpu(self, worker_name: str, gpu_index: int, category: str = None) -> CustomList[ModelInstance]:
+        return self._filter(self.by_gpu.get((worker_name, int(gpu_index)), []), category)
@@ -0,0 +1,200 @@
+"""
+增量跟踪模型实例日志.
+
+get_logs 每次都返回完整日志, 等待某一行日志或者失败时打印日志会反复下载几 MB 的引擎日志. LogFollower 记录已读取的字节偏移:
+- 请求带 Range(从已读取的最后一个字节开始), 服务端支持(206)时只传输新增部分;
+- 服务端忽略 Range(200)时在本地按上次的长度截取新增部分, 之后不再发送 Range;
+  已读取部分的末尾与本次内容不一致(实例重启后日志被重写)时从头开始;
+- 指定 tail 时改为请求最后 tail 行(接口支持 tail 参数时), 与上次读到的最后几行对齐后取新增的行.
+新增内容按完整的行交给回调, 并追加写入本地文件.
+
+用法:
+    with instance.follow_logs(output="engine.log", callbacks=[print]) as follower:
+        follower.wait_for(r"The server is fired up", timeout_s=600)
+"""
+
+import re
+import threading
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Callable, Iterable, List, Optional, Union, TYPE_CHECKING
+import httpx
+from appauto.manager.config_manager import LoggingConfig
+
+if TYPE_CHECKING:
+    from .model_instance import ModelInstance
+
+logger = LoggingConfig.get_logger()
+
+
+class LogFollower:
+    # 用于判断日志是否被重写的已读取部分末尾字节数
+    FINGERPRINT_SIZE = 256
+    # tail 模式下用于对齐的行数
+    ANCHOR_LINES = 3
+
+    def __init__(
+        self,
+        instance: "ModelInstance",
+        output: Union[str, Path] = None,
+        callbacks: Iterable[Callable[[str], None]] = (),
+        tail: int = None,
+        timeout: float = None,
+    ):
+        """
+        output: 新增的日志追加写入该文件
+        callbacks: 每一行新日志调用一次(不含换行符)
+        tail: 每次只请求最后 tail 行, 两次请求之间新增超过 tail 行时中间的日志会丢失(会打印 warning)
+        """
+        self.instance = instance
+        self.output = Path(output) if output else None
+        self.callbacks = list(callbacks)
+        self.tail = tail
+        self.timeout = timeout
+
+        self.offset = 0
+        self.fetched_bytes = 0
+        self.lines = 0
+        self._range_supported: Optional[bool] = None
+        self._fingerprint = b""
+        self._partial = b""
+        self._anchor: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fetch(self, params=None, headers=None) -> httpx.Response:
+        return self.instance.get(
+            "get_logs", params, headers=headers, timeout=self.timeout, encode_result=False, cache=False
+        )
+
+    def _fetch_range(self) -> bytes:
+        """offset 之后的新增字节"""
+        # 从已读取的最后一个字节开始请求: 没有新增内容时不会 416, 同时可以校验日志是否被重写
+        headers = None
+        if self.offset and self._range_supported is not False:
+            headers = {"Range": f"bytes={self.offset - 1}-"}
+        try:
+            res = self._fetch(headers=headers)
+        except httpx.HTTPStatusError as e:
+            # 日志比已读取的部分短, 被重写了
+            if e.response.status_code != 416:
+                raise
+            self._range_supported = True
+            res = self._fetch()
+
+        content = res.content
+        self.fetched_bytes += len(content)
+        if res.status_code == 206:
+            self._range_supported = True
+            if content[:1] == self._fingerprint[-1:]:
+                return content[1:]
+            res = self._fetch()
+            content = res.content
+            self.fetched_bytes += len(content)
+
+        if headers and self._range_supported is None:
+            logger.info(f"logs of {self.instance.name} ignore Range, fallback to local diff.")
+            self._range_supported = False
+
+        start = self.offset
+        if start > len(content) or content[start - len(self._fingerprint) : start] != self._fingerprint:
+            logger.info(f"logs of {self.instance.name} were rewritten, follow from the beginning.")
+            self._partial, self._fingerprint = b"", b""
+            start = 0
+        self.offset = start
+        return content[start:]
+
+    def _fetch_tail(self) -> bytes:
+        """最后 tail 行中上次没有读到的部分"""
+        res = self._fetch(params=dict(tail=self.tail))
+        self.fetched_bytes += len(res.content)
+        lines = res.text.splitlines(keepends=True)
+
+        if self._anchor:
+            n = len(self._anchor)
+            for i in range(len(lines) - n, -1, -1):
+                if lines[i : i + n] == self._anchor:
+                    lines = lines[i + n :]
+                    break
+            else:
+                logger.warning(f"logs of {self.instance.name} may be lost between polls, increase tail: {self.tail}")
+
+        # 最后一行可能还没写完, 不参与对齐
+        complete = [line for line in lines if line.endswith("\n")]
+        if complete:
+            self._anchor = (self._anchor + complete)[-self.ANCHOR_LINES :]
+        return "".join(complete).encode("utf-8")
+
+    def poll(self) -> List[str]:
+        """请求一次, 返回新增的完整行"""
+        with self._lock:
+            if self.tail:
+                content = self._fetch_tail()
+            else:
+                content = self._fetch_range()
+                self.offset += len(content)
+                self._fingerprint = (self._fingerprint + content)[-self.FINGERPRINT_SIZE :]
+
+            # 按字节切分, 多字节字符被截断在两次请求之间时留到下一次再解码
+            chunks = (self._partial + content).split(b"\n")
+            self._partial = chunks.pop()
+            if not chunks:
+                return []
+            lines = [chunk.decode("utf-8", errors="replace") for chunk in chunks]
+
+            self.lines += len(lines)
+            if self.output:
+                with self.output.open("a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+        for line in lines:
+            for callback in self.callbacks:
+                try:
+                    callback(line)
+                except Exception as e:
+                    logger.error(f"error occurred in log callback {callback}: {e}")
+        return lines
+
+    def wait_for(self, pattern: str, timeout_s: float = 600, interval_s: float = 5) -> str:
+        """轮询直到出现匹配 pattern(正则)的新日志行, 返回该行; 只在新增的行中查找"""
+        regex = re.compile(pattern)
+        deadline = monotonic() + timeout_s
+        while True:
+            for line in self.poll():
+                if regex.search(line):
+                    return line
+            if monotonic() >= deadline:
+                raise TimeoutError(f"timeout while waiting for log of {self.instance.name}: {pattern}")
+            sleep(min(interval_s, max(deadline - monotonic(), 0)))
+
+    def _run(self, interval_s: float):
+        while not self._stop.wait(interval_s):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"error occurred while following logs of {self.instance.name}: {e}")
+
+    def start(self, interval_s: float = 5) -> "LogFollower":
+        """后台线程每 interval_s 秒 poll 一次"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_s,), name="log-follower", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止后台线程并读取最后一次"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.poll()
+        except Exception as e:
+            logger.error(f"error occurred while following logs of {self.instance.name}: {e}")
+
+    def __enter__(self) -> "LogFollower":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
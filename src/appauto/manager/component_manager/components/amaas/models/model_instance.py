@@ -1,4 +1,3 @@
-from time import time, sleep
 from typing import List, Dict, TYPE_CHECKING, Optional, Literal
 from functools import cached_property
 from ..base_component import BaseComponent
@@ -13,6 +12,7 @@ if TYPE_CHECKING:
     from .model import Model
     from .worker import Worker
     from .gpu import GPU
+    from .log_follower import LogFollower
 
 
 # TODO 要继承 BaseComponent
@@ -41,8 +41,8 @@ class ModelInstance(BaseComponent):
         self,
         mgt_ip=None,
         port=None,
-        username="admin",
-        passwd="123456",
+        username=None,
+        passwd=None,
         object_id=None,
         data=None,
         ssl_enabled=False,
@@ -65,34 +65,17 @@ class ModelInstance(BaseComponent):
         return self.object_id == other.object_id
 
     def refresh(self):
-        res = self.model.get("get_instances")
+        res = self.model.get("get_instances", cache=False)
         self.data = [item for item in res.data.get("items") if item.id == self.object_id][0]
         return res
 
     def wait_for_running(self, interval_s: int = 30, timeout_s: int = 600):
         """
-        使用 model_instance.wait_for_running 时要有 model
+        interval_s: 最大轮询间隔. 多个实例同时等待时共用同一个轮询(见 RunningPoller), 每轮只请求一次实例列表.
         """
-        start_time = time()
+        from .running_poller import RunningPoller
 
-        while time() - start_time <= timeout_s:
-
-            self.refresh()
-
-            if self.state == "running":
-                logger.info(f"model: {self.name}, running succeed".center(100, "="))
-                return
-
-            elif self.state == "error":
-                logger.info(f"model: {self.name}, running failed: error".center(100, "="))
-                raise RuntimeError(f"{self.name} running failed, status is error.")
-
-            elif self.state in ["loading", "pending", "analyzing", "scheduled", "starting"]:
-                logger.info(f"model: {self.name}, still {self.state}".center(100, "="))
-                sleep(interval_s)
-                continue
-
-        raise TimeoutError(f"Timeout while waiting for {self.name} running.")
+        RunningPoller.of(self).watch(self, timeout_s, interval_s).result()
 
     # TODO 要感知所在的 gpu 和 worker
     @cached_property
@@ -110,6 +93,12 @@ class ModelInstance(BaseComponent):
     def get_logs(self, timeout=None):
         return self.get("get_logs", timeout=timeout)
 
+    def follow_logs(self, output=None, callbacks=(), tail: int = None, timeout=None) -> "LogFollower":
+        """增量读取日志, 每次只获取新增部分(见 LogFollower)"""
+        from .log_follower import LogFollower
+
+        return LogFollower(self, output, callbacks, tail, timeout)
+
     def stop(self, timeout=None):
         return self.delete("stop", timeout=timeout)
 
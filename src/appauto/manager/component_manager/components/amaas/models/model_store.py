@@ -12,10 +12,8 @@ from appauto.manager.utils_manager.custom_list import CustomList
 class ModelStore(BaseModelStore):
 
     def refresh(self):
-        params = dict(page=1, perPage=100, source="init")
-        res = self.get("get_self", params)
-        self.data = res.data.get("items")
-        return res
+        self.data = list(self.paginate("get_self", dict(source="init"), cache=False))
+        return self.data
 
     @property
     def llm(self) -> CustomList[LLMModelStore]:
@@ -0,0 +1,193 @@
+"""
+批量等待模型 / 模型实例 running.
+
+同一个 AMaaS 地址 & 用户共用一个后台轮询线程: 每一轮只请求一次模型列表和实例列表, 把状态分发给所有等待者,
+终态(running / error / 超时)通过 Future 通知. 轮询间隔从 MIN_INTERVAL 开始, 状态持续处于 loading/analyzing 等
+耗时阶段时逐步退避到 max_interval, 状态变化后恢复为 MIN_INTERVAL, 模型 running 后最多晚 MIN_INTERVAL 秒感知.
+"""
+
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+from appauto.manager.config_manager import LoggingConfig
+from appauto.manager.error_manager.model_store import ModelRunError
+from .model_instance import ModelInstance
+from .base import BaseModel
+from ..records import InstanceRecord, ModelRecord
+
+if TYPE_CHECKING:
+    from ..base_component import BaseComponent
+
+logger = LoggingConfig.get_logger()
+
+
+@dataclass
+class _Watch:
+    obj: Union[BaseModel, ModelInstance]
+    future: Future
+    deadline: float
+    max_interval: float
+    interval: float
+    state: Optional[str] = None
+    next_check: float = field(default_factory=monotonic)
+
+    @property
+    def is_model(self) -> bool:
+        return not isinstance(self.obj, ModelInstance)
+
+
+class RunningPoller:
+    """
+    用法:
+        poller = RunningPoller.of(amaas)
+        futures = [poller.watch(m, timeout_s=1800) for m in models]
+        poller.wait(futures)
+    或直接 model.wait_for_running() / model_instance.wait_for_running(), 多个线程同时等待时自动合并轮询.
+    """
+
+    MIN_INTERVAL = 2.0
+    BACKOFF = 1.5
+    BACKOFF_STATES = ("loading", "analyzing", "downloading")
+
+    _lock = threading.Lock()
+    _pollers: Dict[str, "RunningPoller"] = {}
+
+    def __init__(self, component: "BaseComponent"):
+        self.component = component
+        self.ticks = 0
+        self._watches: List[_Watch] = []
+        self._watches_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def of(cls, component: "BaseComponent") -> "RunningPoller":
+        """同一个 AMaaS 地址 & 用户返回同一个 poller, component 用于发出列表请求"""
+        key = f"{component.url_prefix}@{component.user}"
+        with cls._lock:
+            if (poller := cls._pollers.get(key)) is None:
+                poller = cls._pollers[key] = cls(component)
+            return poller
+
+    def watch(self, obj: Union[BaseModel, ModelInstance], timeout_s: float = 600, max_interval: float = 30) -> Future:
+        """
+        返回 Future: running 时结果为 obj(其 data 已更新), error 时为 ModelRunError(实例为 RuntimeError), 超时为 TimeoutError.
+        """
+        watch = _Watch(
+            obj=obj,
+            future=Future(),
+            deadline=monotonic() + timeout_s,
+            max_interval=max(max_interval, self.MIN_INTERVAL),
+            interval=self.MIN_INTERVAL,
+        )
+        with self._watches_lock:
+            self._watches.append(watch)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="running-poller", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return watch.future
+
+    @staticmethod
+    def wait(futures: List[Future]) -> List:
+        """等待所有 future, 有失败时在全部结束后抛出第一个异常"""
+        errors = [e for fu in futures if (e := fu.exception()) is not None]
+        if errors:
+            raise errors[0]
+        return [fu.result() for fu in futures]
+
+    @staticmethod
+    def _fail(watches: List[_Watch], e: Exception):
+        for w in watches:
+            if not w.future.done():
+                w.future.set_exception(e)
+
+    def _run(self):
+        # 线程意外退出时等待者的 result() 会一直阻塞, 任何异常都要通知到 future
+        try:
+            self._loop()
+        except Exception as e:
+            logger.error(f"running poller stopped unexpectedly: {e}")
+            with self._watches_lock:
+                watches, self._watches, self._thread = self._watches, [], None
+            self._fail(watches, e)
+
+    def _loop(self):
+        while True:
+            self._wakeup.clear()
+            with self._watches_lock:
+                self._watches = [w for w in self._watches if not w.future.done()]
+                if not self._watches:
+                    self._thread = None
+                    return
+                watches = list(self._watches)
+
+            now = monotonic()
+            due = [w for w in watches if w.next_check <= now or w.deadline <= now]
+            if due:
+                try:
+                    self._tick(due)
+                except Exception as e:
+                    logger.error(f"error occurred while dispatching model states: {e}")
+                    self._fail(due, e)
+
+            with self._watches_lock:
+                pending = [w for w in self._watches if not w.future.done()]
+            if pending:
+                wait_s = min(min(w.next_check, w.deadline) for w in pending) - monotonic()
+                self._wakeup.wait(max(wait_s, 0))
+
+    def _fetch(self, due: List[_Watch]):
+        models, instances = {}, {}
+        try:
+            if any(w.is_model for w in due):
+                res = self.component.get(
+                    "get_self", url_map=BaseModel.GET_URL_MAP, encode_result=ModelRecord, cache=False
+                )
+                models = {item.id: item for item in res.data.get("items")}
+            if not all(w.is_model for w in due):
+                items = self.component.paginate(
+                    "get_instances", url_map=ModelInstance.GET_URL_MAP, encode_result=InstanceRecord, cache=False
+                )
+                instances = {item.id: item for item in items}
+        except Exception as e:
+            logger.error(f"error occurred while polling model states: {e}")
+        return models, instances
+
+    def _tick(self, due: List[_Watch]):
+        self.ticks += 1
+        models, instances = self._fetch(due)
+        now = monotonic()
+
+        for w in due:
+            data = (models if w.is_model else instances).get(w.obj.object_id)
+            if data is not None:
+                w.obj.data = data
+                state = data.status if w.is_model else data.state
+
+                if state != w.state:
+                    logger.info(f"model: {w.obj.name}, {w.state} -> {state}".center(100, "="))
+                    w.state = state
+                    w.interval = self.MIN_INTERVAL
+                elif state in self.BACKOFF_STATES:
+                    w.interval = min(w.interval * self.BACKOFF, w.max_interval)
+
+                if state == "running":
+                    logger.info(f"model: {w.obj.name}, running succeed".center(100, "="))
+                    w.future.set_result(w.obj)
+                    continue
+
+                if state == "error":
+                    logger.info(f"model: {w.obj.name}, running failed: error".center(100, "="))
+                    error_cls = ModelRunError if w.is_model else RuntimeError
+                    w.future.set_exception(error_cls(f"{w.obj.name} running failed, status is error."))
+                    continue
+
+            if now >= w.deadline:
+                logger.error(f"Timeout while waiting for {w.obj.name} running.")
+                w.future.set_exception(TimeoutError(f"Timeout while waiting for {w.obj.name} running."))
+                continue
+
+            w.next_check = now + w.interval
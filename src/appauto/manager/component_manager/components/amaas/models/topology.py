@@ -0,0 +1,207 @@
+"""
+集群拓扑快照: worker -> GPU -> 模型实例.
+
+一次并发取回 worker 列表、所有实例和每个 worker 的 GPU 详情, 冻结成不可变、带索引的结构.
+逐层遍历 AMaaS.workers -> Worker.gpus -> GPU.model_instances 时每一步的请求时刻不同, 模型拉起过程中结果会不一致;
+快照内的数据在同一轮请求中取得, 通过 diff(previous) 只关注两次快照之间的变化.
+"""
+
+from dataclasses import dataclass, field
+from time import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple, TYPE_CHECKING
+from .....utils_manager.custom_thread_pool_executor import CustomThreadPoolExecutor
+from .model_instance import ModelInstance
+from .worker import Worker
+from .gpu import GPU
+from ..records import GPURecord, InstanceRecord, WorkerRecord
+
+if TYPE_CHECKING:
+    from ..amaas import AMaaS
+
+GPUKey = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class WorkerInfo:
+    id: int
+    name: str
+    gpu_sum: int
+    gpu_empty_count: int
+    gpu_total_vram: int
+    gpu_empty_vram: int
+
+
+@dataclass(frozen=True)
+class GPUInfo:
+    worker_name: str
+    index: int
+    gpu_id: str
+    name: str
+    memory_total: Optional[int]
+    memory_used: Optional[int]
+    instance_names: Tuple[str, ...]
+
+    @property
+    def key(self) -> GPUKey:
+        return self.worker_name, self.index
+
+
+@dataclass(frozen=True)
+class InstanceInfo:
+    id: int
+    name: str
+    model_id: int
+    model_name: str
+    state: str
+    worker_name: str
+    gpu_indexes: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class TopologyDiff:
+    started: Tuple[InstanceInfo, ...] = ()
+    stopped: Tuple[InstanceInfo, ...] = ()
+    # (实例名称, 之前的状态, 当前状态)
+    state_changed: Tuple[Tuple[str, str, str], ...] = ()
+    # 显存使用量变化, 只包含有变化的 GPU
+    vram_deltas: Mapping[GPUKey, int] = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.started or self.stopped or self.state_changed or self.vram_deltas)
+
+    def __str__(self):
+        return (
+            f"TopologyDiff(started: {[i.name for i in self.started]}, stopped: {[i.name for i in self.stopped]}, "
+            f"state_changed: {list(self.state_changed)}, vram_deltas: {dict(self.vram_deltas)})"
+        )
+
+
+@dataclass(frozen=True)
+class TopologySnapshot:
+    """
+    用法:
+        prev = amaas.topology()
+        while True:
+            cur = amaas.topology()
+            if diff := cur.diff(prev):
+                logger.info(diff)
+            prev = cur
+    """
+
+    taken_at: float
+    elapsed: float
+    workers: Mapping[str, WorkerInfo]
+    gpus: Mapping[GPUKey, GPUInfo]
+    instances: Mapping[str, InstanceInfo]
+    instances_on_gpu: Mapping[GPUKey, Tuple[str, ...]]
+
+    @classmethod
+    def take(cls, amaas: "AMaaS", concurrency: int = 8) -> "TopologySnapshot":
+        start = time()
+
+        with CustomThreadPoolExecutor(max_workers=concurrency) as executor:
+            fu_instances = executor.submit(
+                lambda: list(
+                    amaas.paginate(
+                        "get_instances", url_map=ModelInstance.GET_URL_MAP, encode_result=InstanceRecord, cache=False
+                    )
+                )
+            )
+            res_workers = amaas.get("get_self", url_map=Worker.GET_URL_MAP, encode_result=WorkerRecord, cache=False)
+            workers = res_workers.data.worker_resource_list
+
+            fu_gpus = {
+                w.name: executor.submit(
+                    amaas.post,
+                    "detail",
+                    json_data={"worker_id": str(w.id)},
+                    url_map=GPU.POST_URL_MAP,
+                    encode_result=GPURecord,
+                )
+                for w in workers
+            }
+            instances = fu_instances.result()
+            res_gpus = {name: fu.result() for name, fu in fu_gpus.items()}
+
+        worker_infos = {
+            w.name: WorkerInfo(w.id, w.name, w.gpu_sum, w.gpu_empty_count, w.gpu_total_vram, w.gpu_empty_vram)
+            for w in workers
+        }
+
+        gpu_infos: Dict[GPUKey, GPUInfo] = {}
+        for worker_name, res in res_gpus.items():
+            for gpu in (res.data.get(worker_name) or {}).values():
+                memory = gpu.memory or {}
+                info = GPUInfo(
+                    worker_name=worker_name,
+                    index=int(gpu.index),
+                    gpu_id=gpu.gpu_id,
+                    name=gpu.name,
+                    memory_total=memory.get("total"),
+                    memory_used=memory.get("used"),
+                    instance_names=tuple(item.name for item in gpu.model_instances or []),
+                )
+                gpu_infos[info.key] = info
+
+        instance_infos: Dict[str, InstanceInfo] = {}
+        instances_on_gpu: Dict[GPUKey, Tuple[str, ...]] = {}
+        for item in instances:
+            info = InstanceInfo(
+                id=item.id,
+                name=item.name,
+                model_id=item.model_id,
+                model_name=item.model_name,
+                state=item.state,
+                worker_name=item.worker_name,
+                gpu_indexes=tuple(int(str(g).split(":")[-1]) for g in item.gpu_indexes or []),
+            )
+            instance_infos[info.name] = info
+            for gpu_index in info.gpu_indexes:
+                key = (info.worker_name, gpu_index)
+                instances_on_gpu[key] = instances_on_gpu.get(key, ()) + (info.name,)
+
+        return cls(
+            taken_at=start,
+            elapsed=time() - start,
+            workers=MappingProxyType(worker_infos),
+            gpus=MappingProxyType(gpu_infos),
+            instances=MappingProxyType(instance_infos),
+            instances_on_gpu=MappingProxyType(instances_on_gpu),
+        )
+
+    def __str__(self):
+        return (
+            f"TopologySnapshot(workers: {len(self.workers)}, gpus: {len(self.gpus)}, "
+            f"instances: {len(self.instances)}, elapsed: {self.elapsed:.3f}s)"
+        )
+
+    def instances_of_gpu(self, worker_name: str, gpu_index: int) -> Tuple[InstanceInfo, ...]:
+        return tuple(self.instances[n] for n in self.instances_on_gpu.get((worker_name, int(gpu_index)), ()))
+
+    def instances_of_worker(self, worker_name: str) -> Tuple[InstanceInfo, ...]:
+        return tuple(i for i in self.instances.values() if i.worker_name == worker_name)
+
+    def gpus_of_instance(self, name: str) -> Tuple[GPUInfo, ...]:
+        ins = self.instances[name]
+        return tuple(self.gpus[key] for g in ins.gpu_indexes if (key := (ins.worker_name, g)) in self.gpus)
+
+    def diff(self, previous: "TopologySnapshot") -> TopologyDiff:
+        """相对 previous 的变化: 新增 / 消失的实例, 状态变化的实例, 显存使用量变化的 GPU"""
+        cur, prev = self.instances, previous.instances
+
+        vram_deltas = {}
+        for key, gpu in self.gpus.items():
+            if (old := previous.gpus.get(key)) is None or gpu.memory_used is None or old.memory_used is None:
+                continue
+            if delta := gpu.memory_used - old.memory_used:
+                vram_deltas[key] = delta
+
+        return TopologyDiff(
+            started=tuple(cur[n] for n in cur.keys() - prev.keys()),
+            stopped=tuple(prev[n] for n in prev.keys() - cur.keys()),
+            state_changed=tuple(
+                (n, prev[n].state, cur[n].state) for n in cur.keys() & prev.keys() if cur[n].state != prev[n].state
+            ),
+            vram_deltas=MappingProxyType(vram_deltas),
+        )
@@ -1,8 +1,9 @@
-from typing import List, Dict, TYPE_CHECKING
+from typing import List, Dict, Optional, TYPE_CHECKING
 from .....utils_manager.custom_list import CustomList
 from ..base_component import BaseComponent
 from .gpu import GPU
-
+from ..records import GPURecord
+from .instance_index import InstanceIndex
 
 if TYPE_CHECKING:
     from .model_instance import ModelInstance
@@ -26,10 +27,18 @@ class Worker(BaseComponent):
     @property
     def gpus(self, timeout=None) -> CustomList[GPU]:
         data = {"worker_id": str(self.object_id)}
-        res = self.post("detail", json_data=data, url_map=GPU.POST_URL_MAP, timeout=timeout)
+        res = self.post("detail", json_data=data, url_map=GPU.POST_URL_MAP, timeout=timeout, encode_result=GPURecord)
         return CustomList(
             [
-                GPU(self.mgt_ip, self.port, object_id=inner_dict.gpu_id, data=inner_dict, idx=idx, worker=self)
+                GPU(
+                    self.mgt_ip,
+                    self.port,
+                    object_id=inner_dict.gpu_id,
+                    data=inner_dict,
+                    amaas=self.amaas,
+                    idx=idx,
+                    worker=self,
+                )
                 for idx, inner_dict in res.data.get(self.name).items()
             ]
         )
@@ -74,50 +83,45 @@ class Worker(BaseComponent):
     def model_instances(self) -> List[Dict]:
         return self.data.model_instances
 
+    def instance_index(self) -> "InstanceIndex":
+        """所有模型实例的索引(一次批量请求), 每次调用都重新获取, 与 amaas.instance_index() 相同"""
+        return InstanceIndex(self.amaas)
+
+    def instances_obj(self, category: str = None, index: "InstanceIndex" = None) -> CustomList["ModelInstance"]:
+        """
+        当前 worker 上的模型实例, category 为 InstanceIndex.CATEGORIES 之一, 不指定时返回全部.
+        index: 复用已经获取的索引, 不指定时重新获取
+        """
+        index = self.instance_index() if index is None else index
+        return index.of_names([item.name for item in self.model_instances or []], category)
+
+    def _category_instances_obj(self, category: str) -> Optional[CustomList["ModelInstance"]]:
+        # 与逐个模型查询时一致: 该类别没有任何实例时为 None
+        index = self.instance_index()
+        if not index.of_category(category):
+            return None
+        return self.instances_obj(category, index)
+
     @property
-    def llm_instances_obj(self) -> CustomList["ModelInstance"]:
-        if llm_models := self.amaas.model.llm:
-            if llm_instances := [ins for llm in llm_models for ins in llm.instances]:
-                return CustomList(
-                    [ins for ins in llm_instances if ins.name in [item.name for item in self.model_instances]]
-                )
+    def llm_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("llm")
 
     @property
-    def embedding_instances_obj(self) -> CustomList["ModelInstance"]:
-        if embedding_models := self.amaas.model.embedding:
-            if embedding_instances := [ins for embedding in embedding_models for ins in embedding.instances]:
-                return CustomList(
-                    [ins for ins in embedding_instances if ins.name in [item.name for item in self.model_instances]]
-                )
+    def embedding_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("embedding")
 
     @property
-    def rerank_instances_obj(self) -> CustomList["ModelInstance"]:
-        if rerank_models := self.amaas.model.rerank:
-            if rerank_instances := [ins for rerank in rerank_models for ins in rerank.instances]:
-                return CustomList(
-                    [ins for ins in rerank_instances if ins.name in [item.name for item in self.model_instances]]
-                )
+    def rerank_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("rerank")
 
     @property
-    def parser_instances_obj(self) -> CustomList["ModelInstance"]:
-        if parser_models := self.amaas.model.parser:
-            if parser_instances := [ins for parser in parser_models for ins in parser.instances]:
-                return CustomList(
-                    [ins for ins in parser_instances if ins.name in [item.name for item in self.model_instances]]
-                )
+    def parser_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("parser")
 
     @property
-    def vlm_instances_obj(self) -> CustomList["ModelInstance"]:
-        if vlm_models := self.amaas.model.vlm:
-            if vlm_instances := [ins for vlm in vlm_models for ins in vlm.instances]:
-                return CustomList(
-                    [ins for ins in vlm_instances if ins.name in [item.name for item in self.model_instances]]
-                )
+    def vlm_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("vlm")
 
     @property
-    def audio_instances_obj(self) -> CustomList["ModelInstance"]:
-        if audio_models := self.amaas.model.audio:
-            if audio_instances := [ins for audio in audio_models for ins in audio.instances]:
-                return CustomList(
-                    [ins for ins in audio_instances if ins.name in [item.name for item in self.model_instances]]
-                )
+    def audio_instances_obj(self) -> Optional[CustomList["ModelInstance"]]:
+        return self._category_instances_obj("audio")
@@ -0,0 +1,238 @@
+"""
+AMaaS 列表接口的紧凑 record.
+
+HttpClient.encode_result 会把整个响应递归转换成 addict.Dict, 列表接口(模型 / 实例 / worker / GPU)和 embedding 响应中
+每个元素、每个嵌套的 dict/list 都要复制一份. record 只用 __slots__ 保存 json.loads 得到的原始 dict,
+字段在访问时才取值, 嵌套的 dict/list 在第一次访问时才转换成 addict 并缓存.
+
+record 兼容 addict 的常用用法(属性访问 / [] / get / 缺失字段返回空 Dict), 作为 component 的 data 使用时无需改动属性代码.
+record 不是 dict 的子类: isinstance(x, dict) / addict.Dict(x) 需要先 to_dict(), json.dumps 时传 default=json_default.
+
+用法:
+    res = self.get("get_self", url_map=Model.GET_URL_MAP, encode_result=ModelRecord)
+    res.data.get("items")  # List[ModelRecord]
+"""
+
+import json
+from array import array
+from typing import Any, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+import addict
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class Field(Generic[T]):
+    """record 的字段, 访问时从原始 dict 中取值"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str = None):
+        self.key = key
+
+    def __set_name__(self, owner, name):
+        self.key = self.key or name
+
+    def __get__(self, instance: Optional["Record"], owner) -> T:
+        if instance is None:
+            return self
+        return instance[self.key]
+
+
+class Record:
+    """
+    PATH: 响应中需要解析为 record 的位置. 终点是 list 时解析每个元素, 是 dict 时解析每个 value; "*" 表示 dict 的每个 value.
+    """
+
+    __slots__ = ("_raw", "_nested")
+
+    PATH: Tuple[str, ...] = ("data", "items")
+
+    def __init__(self, raw: Dict[str, Any]):
+        object.__setattr__(self, "_raw", raw)
+        object.__setattr__(self, "_nested", None)
+
+    @classmethod
+    def fields(cls) -> Tuple[str, ...]:
+        return tuple(name for klass in reversed(cls.__mro__) for name, v in vars(klass).items() if isinstance(v, Field))
+
+    @classmethod
+    def decode(cls, text: str):
+        """解析响应文本, PATH 处的元素解析为 record, 外层结构仍然是 addict.Dict"""
+        data = json.loads(text)
+        data = cls._wrap(data, cls.PATH)
+        return addict.Dict(data) if isinstance(data, dict) else data
+
+    @classmethod
+    def _wrap(cls, node, path: Tuple[str, ...]):
+        if not path:
+            if isinstance(node, list):
+                return [cls(item) if isinstance(item, dict) else item for item in node]
+            if isinstance(node, dict):
+                return {k: cls(v) if isinstance(v, dict) else v for k, v in node.items()}
+            return node
+
+        if not isinstance(node, dict):
+            return node
+
+        key, rest = path[0], path[1:]
+        if key == "*":
+            return {k: cls._wrap(v, rest) for k, v in node.items()}
+        if key in node:
+            node = dict(node)
+            node[key] = cls._wrap(node[key], rest)
+        return node
+
+    def __getitem__(self, key: str):
+        value = self._raw.get(key, _MISSING)
+        if value is _MISSING:
+            return addict.Dict()
+        if not isinstance(value, (dict, list)):
+            return value
+
+        nested = self._nested
+        if nested is None:
+            nested = {}
+            object.__setattr__(self, "_nested", nested)
+        if key not in nested:
+            nested[key] = addict.Dict._hook(value)
+        return nested[key]
+
+    def __getattr__(self, name: str):
+        # 只有未声明为 Field 的字段会走到这里
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __setattr__(self, name: str, value):
+        self[name] = value
+
+    def __setitem__(self, key: str, value):
+        self._raw[key] = value
+        if self._nested:
+            self._nested.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._raw == other._raw
+        return self._raw == other
+
+    def __repr__(self):
+        shown = ", ".join(f"{name}={self._raw.get(name)!r}" for name in self.fields() if name in self._raw)
+        return f"{type(self).__name__}({shown})"
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self._raw else default
+
+    def keys(self):
+        return self._raw.keys()
+
+    def values(self):
+        return [self[k] for k in self._raw]
+
+    def items(self):
+        return [(k, self[k]) for k in self._raw]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """原始 dict, 需要真正的 dict 时使用(序列化 / isinstance / addict.Dict)"""
+        return self._raw
+
+
+def json_default(obj):
+    """json.dumps 的 default, record 序列化为原始 dict, 其他无法序列化的对象转为 str"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    return str(obj)
+
+
+class ModelRecord(Record):
+    """GET /v1/kllm/models"""
+
+    __slots__ = ()
+
+    id: int = Field()
+    name: str = Field()
+    display_model_name: str = Field()
+    categories: list = Field()
+    model_store_id: int = Field()
+    replicas: int = Field()
+    ready_replicas: int = Field()
+    backend_type: str = Field()
+
+
+class InstanceRecord(Record):
+    """GET /v1/kllm/model-instances, /v1/kllm/models/{model_id}/instances"""
+
+    __slots__ = ()
+
+    id: int = Field()
+    name: str = Field()
+    state: str = Field()
+    model_id: int = Field()
+    model_name: str = Field()
+    worker_id: int = Field()
+    worker_name: str = Field()
+    worker_ip: str = Field()
+    gpu_indexes: list = Field()
+    port: int = Field()
+
+
+class WorkerRecord(Record):
+    """GET /v1/kllm/workers/get_resource_list"""
+
+    __slots__ = ()
+
+    PATH = ("data", "worker_resource_list")
+
+    id: int = Field()
+    name: str = Field()
+    gpu_sum: int = Field()
+    gpu_empty_count: int = Field()
+    gpu_total_vram: int = Field()
+    gpu_empty_vram: int = Field()
+    model_instances: list = Field()
+
+
+class GPURecord(Record):
+    """POST /v1/kllm/gpu-devices/detail, 响应为 {worker_name: {idx: gpu}}"""
+
+    __slots__ = ()
+
+    PATH = ("data", "*")
+
+    gpu_id: str = Field()
+    name: str = Field()
+    index: int = Field()
+    uuid: str = Field()
+    vendor: str = Field()
+    memory: dict = Field()
+    model_instances: list = Field()
+
+
+class EmbeddingVector(Record):
+    """POST /v1/embeddings 的 data 中的每个元素"""
+
+    __slots__ = ()
+
+    PATH = ("data",)
+
+    index: int = Field()
+    object: str = Field()
+
+    @property
+    def embedding(self) -> list:
+        """原始的 float 列表, 不做 addict 转换和复制"""
+        return self._raw.get("embedding")
+
+    def as_array(self) -> array:
+        return array("d", self._raw.get("embedding") or ())
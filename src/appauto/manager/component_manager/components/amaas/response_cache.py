@@ -0,0 +1,162 @@
+"""
+AMaaS 控制面 GET 请求的 TTL 缓存.
+
+同一个 AMaaS 及其子对象(见 BaseComponent.login_owner)共用一个缓存. 缓存默认关闭, 通过 AMaaS.enable_cache() 开启.
+- 每个 GET 接口(按 url_map 中的模板区分)有自己的 TTL, TTL 为 0 的接口不缓存;
+- 通过 BaseComponent 发出的 POST/DELETE 会让受影响的集合失效, 未登记的写操作让整个缓存失效;
+- refresh() 总是绕过缓存, 等待状态变化的轮询不受影响.
+"""
+
+import threading
+from time import monotonic
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+# 模型拉起 / 停止 / 扩缩副本会影响的集合
+MODEL_COLLECTIONS = (
+    "/v1/kllm/models",
+    "/v1/kllm/models/{model_id}/instances",
+    "/v1/kllm/model-instances",
+    "/v1/kllm/model-instances/{model_instance_id}",
+    "/v1/kllm/workers/get_resource_list",
+    "/v1/models",
+)
+
+
+class ResponseCache:
+    DEFAULT_TTLS: Dict[str, float] = {
+        "/v1/kllm/model-store": 300,
+        "/v1/kllm/models": 5,
+        "/v1/kllm/models/{model_id}/instances": 5,
+        "/v1/kllm/model-instances": 5,
+        "/v1/kllm/model-instances/{model_instance_id}": 5,
+        "/v1/kllm/workers/get_resource_list": 5,
+        "/v1/models": 10,
+        "/v1/kllm/api-keys": 60,
+        "/v1/kllm/users": 60,
+    }
+
+    # 只读的 POST, 不会让缓存失效
+    READONLY_WRITES = (
+        "/v1/kllm/model-store/check",
+        "/v1/kllm/model-store/get_run_rule",
+        "/v1/kllm/gpu-devices/detail",
+        "/v1/chat/completions",
+        "/v1/embeddings",
+        "/v1/kllm/embedding/compute_similarity",
+        "/v1/rerank",
+    )
+
+    DEFAULT_INVALIDATION_RULES: Dict[str, Tuple[str, ...]] = {
+        "/v1/kllm/model-store/run": MODEL_COLLECTIONS,
+        "/v1/kllm/models/create-replica": MODEL_COLLECTIONS,
+        "/v1/kllm/models/{model_id}": MODEL_COLLECTIONS,
+        "/v1/kllm/model-instances/{model_instance_id}": MODEL_COLLECTIONS,
+        "/v1/kllm/api-keys": ("/v1/kllm/api-keys",),
+        "/v1/kllm/api-keys/{api_key}": ("/v1/kllm/api-keys",),
+        "/v1/kllm/users": ("/v1/kllm/users",),
+        "/v1/kllm/users/{user_id}": ("/v1/kllm/users",),
+    }
+
+    _lock = threading.Lock()
+    _caches: Dict[str, "ResponseCache"] = {}
+
+    def __init__(self, name: str = None):
+        self.name = name
+        self.enabled = False
+        self.ttls = dict(self.DEFAULT_TTLS)
+        self.rules = dict(self.DEFAULT_INVALIDATION_RULES)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: Dict[str, Dict[Tuple, Tuple[float, str]]] = {}
+        self._entries_lock = threading.Lock()
+
+    def __str__(self):
+        return f"ResponseCache({self.name}, enabled: {self.enabled}, hits: {self.hits}, misses: {self.misses})"
+
+    @classmethod
+    def of(cls, url_prefix: str) -> "ResponseCache":
+        """同一个 AMaaS 地址返回同一个缓存"""
+        with cls._lock:
+            if (cache := cls._caches.get(url_prefix)) is None:
+                cache = cls._caches[url_prefix] = cls(url_prefix)
+            return cache
+
+    def enable(self, ttls: Dict[str, float] = None):
+        """ttls: 覆盖默认 TTL, key 为 url_map 中的 url 模板, 比如 {"/v1/kllm/models": 10}"""
+        self.ttls.update(ttls or {})
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.invalidate()
+
+    def set_ttl(self, template: str, ttl: float):
+        self.ttls[template] = ttl
+
+    def add_rule(self, write_template: str, collections: Iterable[str]):
+        """登记写操作会影响的集合(GET url 模板)"""
+        self.rules[write_template] = tuple(collections)
+
+    @staticmethod
+    def gen_key(url: str, params: Optional[Dict]) -> Tuple:
+        return url, tuple(sorted((params or {}).items()))
+
+    def get_or_fetch(self, template: str, url: str, params: Optional[Dict], fetch: Callable[[], str]) -> str:
+        """
+        fetch 返回响应文本. TTL 内直接返回缓存的文本, 否则调用 fetch 并缓存.
+        """
+        ttl = self.ttls.get(template, 0)
+        if not self.enabled or ttl <= 0:
+            return fetch()
+
+        key = self.gen_key(url, params)
+        now = monotonic()
+
+        with self._entries_lock:
+            entry = self._entries.get(template, {}).get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        text = fetch()
+
+        with self._entries_lock:
+            self._entries.setdefault(template, {})[key] = (monotonic() + ttl, text)
+
+        return text
+
+    def invalidate(self, *templates: str):
+        """使指定集合失效, 不指定时清空整个缓存"""
+        with self._entries_lock:
+            self.invalidations += 1
+            if not templates:
+                self._entries.clear()
+                return
+            for template in templates:
+                self._entries.pop(template, None)
+
+    def on_write(self, write_template: str):
+        """POST/DELETE 之后调用"""
+        if not self.enabled or write_template in self.READONLY_WRITES:
+            return
+
+        if (collections := self.rules.get(write_template)) is None:
+            logger.debug(f"unregistered write {write_template}, invalidate all cached responses")
+            self.invalidate()
+        else:
+            self.invalidate(*collections)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=round(self.hits / total, 4) if total else 0.0,
+            invalidations=self.invalidations,
+            entries=sum(len(v) for v in self._entries.values()),
+        )
@@ -1,5 +1,7 @@
 import abc
-from typing import Literal
+from functools import cached_property
+from typing import Literal, Optional
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
 from ...base_component import BaseComponent
 
 
@@ -15,6 +17,56 @@ class BaseScene(BaseComponent):
         rerank="/v1/rerank",  # rerank
     )
 
+    def __init__(self, *args, api_key: Optional[str] = None, **kwargs):
+        """api_key: 指定时推理请求使用该 API 密钥认证(按密钥计量/限流), 否则使用登录用户的 token"""
+        super().__init__(*args, **kwargs)
+        self.api_key = api_key
+
+    @property
+    def breaker_scope(self) -> str:
+        """网关下所有模型共用推理路径, 按模型熔断"""
+        return self.object_id
+
+    @property
+    def headers(self):
+        if self.api_key:
+            return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        return super().headers
+
+    # 使用 api_key 时 client 不登记到 token_manager, 刷新登录用户的 token 不会把其认证头合并进来
+    def _api_key_client(self, headers, is_async=False):
+        return HttpPoolRegistry.client(
+            self.url_prefix, headers, identity="api_key", is_async=is_async, breaker_scope=self.breaker_scope
+        )
+
+    @cached_property
+    def http(self):
+        return self._api_key_client(self.headers) if self.api_key else super().http
+
+    @cached_property
+    def http_with_file(self):
+        if self.api_key:
+            return self._api_key_client({"Authorization": f"Bearer {self.api_key}"})
+        return super().http_with_file
+
+    @property
+    def async_http(self):
+        if self.api_key:
+            return self._async_client("async_http", lambda: self._api_key_client(self.headers, is_async=True))
+        return super().async_http
+
+    @property
+    def async_http_with_file(self):
+        if self.api_key:
+            headers = {"Authorization": f"Bearer {self.api_key}"}
+            return self._async_client("async_http_with_file", lambda: self._api_key_client(headers, is_async=True))
+        return super().async_http_with_file
+
+    def refresh_token(self, stale=None):
+        # api_key 收到 401 时重新登录没有意义
+        if not self.api_key:
+            super().refresh_token(stale)
+
     @property
     def created(self):
         return self.data.created
@@ -1,9 +1,22 @@
 from typing import Literal, List, Union
 from .base import BaseScene
+from ..records import EmbeddingVector
 
 
 class Embedding(BaseScene):
 
+    def _gen_data(self, content: Union[List, str], model: str, encoding_format: str, dimensions: int) -> dict:
+        return {
+            "input": content if isinstance(content, list) else [content],
+            "model": model or self.object_id,
+            "encoding_format": encoding_format,
+            "dimensions": dimensions,
+        }
+
+    @staticmethod
+    def _sorted_vectors(res) -> List[List]:
+        return [in_d.embedding for in_d in sorted(res.data, key=lambda in_d: in_d.index)]
+
     def talk(
         self,
         content: Union[List, str],
@@ -13,22 +26,33 @@ class Embedding(BaseScene):
         compute_similarity=True,
         timeout=None,
     ):
-        data = {
-            "input": content if isinstance(content, list) else [content],
-            "model": model or self.object_id,
-            "encoding_format": encoding_format,
-            "dimensions": dimensions,
-        }
+        data = self._gen_data(content, model, encoding_format, dimensions)
 
-        res = self.post("embedding", json_data=data, timeout=timeout, encode_result=True)
+        res = self.post("embedding", json_data=data, timeout=timeout, encode_result=EmbeddingVector)
 
         if compute_similarity:
-            num = len(res.data)
-            vectors = []
-            for i in range(num):
-                vectors.append([in_d.embedding for in_d in res.data if in_d.index == i][0])
+            vectors = self._sorted_vectors(res)
+            res = self.compute_similarity(len(vectors), vectors, timeout)
+
+        return res
 
-            res = self.compute_similarity(num, vectors, timeout)
+    async def atalk(
+        self,
+        content: Union[List, str],
+        model: str = None,
+        encoding_format: Literal["float", "base64"] = "float",
+        dimensions: int = 0,
+        compute_similarity=True,
+        timeout=None,
+    ):
+        """talk 的异步版本"""
+        data = self._gen_data(content, model, encoding_format, dimensions)
+
+        res = await self.apost("embedding", json_data=data, timeout=timeout, encode_result=EmbeddingVector)
+
+        if compute_similarity:
+            vectors = self._sorted_vectors(res)
+            res = await self.acompute_similarity(len(vectors), vectors, timeout)
 
         return res
 
@@ -36,3 +60,8 @@ class Embedding(BaseScene):
         data = {"num": num, "dimension": 1024, "vectors": vectors}
 
         return self.post("embedding_compute_similarity", json_data=data, timeout=timeout, encode_result=True)
+
+    async def acompute_similarity(self, num: int, vectors: List[List], timeout=None):
+        data = {"num": num, "dimension": 1024, "vectors": vectors}
+
+        return await self.apost("embedding_compute_similarity", json_data=data, timeout=timeout, encode_result=True)
@@ -1,8 +1,42 @@
-from typing import Literal
+from time import perf_counter
+from typing import Optional
 from .base import BaseScene
+from .....connection_manager.payload import PayloadTemplate
 
 
 class LLM(BaseScene):
+    def _gen_data(self, content: str, model: str, stream: bool, temperature, max_tokens, top_p) -> dict:
+        data = {
+            "messages": [{"content": content, "role": "user"}],
+            "model": model or self.object_id,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": stream,
+        }
+        if max_tokens:
+            data["max_tokens"] = max_tokens
+
+        return data
+
+    def _gen_body(self, payload: Optional[bytes], *args) -> dict:
+        """请求参数: 预先序列化的 payload 通过 content 发送, 否则由 httpx 编码 json"""
+        if payload is not None:
+            return dict(content=payload)
+        return dict(json_data=self._gen_data(*args))
+
+    def chat_template(
+        self,
+        content: str,
+        model: str = None,
+        stream=True,
+        temperature=1,
+        max_tokens=1024,
+        top_p=1,
+        variables=PayloadTemplate.DEFAULT_VARIABLES,
+    ) -> PayloadTemplate:
+        """预先序列化的 chat 请求体, 配合 talk(payload=template.render(seed=i)) 使用"""
+        return PayloadTemplate(self._gen_data(content, model, stream, temperature, max_tokens, top_p), variables)
+
     def talk(
         self,
         content: str,
@@ -14,27 +48,69 @@ class LLM(BaseScene):
         timeout=None,
         process_stream=True,
         encode_result=False,
+        return_metrics=False,
+        payload: bytes = None,
     ):
         """
         model: 模型名称, 不指定则为自己;
         process_stream: 获取原始 stream or 对应的文本内容
         encode_result: 当指定 stream=False 时, 可以设置 encode_result=True, 此时可以获取文本.
+        return_metrics: stream 且 process_stream 时返回 StreamResult(文本 + TTFT/ITL 等时间指标)
+        payload: 预先序列化的请求体(见 chat_template), 指定后直接发送, 忽略 content/model 等参数, stream 需与之一致
         """
-        data = {
-            "messages": [{"content": content, "role": "user"}],
-            "model": model or self.object_id,
-            "temperature": temperature,
-            "top_p": top_p,
-            "stream": stream,
-        }
-        if max_tokens:
-            data["max_tokens"] = max_tokens
+        body = self._gen_body(payload, content, model, stream, temperature, max_tokens, top_p)
 
         process_stream = process_stream if stream else False
         encode_result = False if stream else encode_result
 
         if stream:
-            with self.post("llm_vlm", stream=stream, json_data=data, timeout=timeout) as res:
-                return self.http.process_stream_amaas(res) if process_stream else res
+            start = perf_counter()
+            with self.post("llm_vlm", stream=stream, **body, timeout=timeout) as res:
+                if not process_stream:
+                    return res
+                return self.http.process_stream_amaas(res, return_metrics=return_metrics, start=start)
+
+        return self.post("llm_vlm", **body, timeout=timeout, stream=stream, encode_result=encode_result)
+
+    async def atalk(
+        self,
+        content: str,
+        model: str = None,
+        stream=True,
+        temperature=1,
+        max_tokens=1024,
+        top_p=1,
+        timeout=None,
+        encode_result=False,
+        return_metrics=False,
+        payload: bytes = None,
+    ):
+        """
+        talk 的异步版本. stream=True 时返回文本内容(原始 stream 离开 async with 后不可用, 因此不支持 process_stream=False)
+        """
+        body = self._gen_body(payload, content, model, stream, temperature, max_tokens, top_p)
+
+        if stream:
+            start = perf_counter()
+            async with self.apost("llm_vlm", stream=True, **body, timeout=timeout) as res:
+                return await self.async_http.process_stream_amaas(res, return_metrics=return_metrics, start=start)
+
+        return await self.apost("llm_vlm", **body, timeout=timeout, encode_result=encode_result)
+
+    def probe_ttft(self, content: str, model: str = None, max_tokens=1024, timeout=None) -> Optional[float]:
+        """
+        只测 TTFT: 收到第一个内容 chunk 后立即断开 stream, 服务端随之中止请求.
+        """
+        data = self._gen_data(content, model, True, 1, max_tokens, 1)
+
+        start = perf_counter()
+        with self.post("llm_vlm", stream=True, json_data=data, timeout=timeout) as res:
+            return self.http.process_stream_ttft(res, start)
+
+    async def aprobe_ttft(self, content: str, model: str = None, max_tokens=1024, timeout=None) -> Optional[float]:
+        """probe_ttft 的异步版本"""
+        data = self._gen_data(content, model, True, 1, max_tokens, 1)
 
-        return self.post("llm_vlm", json_data=data, timeout=timeout, stream=stream, encode_result=encode_result)
+        start = perf_counter()
+        async with self.apost("llm_vlm", stream=True, json_data=data, timeout=timeout) as res:
+            return await self.async_http.process_stream_ttft(res, start)
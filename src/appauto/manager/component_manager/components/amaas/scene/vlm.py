@@ -1,4 +1,5 @@
 from pathlib import Path
+from time import perf_counter
 from .base import BaseScene
 
 
@@ -38,18 +39,7 @@ class VLM(BaseScene):
         except Exception as e:
             raise RuntimeError(f"转换过程中发生错误: {str(e)}")
 
-    def talk(
-        self,
-        text: str = "请解释这张图",
-        image_path: str = None,
-        stream=True,
-        max_tokens: int = 1024,
-        top_p: int = 1,
-        model: str = None,
-        timeout=None,
-        encode_result=False,
-        process_stream=True,
-    ):
+    def _gen_data(self, text: str, image_path: str, stream: bool, max_tokens, top_p, model: str) -> dict:
         image_path = image_path or self.DEFAULT_IMAGE
         assert image_path
 
@@ -77,11 +67,61 @@ class VLM(BaseScene):
         if max_tokens:
             data["max_tokens"] = max_tokens
 
+        return data
+
+    def talk(
+        self,
+        text: str = "请解释这张图",
+        image_path: str = None,
+        stream=True,
+        max_tokens: int = 1024,
+        top_p: int = 1,
+        model: str = None,
+        timeout=None,
+        encode_result=False,
+        process_stream=True,
+        return_metrics=False,
+    ):
+        """
+        return_metrics: stream 且 process_stream 时返回 StreamResult(包含文本和 TTFT/ITL 等时间指标)
+        """
+        data = self._gen_data(text, image_path, stream, max_tokens, top_p, model)
+
         process_stream = process_stream if stream else False
         encode_result = False if stream else encode_result
 
         if stream:
+            start = perf_counter()
             with self.post("llm_vlm", stream=True, json_data=data, timeout=timeout) as res:
-                return self.http.process_stream_amaas(res, process_chunk=False) if process_stream else res
+                if not process_stream:
+                    return res
+                # 统计时间指标需要逐 chunk 解析
+                return self.http.process_stream_amaas(
+                    res, process_chunk=return_metrics, return_metrics=return_metrics, start=start
+                )
 
         return self.post("llm_vlm", json_data=data, timeout=timeout, stream=False, encode_result=encode_result)
+
+    async def atalk(
+        self,
+        text: str = "请解释这张图",
+        image_path: str = None,
+        stream=True,
+        max_tokens: int = 1024,
+        top_p: int = 1,
+        model: str = None,
+        timeout=None,
+        encode_result=False,
+        return_metrics=False,
+    ):
+        """talk 的异步版本"""
+        data = self._gen_data(text, image_path, stream, max_tokens, top_p, model)
+
+        if stream:
+            start = perf_counter()
+            async with self.apost("llm_vlm", stream=True, json_data=data, timeout=timeout) as res:
+                return await self.async_http.process_stream_amaas(
+                    res, process_chunk=return_metrics, return_metrics=return_metrics, start=start
+                )
+
+        return await self.apost("llm_vlm", json_data=data, timeout=timeout, encode_result=encode_result)
@@ -0,0 +1,120 @@
+"""
+AMaaS access token 管理.
+
+同一个 AMaaS 及其子对象(见 BaseComponent.login_owner)共用一个 token:
+- 从 token(JWT) 中解析过期时间, 解析不到时按登录时间 + LIFETIME 估算, 在过期前 REFRESH_AHEAD 秒主动刷新;
+- 刷新是 single-flight 的, 多个线程同时发现需要刷新时只登录一次;
+- 刷新后把新的认证头整体替换进所有登记过的 client, 正在发出的请求要么用旧 token, 要么用新 token, 不会读到一半.
+收到 401 时仍然走 invalidate 兜底.
+"""
+
+import json
+import base64
+import threading
+import weakref
+from time import monotonic, time
+from typing import Dict, Optional, Tuple
+from appauto.manager.connection_manager.http import HttpClient
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+
+class TokenManager:
+    LIFETIME = 1800
+    REFRESH_AHEAD = 60
+
+    _lock = threading.Lock()
+    _managers: Dict[Tuple[str, str, str], "TokenManager"] = {}
+
+    def __init__(self, url_prefix: str, username: str, passwd: str):
+        self.url_prefix = url_prefix
+        self.username = username
+        self.passwd = passwd
+        self.refresh_count = 0
+        self.expires_at: Optional[float] = None
+        self._token: Optional[str] = None
+        self._refresh_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._clients: "weakref.WeakSet[HttpClient]" = weakref.WeakSet()
+
+    def __str__(self):
+        return f"TokenManager({self.username}@{self.url_prefix}, refresh_count: {self.refresh_count})"
+
+    @classmethod
+    def of(cls, url_prefix: str, username: str, passwd: str) -> "TokenManager":
+        """同一个 AMaaS 地址 & 用户 & 密码返回同一个 TokenManager"""
+        key = (url_prefix, username, passwd)
+        with cls._lock:
+            if (manager := cls._managers.get(key)) is None:
+                manager = cls._managers[key] = cls(url_prefix, username, passwd)
+            return manager
+
+    @staticmethod
+    def auth_headers(token: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}", "Cookie": f"AMES_session={token}"}
+
+    @staticmethod
+    def decode_exp(token: str) -> Optional[float]:
+        """解析 JWT payload 中的 exp(unix 时间戳), 不是 JWT 时返回 None"""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+            return float(exp) if exp is not None else None
+        except Exception:
+            return None
+
+    @property
+    def token(self) -> str:
+        self.ensure_fresh()
+        return self._token
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return self.auth_headers(self.token)
+
+    def register(self, client: HttpClient) -> HttpClient:
+        """登记使用该 token 的 client, 刷新 token 时会更新它的认证头"""
+        with self._refresh_lock:
+            self._clients.add(client)
+        return client
+
+    def ensure_fresh(self):
+        """token 不存在或即将过期时刷新. 未到刷新时间时只做一次时间比较."""
+        if self._token is None or monotonic() >= self._refresh_at:
+            self._refresh(lambda: self._token is None or monotonic() >= self._refresh_at)
+
+    def invalidate(self, stale: Optional[str] = None):
+        """
+        请求返回 401 时调用. stale 为该请求使用的 token, 已经被其他线程刷新过时不会重复登录;
+        不指定时强制刷新.
+        """
+        self._refresh(lambda: stale is None or self._token is None or self._token == stale)
+
+    def _refresh(self, needed):
+        with self._refresh_lock:
+            if not needed():
+                return
+
+            res = HttpPoolRegistry.client(self.url_prefix).post(
+                f"{self.url_prefix}/api/auth/login", data={"username": self.username, "password": self.passwd}
+            )
+            token = res.data.access_token
+
+            if (exp := self.decode_exp(token)) is not None:
+                lifetime = exp - time()
+            else:
+                lifetime = res.data.get("expires_in") or self.LIFETIME
+            self.expires_at = time() + lifetime
+            self._refresh_at = monotonic() + max(lifetime - min(self.REFRESH_AHEAD, lifetime / 10), 0)
+
+            self._token = token
+            self.refresh_count += 1
+
+            headers = self.auth_headers(token)
+            for client in list(self._clients):
+                client.update_headers(headers)
+
+            logger.info(f"{self} token refreshed, expires in {lifetime:.0f}s")
@@ -16,4 +16,4 @@ class AMaaSUser(BaseComponent):
         return res
 
     def delete(self, timeout: int = None):
-        return self.delete("delete", timeout=timeout)
+        return super().delete("delete", timeout=timeout)
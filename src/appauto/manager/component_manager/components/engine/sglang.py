@@ -1,8 +1,12 @@
 import base64
-from time import time
+from typing import List, Optional
+from time import time, perf_counter
 from pathlib import Path
 from ..amaas.base_component import BaseComponent
 from ....config_manager import LoggingConfig
+from ....utils_manager.async_utils import gather_with_concurrency
+from ....connection_manager.payload import PayloadTemplate
+from ....connection_manager.http_pool import HttpPoolRegistry
 
 logger = LoggingConfig.get_logger()
 
@@ -13,8 +17,8 @@ class SGLang(BaseComponent):
 
     POST_URL_MAP = dict(chat="v1/chat/completions")
 
-    def talk_to_llm(
-        self,
+    @staticmethod
+    def _gen_chat_payload(
         content: str,
         model: str,
         stream=True,
@@ -22,12 +26,8 @@ class SGLang(BaseComponent):
         temperature: float = 0.6,
         top_p: int = 1,
         sys_promt_content=None,
-        process_stream=True,
-        timeout=None,
-        encode_result=True,
         return_speed=False,
-        measure_ttft=False,
-    ):
+    ) -> dict:
         payload = {
             "messages": [{"role": "system", "content": sys_promt_content or ""}, {"role": "user", "content": content}],
             "model": model,
@@ -44,15 +44,67 @@ class SGLang(BaseComponent):
         if return_speed:
             payload["return_speed"] = return_speed
 
+        return payload
+
+    @classmethod
+    def _gen_body(cls, payload: Optional[bytes], *args) -> dict:
+        """请求参数: 预先序列化的 payload 通过 content 发送, 否则由 httpx 编码 json"""
+        if payload is not None:
+            return dict(content=payload)
+        return dict(json_data=cls._gen_chat_payload(*args))
+
+    def chat_template(
+        self,
+        content: str,
+        model: str,
+        stream=True,
+        max_tokens: int = None,
+        temperature: float = 0.6,
+        top_p: int = 1,
+        sys_promt_content=None,
+        return_speed=False,
+        variables=PayloadTemplate.DEFAULT_VARIABLES,
+    ) -> PayloadTemplate:
+        """预先序列化的 chat 请求体, 配合 talk_to_llm(payload=template.render(seed=i)) 使用"""
+        return PayloadTemplate(
+            self._gen_chat_payload(
+                content, model, stream, max_tokens, temperature, top_p, sys_promt_content, return_speed
+            ),
+            variables,
+        )
+
+    def talk_to_llm(
+        self,
+        content: str,
+        model: str,
+        stream=True,
+        max_tokens: int = None,
+        temperature: float = 0.6,
+        top_p: int = 1,
+        sys_promt_content=None,
+        process_stream=True,
+        timeout=None,
+        encode_result=True,
+        return_speed=False,
+        measure_ttft=False,
+        return_metrics=False,
+        payload: bytes = None,
+    ):
+        """
+        return_metrics: 处理 stream 时返回 StreamResult(文本 + TTFT/ITL/TPOT 等时间指标 + usage)
+        payload: 预先序列化的请求体(见 chat_template), 指定后直接发送, 忽略 content/model 等参数, stream 需与之一致
+        """
+        body = self._gen_body(
+            payload, content, model, stream, max_tokens, temperature, top_p, sys_promt_content, return_speed
+        )
+
         # 测量 ttft 时也等响应结束
         if measure_ttft:
             start = time()
             first_chunk = True
             ttft = None
 
-            with self.post_without_token(
-                "chat", json_data=payload, timeout=timeout, encode_result=False, stream=True
-            ) as res:
+            with self.post_without_token("chat", **body, timeout=timeout, encode_result=False, stream=True) as res:
                 res.raise_for_status()
                 for line in res.iter_lines():
                     if line:
@@ -68,14 +120,93 @@ class SGLang(BaseComponent):
         # 不处理 stream(提取 stream 对应的文本)时根据是否 stream 决定是否 encode_result
         if not process_stream:
             encode_result = False if stream else encode_result
-            return self.post_without_token(
-                "chat", json_data=payload, timeout=timeout, encode_result=encode_result, stream=stream
-            )
+            return self.post_without_token("chat", **body, timeout=timeout, encode_result=encode_result, stream=stream)
 
         # 处理 stream 时 stream 必须为 True
         else:
-            with self.post_without_token("chat", json_data=payload, timeout=timeout, stream=True) as response:
-                return self.http_without_token.process_stream_amaas(response)
+            start = perf_counter()
+            with self.post_without_token("chat", **body, timeout=timeout, stream=True) as response:
+                return self.http_without_token.process_stream_amaas(
+                    response, return_metrics=return_metrics, start=start
+                )
+
+    async def atalk_to_llm(
+        self,
+        content: str,
+        model: str,
+        stream=True,
+        max_tokens: int = None,
+        temperature: float = 0.6,
+        top_p: int = 1,
+        sys_promt_content=None,
+        timeout=None,
+        encode_result=True,
+        return_speed=False,
+        return_metrics=False,
+        payload: bytes = None,
+    ):
+        """
+        talk_to_llm 的异步版本. stream=True 时返回文本内容(return_metrics=True 时返回 StreamResult), 否则返回完整响应.
+        """
+        body = self._gen_body(
+            payload, content, model, stream, max_tokens, temperature, top_p, sys_promt_content, return_speed
+        )
+
+        if not stream:
+            return await self.apost_without_token("chat", **body, timeout=timeout, encode_result=encode_result)
+
+        start = perf_counter()
+        async with self.apost_without_token("chat", **body, timeout=timeout, stream=True) as response:
+            return await self.async_http_without_token.process_stream_amaas(
+                response, return_metrics=return_metrics, start=start
+            )
+
+    def probe_ttft(
+        self, content: str, model: str, max_tokens: int = None, sys_promt_content=None, timeout=None
+    ) -> Optional[float]:
+        """
+        只测 TTFT: 收到第一个内容 chunk 后立即断开 stream, 服务端随之中止请求, 不再跑完整个 decode.
+        与 talk_to_llm(measure_ttft=True) 不同, 后者会等响应结束.
+        """
+        payload = self._gen_chat_payload(content, model, True, max_tokens, sys_promt_content=sys_promt_content)
+
+        start = perf_counter()
+        with self.post_without_token("chat", json_data=payload, timeout=timeout, stream=True) as response:
+            return self.http_without_token.process_stream_ttft(response, start)
+
+    async def aprobe_ttft(
+        self, content: str, model: str, max_tokens: int = None, sys_promt_content=None, timeout=None
+    ) -> Optional[float]:
+        """probe_ttft 的异步版本"""
+        payload = self._gen_chat_payload(content, model, True, max_tokens, sys_promt_content=sys_promt_content)
+
+        start = perf_counter()
+        async with self.apost_without_token("chat", json_data=payload, timeout=timeout, stream=True) as response:
+            return await self.async_http_without_token.process_stream_ttft(response, start)
+
+    def probe_ttft_batch(
+        self,
+        contents: List[str],
+        model: str,
+        concurrency: int = 1,
+        max_tokens: int = None,
+        sys_promt_content=None,
+        timeout=None,
+    ) -> List[Optional[float]]:
+        """
+        批量 probe_ttft, 同一时刻最多 concurrency 个请求在途. 返回的 TTFT 与 contents 顺序一致.
+        比如按 prompt 长度扫描 TTFT 曲线时, concurrency=1 可以避免请求之间相互影响.
+        """
+
+        async def run():
+            try:
+                return await gather_with_concurrency(
+                    [self.aprobe_ttft(c, model, max_tokens, sys_promt_content, timeout) for c in contents], concurrency
+                )
+            finally:
+                await self.aclose()
+
+        return HttpPoolRegistry.run(run())
 
     @classmethod
     def image_to_base64(cls, image_path="/Users/ryanyang/Desktop/WechatIMG1.jpeg"):
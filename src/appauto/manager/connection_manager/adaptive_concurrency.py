@@ -0,0 +1,260 @@
+"""
+按模型 access_limit 自适应的客户端并发控制.
+
+模型的 access_limit 是网关允许的并发上限, 超过后网关返回 429 或者让请求排队. 固定大小的线程池要么压不满, 要么一直打到 429.
+AdaptiveConcurrency 以 access_limit 为上限, 用 AIMD 调整同时在途的请求数:
+- 在途请求已经用满当前限制且请求成功时, 限制加性增长(每一轮约 +1);
+- 收到 429/503 时, 限制乘以 backoff; 一次降低之后至少间隔一个平均延迟才会再次降低, 同一批在途请求的 429 只计一次.
+- 可选(latency_tolerance): 短期平均延迟超过长期平均延迟的 latency_tolerance 倍(请求开始排队)时同样降低.
+  LLM 的延迟随输出长度变化, 所以 call / acall 的返回值为 StreamResult 时用 TTFT, 有 usage.completion_tokens 时
+  用每个输出 token 的耗时, 否则(以及 slot / aslot)才用整体耗时. 因延迟降低后短期平均重置为长期平均, 需要重新积累才会再次降低.
+call / acall 收到 429 时按指数退避重试 max_retries 次.
+
+同一个对象只在线程(slot / call / map)或只在一个事件循环(aslot / acall / amap)中使用, 不要混用.
+"""
+
+import math
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from time import monotonic, sleep
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+import httpx
+from appauto.manager.config_manager import LoggingConfig
+from appauto.manager.connection_manager.sse import StreamResult
+from appauto.manager.utils_manager.custom_thread_pool_executor import CustomThreadPoolExecutor
+
+logger = LoggingConfig.get_logger()
+
+T = TypeVar("T")
+
+
+def is_overload(e: Exception) -> bool:
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code in AdaptiveConcurrency.OVERLOAD_STATUS
+
+
+class AdaptiveConcurrency:
+    """
+    用法:
+        controller = AdaptiveConcurrency.of_model(amaas.model.llm.get(name="Qwen3-8B"))
+        answers = controller.map(lambda q: llm.talk(q, stream=False, encode_result=True), questions)
+    或:
+        with controller.slot():
+            llm.talk(...)
+        async with controller.aslot():
+            await llm.atalk(...)
+    """
+
+    # access_limit 为 -1(不限制)时的上限
+    UNLIMITED_CEILING = 64
+    OVERLOAD_STATUS = (429, 503)
+    # 短期 / 长期延迟的 EWMA 系数
+    SHORT_ALPHA = 0.2
+    LONG_ALPHA = 0.02
+
+    def __init__(
+        self,
+        ceiling: int,
+        initial: int = None,
+        min_limit: int = 1,
+        backoff: float = 0.5,
+        latency_tolerance: Optional[float] = None,
+        max_retries: int = 3,
+        retry_backoff_s: float = 1.0,
+    ):
+        """
+        ceiling: 并发上限, 一般为模型的 access_limit
+        initial: 初始并发, 默认为上限的一半
+        latency_tolerance: 默认 None, 只按 429/503 调整; 设置后延迟上升也会降低并发, 请求的输出长度差异大时慎用
+        """
+        self.ceiling = max(ceiling, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(initial or max(min_limit, math.ceil(self.ceiling / 2)))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.successes = 0
+        self.overloads = 0
+        self.decreases = 0
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._acond: Optional[asyncio.Condition] = None
+
+    def __str__(self):
+        return f"AdaptiveConcurrency(limit: {self.limit:.1f}/{self.ceiling}, in flight: {self.in_flight})"
+
+    @classmethod
+    def of_model(cls, model, **kwargs) -> "AdaptiveConcurrency":
+        """以模型的 access_limit 为上限, model 为 amaas 的 BaseModel(或有 access_limit 属性的对象)"""
+        access_limit = model.access_limit
+        ceiling = access_limit if access_limit and access_limit > 0 else cls.UNLIMITED_CEILING
+        return cls(ceiling, **kwargs)
+
+    @property
+    def current(self) -> int:
+        """当前允许的在途请求数"""
+        return max(self.min_limit, int(self.limit))
+
+    def stats(self) -> Dict:
+        return dict(
+            limit=round(self.limit, 2),
+            ceiling=self.ceiling,
+            in_flight=self.in_flight,
+            max_in_flight=self.max_in_flight,
+            successes=self.successes,
+            overloads=self.overloads,
+            decreases=self.decreases,
+            short_latency=self.short_latency,
+            long_latency=self.long_latency,
+        )
+
+    @staticmethod
+    def latency_of(elapsed: float, result=None) -> float:
+        """用于判断排队的延迟: stream 结果用 TTFT, 有输出 token 数时按 token 归一化, 否则为整体耗时"""
+        tokens = None
+        if isinstance(result, StreamResult):
+            if result.ttft is not None:
+                return result.ttft
+            tokens = result.completion_tokens
+        elif isinstance(result, dict):
+            tokens = (result.get("usage") or {}).get("completion_tokens")
+        return elapsed / tokens if tokens else elapsed
+
+    # AIMD, 调用方持有 _cond
+    def _on_start(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _on_success(self, latency: float):
+        self.successes += 1
+        saturated = self.in_flight >= self.current
+
+        if self.short_latency is None:
+            self.short_latency = self.long_latency = latency
+        else:
+            self.short_latency += self.SHORT_ALPHA * (latency - self.short_latency)
+            self.long_latency += self.LONG_ALPHA * (latency - self.long_latency)
+
+        if self.latency_tolerance and self.short_latency > self.long_latency * self.latency_tolerance:
+            if self._decrease("latency"):
+                # 重新积累短期平均, 避免在长期平均追上之前每隔一个平均延迟就再降一次
+                self.short_latency = self.long_latency
+        elif saturated:
+            self.limit = min(self.limit + 1 / self.limit, self.ceiling)
+
+    def _on_overload(self):
+        self.overloads += 1
+        self._decrease("overload")
+
+    def _decrease(self, reason: str) -> bool:
+        now = monotonic()
+        if now - self._last_decrease < (self.short_latency or 0):
+            return False
+        self._last_decrease = now
+        self.decreases += 1
+        self.limit = max(self.limit * self.backoff, self.min_limit)
+        logger.info(f"{self} decreased: {reason}")
+        return True
+
+    def _on_done(self, start: float, error: Optional[Exception], result=None):
+        self.in_flight -= 1
+        if error is None:
+            self._on_success(self.latency_of(monotonic() - start, result))
+        elif is_overload(error):
+            self._on_overload()
+
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额, 退出时按耗时 / 是否 429 调整限制"""
+        with self._slot():
+            yield self
+
+    @asynccontextmanager
+    async def aslot(self):
+        """slot 的异步版本"""
+        async with self._aslot():
+            yield self
+
+    @contextmanager
+    def _slot(self):
+        """yield 的 list 用于回填返回值, 按返回值计算延迟(见 latency_of)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.in_flight < self.current)
+            self._on_start()
+
+        start, error, result = monotonic(), None, []
+        try:
+            yield result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._cond:
+                self._on_done(start, error, result[0] if result else None)
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def _aslot(self):
+        if self._acond is None:
+            self._acond = asyncio.Condition()
+
+        async with self._acond:
+            await self._acond.wait_for(lambda: self.in_flight < self.current)
+            self._on_start()
+
+        start, error, result = monotonic(), None, []
+        try:
+            yield result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            async with self._acond:
+                self._on_done(start, error, result[0] if result else None)
+                self._acond.notify_all()
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """在一个名额内调用 fn, 429/503 时退避重试"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._slot() as result:
+                    result.append(fn(*args, **kwargs))
+                    return result[0]
+            except Exception as e:
+                if not is_overload(e) or attempt == self.max_retries:
+                    raise
+            sleep(self.retry_backoff_s * 2**attempt)
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """call 的异步版本, fn 为协程函数"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._aslot() as result:
+                    result.append(await fn(*args, **kwargs))
+                    return result[0]
+            except Exception as e:
+                if not is_overload(e) or attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(self.retry_backoff_s * 2**attempt)
+
+    def map(self, fn: Callable[[T], object], items: Iterable[T]) -> List:
+        """
+        替代固定大小的 CustomThreadPoolExecutor: 线程数为上限, 实际并发由控制器决定.
+        结果顺序与 items 一致, 有失败时在全部结束后抛出第一个异常.
+        """
+        with CustomThreadPoolExecutor(max_workers=self.ceiling) as executor:
+            futures = [executor.submit(self.call, fn, item) for item in items]
+        errors = [e for fu in futures if (e := fu.exception()) is not None]
+        if errors:
+            raise errors[0]
+        return [fu.result() for fu in futures]
+
+    async def amap(self, fn: Callable[[T], Awaitable], items: Iterable[T], return_exceptions=False) -> List:
+        """替代 gather_with_concurrency, fn 为协程函数"""
+        return await asyncio.gather(*[self.acall(fn, item) for item in items], return_exceptions=return_exceptions)
@@ -0,0 +1,204 @@
+"""
+按 endpoint + 路径 + 模型的熔断器和整体 deadline.
+
+模型在用例中途挂掉时, 剩下的每个请求都要等满 timeout 才失败. 开启熔断后(CircuitBreaker.configure 或 pytest --circuit_breaker):
+- 连续 FAILURE_THRESHOLD 次连接错误 / 5xx 后熔断, 之后相同范围的请求直接抛 CircuitOpenError;
+- 熔断 reset_timeout 秒后进入半开状态, 只放行一个探测请求, 成功则恢复, 失败则 reset_timeout 翻倍(不超过 MAX_RESET_TIMEOUT).
+AMaaS 网关下所有模型共用同一个地址和推理路径, 所以熔断范围还要区分模型(见 HttpClient.breaker_scope), 一个模型挂掉不影响其他模型和控制面.
+Deadline.within 给一段代码(包括其中嵌套的调用和 CustomThreadPoolExecutor 提交的任务)设置总的时间预算,
+每个请求的 timeout 不会超过剩余预算, 预算用完后直接抛 DeadlineExceeded, 线程池中还没开始的任务也不再执行.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Dict, Optional
+import httpx
+from appauto.manager.config_manager import LoggingConfig
+from appauto.manager.error_manager.errors import CircuitOpenError, DeadlineExceeded
+
+logger = LoggingConfig.get_logger()
+
+
+class Deadline:
+    """
+    用法:
+        with Deadline.within(600):
+            with CustomThreadPoolExecutor(max_workers=8) as executor:
+                fus = [executor.submit(llm.talk, q, max_tokens=128) for q in questions]
+    """
+
+    _current: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+    @classmethod
+    @contextmanager
+    def within(cls, seconds: float):
+        """嵌套时以更早的 deadline 为准"""
+        deadline = monotonic() + seconds
+        if (outer := cls._current.get()) is not None:
+            deadline = min(deadline, outer)
+
+        token = cls._current.set(deadline)
+        try:
+            yield
+        finally:
+            cls._current.reset(token)
+
+    @classmethod
+    def remaining(cls) -> Optional[float]:
+        """剩余预算(s), 没有设置 deadline 时返回 None"""
+        if (deadline := cls._current.get()) is None:
+            return None
+        return deadline - monotonic()
+
+    @classmethod
+    def clamp(cls, timeout: Optional[float]) -> Optional[float]:
+        """返回不超过剩余预算的 timeout, 预算已用完时抛 DeadlineExceeded"""
+        if (remaining := cls.remaining()) is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(f"deadline exceeded by {-remaining:.1f}s")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @classmethod
+    def check(cls):
+        """预算已用完时抛 DeadlineExceeded"""
+        cls.clamp(None)
+
+
+class CircuitBreaker:
+    """
+    用法:
+        CircuitBreaker.configure(enabled=True, failure_threshold=3)
+        CircuitBreaker.stats()
+    """
+
+    ENABLED = False
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 1.0
+    MAX_RESET_TIMEOUT = 60.0
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    _lock = threading.Lock()
+    _breakers: Dict[str, "CircuitBreaker"] = {}
+
+    def __init__(self, key: str):
+        self.key = key
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.reset_timeout = self.RESET_TIMEOUT
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._state_lock = threading.Lock()
+
+    def __str__(self):
+        return f"CircuitBreaker({self.key}, state: {self.state}, failures: {self.failures})"
+
+    @classmethod
+    def configure(
+        cls,
+        enabled: bool = None,
+        failure_threshold: int = None,
+        reset_timeout: float = None,
+        max_reset_timeout: float = None,
+    ):
+        if enabled is not None:
+            cls.ENABLED = enabled
+        if failure_threshold is not None:
+            cls.FAILURE_THRESHOLD = failure_threshold
+        if reset_timeout is not None:
+            cls.RESET_TIMEOUT = reset_timeout
+        if max_reset_timeout is not None:
+            cls.MAX_RESET_TIMEOUT = max_reset_timeout
+
+    @classmethod
+    def gen_key(cls, url: str, scope: str = None) -> str:
+        """scheme://host:port/path(不含 query), 指定 scope(比如模型名称)时加上 #scope"""
+        url = httpx.URL(url)
+        key = f"{url.scheme}://{url.host}:{url.port or (443 if url.scheme == 'https' else 80)}{url.path}"
+        return f"{key}#{scope}" if scope else key
+
+    @classmethod
+    def of(cls, url: str, scope: str = None) -> Optional["CircuitBreaker"]:
+        """url(+ scope) 对应的熔断器, 未开启熔断时返回 None"""
+        if not cls.ENABLED:
+            return None
+
+        key = cls.gen_key(url, scope)
+        with cls._lock:
+            if (breaker := cls._breakers.get(key)) is None:
+                breaker = cls._breakers[key] = cls(key)
+            return breaker
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict]:
+        with cls._lock:
+            return {
+                key: dict(state=b.state, failures=b.failures, rejected=b.rejected, reset_timeout=b.reset_timeout)
+                for key, b in cls._breakers.items()
+            }
+
+    @classmethod
+    def reset_all(cls):
+        with cls._lock:
+            cls._breakers.clear()
+
+    def before_request(self) -> bool:
+        """
+        熔断中直接抛 CircuitOpenError; 到了探测时间只放行一个请求.
+        返回该请求是否为探测请求, 请求结束后(不论成功还是抛出什么异常)需要调用 after_request.
+        """
+        with self._state_lock:
+            if self.state == self.CLOSED:
+                return False
+
+            if self.state == self.OPEN and monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self.rejected += 1
+            retry_in = max(self.opened_at + self.reset_timeout - monotonic(), 0)
+            raise CircuitOpenError(f"{self}, retry in {retry_in:.1f}s")
+
+    def on_response(self, response: httpx.Response):
+        if response.status_code >= 500:
+            self._on_failure()
+        else:
+            self._on_success()
+
+    def on_error(self, e: Exception):
+        """只有连接层面的错误(连接失败 / 超时 / 断连)计为失败"""
+        if isinstance(e, httpx.TransportError):
+            self._on_failure()
+
+    def after_request(self, probe: bool):
+        """探测请求结束. 没有得到结果(比如抛出其他异常)时保持半开, 下一个请求重新探测"""
+        if probe:
+            with self._state_lock:
+                self._probing = False
+
+    def _on_success(self):
+        with self._state_lock:
+            if self.state != self.CLOSED:
+                logger.info(f"{self} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.RESET_TIMEOUT
+
+    def _on_failure(self):
+        with self._state_lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.MAX_RESET_TIMEOUT)
+            elif self.state == self.OPEN or self.failures < self.FAILURE_THRESHOLD:
+                return
+
+            self.state = self.OPEN
+            self.opened_at = monotonic()
+            logger.error(f"{self} opened, probe in {self.reset_timeout:.1f}s")
@@ -1,28 +1,56 @@
 import json
+import logging
 import httpx
 import addict
+from contextlib import contextmanager, asynccontextmanager
 from appauto.manager.config_manager import LoggingConfig
 from appauto.manager.error_manager.errors import NeedRetryOnHttpRC401
-from typing import Optional, Dict, Any, Union, Generator
+from appauto.manager.connection_manager.sse import (
+    StreamDecoder,
+    StreamResult,
+    OpenAIDeltaExtractor,
+    ZhiwenResponseExtractor,
+    ZhiwenAnswerExtractor,
+)
+from appauto.manager.connection_manager.http_trace import HttpTraceRecorder, RequestTiming
+from appauto.manager.connection_manager.circuit_breaker import CircuitBreaker, Deadline
+from typing import Optional, Dict, Any, Union, AsyncContextManager, ContextManager
 from functools import cached_property
 
 logger = LoggingConfig.get_logger()
 
+# 测量 TTFT 时推理模型的 reasoning_content 也算首 token
+TTFT_FIELDS = ("content", "reasoning_content")
+
+
+def bearer_token(request: httpx.Request) -> Optional[str]:
+    """请求 Authorization 头中的 bearer token"""
+    auth = request.headers.get("Authorization", "")
+    return auth[len("Bearer ") :] if auth.startswith("Bearer ") else None
+
 
 class HttpClient:
     def __init__(
         self,
         headers: Optional[Dict[str, str]] = None,
         verify: bool = False,
+        transport: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None,
+        breaker_scope: str = None,
     ):
+        """
+        transport: 指定后使用该 transport(连接池), 比如 HttpPoolRegistry 提供的共享连接池
+        breaker_scope: 熔断器的范围(比如模型名称), 不指定时使用 json 请求体中的 model, 见 CircuitBreaker.of
+        """
         self.headers = headers or {}
         self.verify = verify
+        self.transport = transport
+        self.breaker_scope = breaker_scope
         self._client = None
 
     @cached_property
     def client(self) -> httpx.Client:
         if self._client is None:
-            self._client = httpx.Client(headers=self.headers, verify=self.verify)
+            self._client = httpx.Client(headers=self.headers, verify=self.verify, transport=self.transport)
             logger.info(self._client.headers)
         return self._client
 
@@ -30,18 +58,51 @@ class HttpClient:
         # TODO 获取 token
         ...
 
+    def _breaker(self, url, json_data=None) -> Optional[CircuitBreaker]:
+        scope = self.breaker_scope
+        if scope is None and isinstance(json_data, dict):
+            scope = json_data.get("model")
+        return CircuitBreaker.of(url, scope)
+
     def _log_request(self, method: str, url: str, **kwargs):
+        """请求体不再输出到 info 日志, 需要时见 HttpTraceRecorder 的记录或开启 debug 日志"""
         logger.info(f"[Request] {method.upper()} {url}")
-        for key in ["params", "json", "data", "headers"]:
-            if kwargs.get(key):
-                logger.info(f"[Request] {key.capitalize()}: {kwargs[key]}")
-
-    def _log_response(self, response: httpx.Response):
-        logger.info(f"[Response] [{response.status_code}] {response.url}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for key in ["params", "json", "data", "headers"]:
+                if kwargs.get(key):
+                    logger.debug(f"[Request] {key.capitalize()}: {kwargs[key]}")
+
+    def _log_response(self, response: httpx.Response, timing: RequestTiming):
+        record = HttpTraceRecorder.instance().record(response.request, timing, response)
+        logger.info(
+            f"[Response] [{response.status_code}] {response.url}, "
+            f"elapsed: {record.total_s:.3f}s, bytes: {record.response_bytes}"
+        )
+        if response.status_code >= 400:
+            logger.error(f"[Response] Body (text): {response.text}")
+
+    @staticmethod
+    def _error_request(e: Exception) -> Optional[httpx.Request]:
         try:
-            logger.info(f"[Response] Body: {response.json()}")
-        except Exception as e:
-            logger.error(f"[Response] Body (text): {response.text} with Exception: {e}")
+            return e.request
+        except (AttributeError, RuntimeError):
+            return None
+
+    def _log_error(self, e: Exception, timing: RequestTiming):
+        if isinstance(e, httpx.RequestError) and (request := self._error_request(e)) is not None:
+            HttpTraceRecorder.instance().record(request, timing, error=e)
+
+    def _record_stream(self, timing: RequestTiming, response: Optional[httpx.Response], error: Optional[Exception]):
+        request = response.request if response is not None else self._error_request(error)
+        if request is not None:
+            # stream 响应由调用方消费, 只记录已下载的字节数
+            HttpTraceRecorder.instance().record(
+                request,
+                timing,
+                response,
+                response_bytes=response.num_bytes_downloaded if response else None,
+                error=error,
+            )
 
     def request(
         self,
@@ -57,6 +118,10 @@ class HttpClient:
         **kwargs,
     ) -> Union[addict.Dict, httpx.Response]:
         self._log_request(method, url, params=params, data=data, json=json_data, headers=headers)
+        timeout = Deadline.clamp(timeout)
+        breaker = self._breaker(url, json_data)
+        probe = breaker.before_request() if breaker else False
+        timing = RequestTiming()
 
         try:
             response = self.client.request(
@@ -67,30 +132,42 @@ class HttpClient:
                 json=json_data,
                 headers=headers,
                 timeout=timeout,
+                extensions={"trace": timing.trace},
                 **kwargs,
             )
-            self._log_response(response)
+            if breaker:
+                breaker.on_response(response)
+            self._log_response(response, timing)
             # TODO 除了 verify_rc 是否需要 verify_msg
 
             # 如果状态码是 401, 需要进行 retry
             if response.status_code == 401:
-                raise NeedRetryOnHttpRC401(f"http.response.status_code: {response.status_code}")
+                raise NeedRetryOnHttpRC401(
+                    f"http.response.status_code: {response.status_code}", token=bearer_token(response.request)
+                )
 
             response.raise_for_status()
 
             if check:
                 self.validate_return_msg(response.text)
 
-            return self.encode_result(response.text) if encode_result else response
+            return self.encode_result(response.text, encode_result) if encode_result else response
 
         except NeedRetryOnHttpRC401 as e:
             logger.error(f"HTTP {method.upper()} {url} failed: {str(e)}, need retry.")
             raise e
 
         except httpx.HTTPError as e:
+            if breaker:
+                breaker.on_error(e)
+            self._log_error(e, timing)
             logger.error(f"HTTP {method.upper()} {url} failed: {e}")
             raise
 
+        finally:
+            if breaker:
+                breaker.after_request(probe)
+
     def get(
         self,
         url: str,
@@ -145,18 +222,25 @@ class HttpClient:
     def update_headers(self, headers: Dict[str, str]):
         """
         更新请求头，比如更新 token
+        构造新的 headers 后整体替换, 并发中的请求不会读到更新了一半的 headers.
         """
-        self.headers.update(headers)
+        self.headers = {**self.headers, **headers}
         if self._client:
-            self._client.headers.update(headers)
+            self._client.headers = self.headers
 
     def close(self):
         if self._client:
             self._client.close()
             self._client = None
 
-    def encode_result(self, text):
+    def encode_result(self, text, record=None):
+        """
+        record: 请求的 encode_result 参数, 为 record 类(实现了 decode, 比如 amaas.records.ModelRecord)时由其解析,
+        列表中的元素不做 addict 转换
+        """
         try:
+            if isinstance(record, type):
+                return record.decode(text)
             json_data = json.loads(text)
             return addict.Dict(json_data) if isinstance(json_data, dict) else json_data
         except Exception as e:
@@ -182,131 +266,319 @@ class HttpClient:
         """返回生成器上下文管理器"""
         self._log_request(method, url, params=params, data=data, json=json_data)
 
+        return self._traced_stream(
+            method=method.upper(),
+            url=url,
+            params=params,
+            data=data,
+            json=json_data,
+            headers=headers,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    @contextmanager
+    def _traced_stream(self, **kwargs) -> ContextManager[httpx.Response]:
+        kwargs["timeout"] = Deadline.clamp(kwargs.get("timeout"))
+        circuit = breaker = self._breaker(kwargs["url"], kwargs.get("json"))
+        probe = circuit.before_request() if circuit else False
+        timing = RequestTiming()
+        response, error = None, None
         try:
-            # 直接返回生成器上下文管理器
-            return self.client.stream(
-                method=method.upper(),
-                url=url,
-                params=params,
-                data=data,
-                json=json_data,
-                headers=headers,
-                timeout=timeout,
-                **kwargs,
-            )
-        except httpx.HTTPError as e:
-            logger.error(f"Stream request failed: {e}")
+            with self.client.stream(extensions={"trace": timing.trace}, **kwargs) as response:
+                if breaker:
+                    breaker.on_response(response)
+                    breaker = None
+                yield response
+        except Exception as e:
+            error = e
+            if breaker:
+                breaker.on_error(e)
+            if isinstance(e, httpx.HTTPError):
+                logger.error(f"Stream request failed: {e}")
             raise
-
-    def process_stream_amaas(self, response: httpx.Response, process_chunk=True):
-        """获取 stream chunks 的文本内容"""
+        finally:
+            if circuit:
+                circuit.after_request(probe)
+            self._record_stream(timing, response, error)
+
+    def process_stream_amaas(
+        self, response: httpx.Response, process_chunk=True, return_metrics=False, start: float = None
+    ) -> Union[str, StreamResult]:
+        """
+        获取 stream chunks 的文本内容.
+        return_metrics: 返回 StreamResult(文本 + 逐 chunk 时间 + usage), start 为发出请求时的 perf_counter()
+        """
         response.raise_for_status()
 
-        full_content = ""
+        decoder = StreamDecoder(OpenAIDeltaExtractor(), process_chunk, record_timing=return_metrics, start=start)
+        full_content = decoder.decode(response.iter_bytes())
+
+        return self._stream_result(decoder, full_content, return_metrics)
 
-        for line in response.iter_lines():
-            if not line or not line.startswith("data:"):
-                continue
-            payload = line.removeprefix("data:").strip()
+    def process_stream_ttft(self, response: httpx.Response, start: float = None) -> Optional[float]:
+        """
+        读到第一个内容 chunk(包括 reasoning_content)即返回 TTFT, 不再读取剩余内容.
+        调用方退出 with 后连接随即关闭, 服务端感知到断连会中止该请求, 不再占用 decode 资源.
+        """
+        response.raise_for_status()
 
-            if payload == "[DONE]":
+        decoder = self._ttft_decoder(start)
+        for chunk in response.iter_bytes():
+            decoder.feed(chunk)
+            if decoder.timestamps or decoder.done:
                 break
 
-            try:
-                data = json.loads(payload)
-                logger.debug(f"per stream link payload: {data}")
+        return self._ttft_result(decoder)
 
-                if process_chunk:
-                    if choices := data.get("choices", None):
-                        if chunk := choices[0]["delta"].get("content"):
-                            full_content += chunk
-                            # 实时输出
-                            logger.debug(chunk)
-                            logger.debug(full_content)
+    @staticmethod
+    def _ttft_decoder(start: float = None) -> StreamDecoder:
+        return StreamDecoder(OpenAIDeltaExtractor(TTFT_FIELDS), record_timing=True, start=start)
 
-                if usage := data.get("usage", None):
-                    logger.info(f"usage_metric: {usage}")
+    @staticmethod
+    def _ttft_result(decoder: StreamDecoder) -> Optional[float]:
+        ttft = decoder.timestamps[0] if decoder.timestamps else None
+        logger.info(f"get ttft: {ttft}")
+        return ttft
 
-            except Exception as e:
-                logger.error(f"Process stream request failed: {e}, init_payload: {payload}")
-                raise
+    def _stream_result(self, decoder: StreamDecoder, full_content: str, return_metrics: bool):
+        if decoder.usage:
+            logger.info(f"usage_metric: {decoder.usage}")
+        logger.info(f"full_content: {full_content}")
+
+        if not return_metrics:
+            return full_content
+
+        result = decoder.result()
+        logger.info(f"stream_metric: {result.summary()}")
+        return result
+
+    def process_stream_zhiwen_deep_search(self, response: httpx.Response) -> str:
+        """
+        处理 httpx 的流式响应，提取 response 字段, 返回拼接后的全部内容.
+        """
+        response.raise_for_status()
+
+        full_content = StreamDecoder(ZhiwenResponseExtractor()).decode(response.iter_bytes())
 
         logger.info(f"full_content: {full_content}")
-        logger.info(f"The last line, which usually contains usage, has some key perf metric: {line}".center(600, "*"))
         return full_content
 
-    def process_stream_zhiwen_deep_search(self, response: httpx.Response) -> Generator[str, None, None]:
+    def process_stream_zhiwen_normal_search(self, response: httpx.Response) -> str:
         """
-        处理 httpx 的流式响应，逐行读取，提取 data.answer 字段。
-        支持 yield 每段 answer，直到结束。
+        处理 httpx 的流式响应，提取 data.answer 字段, 返回拼接后的全部内容.
         """
         response.raise_for_status()
 
-        full_content = ""
+        full_content = StreamDecoder(ZhiwenAnswerExtractor()).decode(response.iter_bytes())
 
-        for line in response.iter_lines():
-            if not line or not line.startswith("data:"):
-                continue
-            payload = line.removeprefix("data:").strip()
+        logger.info(f"full_content: {full_content}")
+        return full_content
 
-            if payload in [
-                '{"retcode": 0, "retmsg": "", "data": true}',
-                '{"response": "", "current_node": "", "state": 0}',
-            ]:
-                break
 
-            try:
-                data = json.loads(payload)
-                logger.debug(f"per stream link payload: {data}")
+class AsyncHttpClient(HttpClient):
+    """
+    基于 httpx.AsyncClient 的 HttpClient, 接口与 HttpClient 保持一致, 只是请求方法需要 await.
+    单个进程内可以用协程驱动大量并发请求(包括 stream), 无需为每个请求占用一个线程.
+    """
+
+    @cached_property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(headers=self.headers, verify=self.verify, transport=self.transport)
+            logger.info(self._client.headers)
+        return self._client
 
-                if chunk := data.get("response"):
-                    logger.debug(chunk)
-                    if isinstance(chunk, str):
-                        full_content += chunk
-                        # 实时输出
-                        logger.debug(full_content)
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[Dict[str, Any], str]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encode_result=True,
+        timeout=None,
+        check=False,
+        **kwargs,
+    ) -> Union[addict.Dict, httpx.Response]:
+        self._log_request(method, url, params=params, data=data, json=json_data, headers=headers)
+        timeout = Deadline.clamp(timeout)
+        breaker = self._breaker(url, json_data)
+        probe = breaker.before_request() if breaker else False
+        timing = RequestTiming()
 
-            except Exception as e:
-                logger.error(f"Process stream request failed: {e}, init_payload: {payload}")
-                raise
+        try:
+            response = await self.client.request(
+                method=method.upper(),
+                url=url,
+                params=params,
+                data=data,
+                json=json_data,
+                headers=headers,
+                timeout=timeout,
+                extensions={"trace": timing.atrace},
+                **kwargs,
+            )
+            if breaker:
+                breaker.on_response(response)
+            self._log_response(response, timing)
 
-        logger.info(f"full_content: {full_content}")
-        return full_content
+            # 如果状态码是 401, 需要进行 retry
+            if response.status_code == 401:
+                raise NeedRetryOnHttpRC401(
+                    f"http.response.status_code: {response.status_code}", token=bearer_token(response.request)
+                )
 
-    def process_stream_zhiwen_normal_search(self, response: httpx.Response) -> Generator[str, None, None]:
-        """
-        处理 httpx 的流式响应，逐行读取，提取 data.answer 字段。
-        支持 yield 每段 answer，直到结束。
-        """
-        response.raise_for_status()
+            response.raise_for_status()
 
-        full_content = ""
+            if check:
+                self.validate_return_msg(response.text)
+
+            return self.encode_result(response.text, encode_result) if encode_result else response
+
+        except NeedRetryOnHttpRC401 as e:
+            logger.error(f"HTTP {method.upper()} {url} failed: {str(e)}, need retry.")
+            raise e
+
+        except httpx.HTTPError as e:
+            if breaker:
+                breaker.on_error(e)
+            self._log_error(e, timing)
+            logger.error(f"HTTP {method.upper()} {url} failed: {e}")
+            raise
+
+        finally:
+            if breaker:
+                breaker.after_request(probe)
 
-        for line in response.iter_lines():
-            if not line or not line.startswith("data:"):
-                continue
-            payload = line.removeprefix("data:").strip()
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encode_result=True,
+        timeout=None,
+        **kwargs,
+    ) -> Union[addict.Dict, httpx.Response]:
+        return await self.request(
+            "GET", url, params, timeout=timeout, headers=headers, encode_result=encode_result, **kwargs
+        )
 
-            if payload in [
-                '{"retcode": 0, "retmsg": "", "data": true}',
-                '{"response": "", "current_node": "", "state": 0}',
-            ]:
+    async def post(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[Dict[str, Any], str]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encode_result=True,
+        timeout=None,
+        **kwargs,
+    ) -> Union[addict.Dict, httpx.Response]:
+        return await self.request("POST", url, params, data, json_data, headers, encode_result, timeout, **kwargs)
+
+    async def put(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[Dict[str, Any], str]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encode_result=True,
+        timeout=None,
+        **kwargs,
+    ) -> Union[addict.Dict, httpx.Response]:
+        return await self.request("PUT", url, params, data, json_data, headers, encode_result, timeout, **kwargs)
+
+    async def delete(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[Dict[str, Any], str]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encode_result=True,
+        timeout=None,
+        **kwargs,
+    ) -> Union[addict.Dict, httpx.Response]:
+        return await self.request("DELETE", url, params, data, json_data, headers, encode_result, timeout, **kwargs)
+
+    async def close(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+            self.__dict__.pop("client", None)
+
+    def stream_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        data: Optional[Union[Dict, str]] = None,
+        json_data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> AsyncContextManager[httpx.Response]:
+        """返回异步上下文管理器, 需要配合 async with 使用"""
+        self._log_request(method, url, params=params, data=data, json=json_data)
+
+        return self._atraced_stream(
+            method=method.upper(),
+            url=url,
+            params=params,
+            data=data,
+            json=json_data,
+            headers=headers,
+            timeout=timeout,
+            **kwargs,
+        )
+
+    @asynccontextmanager
+    async def _atraced_stream(self, **kwargs) -> AsyncContextManager[httpx.Response]:
+        kwargs["timeout"] = Deadline.clamp(kwargs.get("timeout"))
+        circuit = breaker = self._breaker(kwargs["url"], kwargs.get("json"))
+        probe = circuit.before_request() if circuit else False
+        timing = RequestTiming()
+        response, error = None, None
+        try:
+            async with self.client.stream(extensions={"trace": timing.atrace}, **kwargs) as response:
+                if breaker:
+                    breaker.on_response(response)
+                    breaker = None
+                yield response
+        except Exception as e:
+            error = e
+            if breaker:
+                breaker.on_error(e)
+            if isinstance(e, httpx.HTTPError):
+                logger.error(f"Stream request failed: {e}")
+            raise
+        finally:
+            if circuit:
+                circuit.after_request(probe)
+            self._record_stream(timing, response, error)
+
+    async def process_stream_ttft(self, response: httpx.Response, start: float = None) -> Optional[float]:
+        """同 HttpClient.process_stream_ttft"""
+        response.raise_for_status()
+
+        decoder = self._ttft_decoder(start)
+        async for chunk in response.aiter_bytes():
+            decoder.feed(chunk)
+            if decoder.timestamps or decoder.done:
                 break
 
-            try:
-                data = json.loads(payload)
-                logger.info(f"per stream link payload: {data}")
+        return self._ttft_result(decoder)
 
-                if chunk := data.get("data").get("answer"):
-                    logger.debug(chunk)
-                    if isinstance(chunk, str):
-                        full_content += chunk
-                        # 实时输出
-                        logger.debug(full_content)
+    async def process_stream_amaas(
+        self, response: httpx.Response, process_chunk=True, return_metrics=False, start: float = None
+    ) -> Union[str, StreamResult]:
+        """获取 stream chunks 的文本内容, 参数同 HttpClient.process_stream_amaas"""
+        response.raise_for_status()
 
-            except Exception as e:
-                logger.error(f"Process stream request failed: {e}, init_payload: {payload}")
-                raise
+        decoder = StreamDecoder(OpenAIDeltaExtractor(), process_chunk, record_timing=return_metrics, start=start)
+        full_content = await decoder.adecode(response.aiter_bytes())
 
-        logger.info(f"full_content: {full_content}")
-        return full_content
+        return self._stream_result(decoder, full_content, return_metrics)
@@ -0,0 +1,282 @@
+"""
+进程级 http 连接池注册表.
+
+同一个 (scheme, host, port, 认证身份) 的所有 HttpClient 共享同一个 transport(即同一个 TCP/TLS 连接池),
+避免每个组件对象各自建连. 异步 transport 额外按事件循环区分, 因为连接不能跨事件循环复用:
+- 每个异步 client 引用一次所在事件循环的连接池, arelease 后引用数归零时关闭连接池;
+- HttpPoolRegistry.run 代替 asyncio.run, 主协程结束后关闭该事件循环剩下的连接池(比如没有 arelease 的 client);
+- 事件循环关闭后仍未释放的连接池在下次创建异步连接池时丢弃.
+"""
+
+import asyncio
+import threading
+import importlib.util
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Dict, Optional, Tuple, TypeVar, Union
+import httpx
+from appauto.manager.config_manager import LoggingConfig
+from appauto.manager.connection_manager.http import HttpClient, AsyncHttpClient
+
+logger = LoggingConfig.get_logger()
+
+# (scheme, host, port, identity, is_async), 异步连接池的统计按地址汇总所有事件循环
+PoolKey = Tuple[str, str, int, Optional[str], bool]
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    connections: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def on_connect(self):
+        with self._lock:
+            self.connections += 1
+
+    @property
+    def reuse_rate(self) -> float:
+        """复用已有连接的请求占比"""
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.connections / self.requests)
+
+    def to_dict(self) -> Dict:
+        return dict(requests=self.requests, connections=self.connections, reuse_rate=round(self.reuse_rate, 4))
+
+
+class _PooledTransport(httpx.HTTPTransport):
+    """统计请求数和新建连接数. close 由注册表统一负责, 单个 client.close() 不会关闭共享连接池."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def _trace(self, name: str, info: Dict):
+        if name == "connection.connect_tcp.complete":
+            self.stats.on_connect()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.on_request()
+        request.extensions["trace"] = self._chain(request.extensions.get("trace"))
+        return super().handle_request(request)
+
+    def _chain(self, trace):
+        if trace is None:
+            return self._trace
+
+        def chained(name: str, info: Dict):
+            self._trace(name, info)
+            trace(name, info)
+
+        return chained
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+class _AsyncPooledTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        # 使用该连接池的 client 数, 见 HttpPoolRegistry.arelease
+        self.refs = 0
+
+    async def _trace(self, name: str, info: Dict):
+        if name == "connection.connect_tcp.complete":
+            self.stats.on_connect()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.on_request()
+        request.extensions["trace"] = self._chain(request.extensions.get("trace"))
+        return await super().handle_async_request(request)
+
+    def _chain(self, trace):
+        if trace is None:
+            return self._trace
+
+        async def chained(name: str, info: Dict):
+            await self._trace(name, info)
+            await trace(name, info)
+
+        return chained
+
+    async def aclose(self):
+        pass
+
+    async def shutdown(self):
+        await super().aclose()
+
+
+class HttpPoolRegistry:
+    """
+    用法:
+        HttpPoolRegistry.configure(max_connections=200, keepalive_expiry=30, http2=True)
+        client = HttpPoolRegistry.client("http://127.0.0.1:10001", headers, identity="admin")
+        HttpPoolRegistry.stats()
+    """
+
+    MAX_CONNECTIONS = 100
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    KEEPALIVE_EXPIRY = 5.0
+    HTTP2 = False
+
+    _lock = threading.Lock()
+    _transports: Dict[PoolKey, _PooledTransport] = {}
+    _async_transports: Dict[asyncio.AbstractEventLoop, Dict[PoolKey, _AsyncPooledTransport]] = {}
+    _stats: Dict[PoolKey, PoolStats] = {}
+
+    @classmethod
+    def configure(
+        cls,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        http2: bool = None,
+    ):
+        """只对之后新建的连接池生效"""
+        if max_connections is not None:
+            cls.MAX_CONNECTIONS = max_connections
+        if max_keepalive_connections is not None:
+            cls.MAX_KEEPALIVE_CONNECTIONS = max_keepalive_connections
+        if keepalive_expiry is not None:
+            cls.KEEPALIVE_EXPIRY = keepalive_expiry
+        if http2 is not None:
+            cls.HTTP2 = http2
+
+    @classmethod
+    def limits(cls) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=cls.MAX_CONNECTIONS,
+            max_keepalive_connections=cls.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=cls.KEEPALIVE_EXPIRY,
+        )
+
+    @classmethod
+    def http2_enabled(cls) -> bool:
+        if cls.HTTP2 and importlib.util.find_spec("h2") is None:
+            logger.warning("http2 is enabled but package h2 is not installed, fallback to http/1.1")
+            cls.HTTP2 = False
+        return cls.HTTP2
+
+    @classmethod
+    def gen_key(cls, url_prefix: str, identity: str = None, is_async=False) -> PoolKey:
+        url = httpx.URL(url_prefix)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        return url.scheme, url.host, port, identity, is_async
+
+    @classmethod
+    def transport(
+        cls, url_prefix: str, identity: str = None, verify=False, is_async=False
+    ) -> Union[_PooledTransport, _AsyncPooledTransport]:
+        """异步 transport 属于当前运行中的事件循环; 不在事件循环中时返回一个不共享的 transport"""
+        key = cls.gen_key(url_prefix, identity, is_async)
+        loop = None
+        if is_async:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+
+        with cls._lock:
+            if is_async:
+                for closed in [lp for lp in cls._async_transports if lp.is_closed()]:
+                    logger.warning(f"drop {len(cls._async_transports.pop(closed))} async http pools of a closed loop")
+                transports = cls._async_transports.setdefault(loop, {}) if loop is not None else {}
+            else:
+                transports = cls._transports
+
+            if (transport := transports.get(key)) is None:
+                stats = cls._stats.setdefault(key, PoolStats())
+                transport_cls = _AsyncPooledTransport if is_async else _PooledTransport
+                transport = transport_cls(stats, verify=verify, limits=cls.limits(), http2=cls.http2_enabled())
+                transports[key] = transport
+                logger.info(f"create http pool: {cls.format_key(key)}")
+
+            if is_async:
+                transport.refs += 1
+
+        return transport
+
+    @classmethod
+    def client(
+        cls,
+        url_prefix: str,
+        headers: Dict[str, str] = None,
+        identity: str = None,
+        verify=False,
+        is_async=False,
+        breaker_scope: str = None,
+    ) -> Union[HttpClient, AsyncHttpClient]:
+        """返回共享连接池的 client. client 本身很轻量, 各自维护 headers 和熔断范围(见 HttpClient)."""
+        transport = cls.transport(url_prefix, identity, verify, is_async)
+        client_cls = AsyncHttpClient if is_async else HttpClient
+        return client_cls(headers=headers, verify=verify, transport=transport, breaker_scope=breaker_scope)
+
+    @classmethod
+    def format_key(cls, key: PoolKey) -> str:
+        scheme, host, port, identity, is_async = key
+        name = f"{scheme}://{host}:{port}@{identity or '-'}"
+        return f"{name}#async" if is_async else name
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict]:
+        """各连接池的请求数 / 新建连接数 / 连接复用率"""
+        with cls._lock:
+            return {cls.format_key(key): stats.to_dict() for key, stats in cls._stats.items()}
+
+    @classmethod
+    def close_all(cls):
+        """关闭所有同步连接池, 异步连接池需要在各自的事件循环中调用 aclose_all"""
+        with cls._lock:
+            for key in list(cls._transports):
+                cls._transports.pop(key).shutdown()
+
+    @classmethod
+    async def arelease(cls, client: AsyncHttpClient):
+        """
+        释放 client 对连接池的引用, 当前事件循环下最后一个使用该连接池的 client 释放后关闭连接池.
+        不在事件循环中创建的 client 使用的是不共享的连接池, 直接关闭.
+        """
+        await client.close()
+        transport, client.transport = client.transport, None
+        if not isinstance(transport, _AsyncPooledTransport):
+            return
+        with cls._lock:
+            transport.refs -= 1
+            if transport.refs > 0:
+                return
+            transports = cls._async_transports.get(asyncio.get_running_loop(), {})
+            for key in [k for k, t in transports.items() if t is transport]:
+                del transports[key]
+
+        await transport.shutdown()
+
+    @classmethod
+    async def aclose_all(cls):
+        """关闭当前事件循环下的所有异步连接池, 包括仍被其他 client 使用的"""
+        with cls._lock:
+            transports = cls._async_transports.pop(asyncio.get_running_loop(), {})
+
+        for transport in transports.values():
+            await transport.shutdown()
+
+    @classmethod
+    def run(cls, main: Coroutine[Any, Any, T]) -> T:
+        """asyncio.run(main), 事件循环结束前关闭该事件循环下剩余的异步连接池"""
+
+        async def wrapper():
+            try:
+                return await main
+            finally:
+                await cls.aclose_all()
+
+        return asyncio.run(wrapper())
@@ -0,0 +1,213 @@
+"""
+http 请求追踪记录.
+
+每个请求记录一条结构化记录(方法 / URL / 状态码 / 建连耗时 / TTFB / 总耗时 / 请求与响应字节数 / 截断的 body 预览),
+保存在固定大小的环形缓冲区中; 配置了 path 时由后台线程异步追加写入 JSONL 文件.
+完整 body 只在请求出错或命中采样时记录.
+"""
+
+import json
+import queue
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from time import perf_counter, time
+from typing import Deque, Dict, List, Optional
+import httpx
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+
+class RequestTiming:
+    """通过 httpcore 的 trace 扩展采集单个请求的建连耗时和 TTFB"""
+
+    __slots__ = ("start", "connect", "ttfb", "_connect_start")
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self._connect_start: Optional[float] = None
+
+    def trace(self, name: str, info: Dict):
+        if name == "connection.connect_tcp.started":
+            self._connect_start = perf_counter()
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if self._connect_start is not None:
+                self.connect = perf_counter() - self._connect_start
+        elif name.endswith("receive_response_headers.complete"):
+            self.ttfb = perf_counter() - self.start
+
+    async def atrace(self, name: str, info: Dict):
+        self.trace(name, info)
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.start
+
+
+@dataclass
+class TraceRecord:
+    ts: float
+    method: str
+    url: str
+    status: Optional[int]
+    connect_s: Optional[float]
+    ttfb_s: Optional[float]
+    total_s: float
+    request_bytes: Optional[int]
+    response_bytes: Optional[int]
+    request_preview: Optional[str] = None
+    response_preview: Optional[str] = None
+    error: Optional[str] = None
+    request_body: Optional[str] = None
+    response_body: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps({k: v for k, v in asdict(self).items() if v is not None}, ensure_ascii=False)
+
+
+class HttpTraceRecorder:
+    """
+    用法:
+        HttpTraceRecorder.configure(path="logs/http_trace.jsonl", sample_rate=0.01)
+        HttpTraceRecorder.instance().records  # 最近的 capacity 条记录
+        HttpTraceRecorder.instance().dump("failed_case_trace.jsonl")
+    """
+
+    _instance: Optional["HttpTraceRecorder"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, capacity: int = 1000, preview_bytes: int = 256, sample_rate: float = 0.0, path: str = None):
+        self.capacity = capacity
+        self.preview_bytes = preview_bytes
+        self.sample_rate = sample_rate
+        self.path = path
+        self.records: Deque[TraceRecord] = deque(maxlen=capacity)
+        self._queue: "queue.Queue[Optional[TraceRecord]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    @classmethod
+    def instance(cls) -> "HttpTraceRecorder":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def configure(
+        cls, capacity: int = None, preview_bytes: int = None, sample_rate: float = None, path: str = None
+    ) -> "HttpTraceRecorder":
+        recorder = cls.instance()
+        if capacity is not None and capacity != recorder.capacity:
+            recorder.capacity = capacity
+            recorder.records = deque(recorder.records, maxlen=capacity)
+        if preview_bytes is not None:
+            recorder.preview_bytes = preview_bytes
+        if sample_rate is not None:
+            recorder.sample_rate = sample_rate
+        if path is not None:
+            recorder.path = path
+        return recorder
+
+    def _preview(self, content: Optional[bytes]) -> Optional[str]:
+        if not content:
+            return None
+        return content[: self.preview_bytes].decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _request_content(request: httpx.Request) -> Optional[bytes]:
+        # stream 形式的请求体(比如上传文件)读取会消费掉数据, 不做预览
+        try:
+            return request.content
+        except httpx.RequestNotRead:
+            return None
+
+    def record(
+        self,
+        request: httpx.Request,
+        timing: RequestTiming,
+        response: httpx.Response = None,
+        response_bytes: int = None,
+        error: Exception = None,
+    ) -> TraceRecord:
+        """
+        response_bytes: stream 响应由调用方传入已下载的字节数, 此时不会读取 response.content
+        """
+        req_content = self._request_content(request)
+        status = response.status_code if response is not None else None
+
+        res_content = None
+        if response is not None and response_bytes is None:
+            res_content = response.content
+            response_bytes = len(res_content)
+
+        failed = error is not None or (status is not None and status >= 400)
+        full = failed or (self.sample_rate and random.random() < self.sample_rate)
+
+        record = TraceRecord(
+            ts=time(),
+            method=request.method,
+            url=str(request.url),
+            status=status,
+            connect_s=timing.connect,
+            ttfb_s=timing.ttfb,
+            total_s=timing.elapsed,
+            request_bytes=len(req_content) if req_content is not None else None,
+            response_bytes=response_bytes,
+            request_preview=self._preview(req_content),
+            response_preview=self._preview(res_content),
+            error=repr(error) if error is not None else None,
+        )
+
+        if full:
+            record.request_body = req_content.decode("utf-8", errors="replace") if req_content else None
+            record.response_body = res_content.decode("utf-8", errors="replace") if res_content else None
+
+        self.records.append(record)
+
+        if self.path:
+            self._ensure_writer()
+            self._queue.put(record)
+
+        return record
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            with self._instance_lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(target=self._write_loop, name="http-trace-writer", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            batch: List[TraceRecord] = [record]
+            # 一次取完当前积压的记录, 合并写入
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(r.to_json() + "\n" for r in batch)
+            except Exception as e:
+                logger.error(f"error occurred while writing http trace to {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """等待已记录的内容全部写入文件"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def dump(self, path: str):
+        """把环形缓冲区中的记录写到指定文件, 比如用例失败时保留现场"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(r.to_json() + "\n" for r in list(self.records))
+
+    def clear(self):
+        self.records.clear()
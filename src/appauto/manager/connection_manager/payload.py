@@ -0,0 +1,85 @@
+"""
+预先序列化的请求体模板.
+
+长上下文压测时每个请求的 messages 都一样, 只有 seed / max_tokens 等少数字段不同.
+PayloadTemplate 只把不变的部分序列化一次(安装了 orjson 时使用 orjson), 每个请求只编码变化的字段并拼接成 bytes,
+通过 content= 直接发送, 不再由 httpx 重复 json 编码整个 messages.
+"""
+
+import json
+import importlib.util
+from array import array
+from time import perf_counter
+from typing import Any, Dict, Sequence
+from appauto.manager.connection_manager.sse import percentile
+
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+else:
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class PayloadTemplate:
+    """
+    用法:
+        template = sglang.chat_template(content, model)  # 或 PayloadTemplate(body, variables=("seed", "max_tokens"))
+        for i in range(n):
+            sglang.talk_to_llm(content, model, payload=template.render(seed=i))
+        template.stats()
+
+    variables: 每个请求可能不同的顶层字段, 会从 body 中移出作为默认值, render 时拼接在末尾.
+    不在 variables 中的字段也可以在 render 时传入, 但不能与 body 中已有的字段重名.
+    """
+
+    DEFAULT_VARIABLES = ("seed", "max_tokens", "user")
+
+    def __init__(self, body: Dict[str, Any], variables: Sequence[str] = DEFAULT_VARIABLES):
+        body = dict(body)
+        self.defaults = {k: body.pop(k) for k in variables if k in body}
+        self.keys = frozenset(body)
+
+        start = perf_counter()
+        prefix = dumps(body)
+        self.build_s = perf_counter() - start
+
+        # 去掉结尾的 "}", render 时补上变化字段后再闭合
+        self._prefix = prefix[:-1]
+        self._empty = not body
+        self.encode_times = array("d")
+
+    def __len__(self):
+        return len(self._prefix) + 1
+
+    def render(self, **fields) -> bytes:
+        start = perf_counter()
+
+        if conflict := self.keys.intersection(fields):
+            raise ValueError(f"fields {sorted(conflict)} are part of the template body")
+
+        fields = {**self.defaults, **fields}
+        tail = b",".join(dumps(k) + b":" + dumps(v) for k, v in fields.items() if v is not None)
+        if not tail:
+            content = self._prefix + b"}"
+        else:
+            content = self._prefix + (b"" if self._empty else b",") + tail + b"}"
+
+        self.encode_times.append(perf_counter() - start)
+        return content
+
+    def stats(self) -> Dict:
+        """模板构建耗时和每个请求的编码耗时(单位 s)"""
+        times = self.encode_times
+        return dict(
+            body_bytes=len(self),
+            build_s=self.build_s,
+            requests=len(times),
+            encode_mean_s=sum(times) / len(times) if times else None,
+            encode_p99_s=percentile(times, 99),
+            encode_max_s=max(times) if times else None,
+        )
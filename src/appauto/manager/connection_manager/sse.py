@@ -0,0 +1,301 @@
+"""
+stream(SSE) 响应的增量解析.
+
+直接消费 iter_bytes 的原始字节, 按行切出 data 负载后交给字段提取策略, 文本片段放进 list 最后 join,
+避免逐行解码字符串和 full_content += chunk 带来的二次方拷贝.
+"""
+
+import json
+import logging
+from array import array
+from time import perf_counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Sequence, Tuple
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+
+class StreamExtractor:
+    """
+    字段提取策略: 从每个 data 负载(已 json.loads)中取出文本片段.
+    DONE_PAYLOADS 中的负载表示 stream 结束.
+    """
+
+    DONE_PAYLOADS: Tuple[bytes, ...] = ()
+
+    def extract(self, data: Dict[str, Any]) -> Optional[str]:
+        raise NotImplementedError
+
+
+class OpenAIDeltaExtractor(StreamExtractor):
+    """
+    OpenAI 兼容接口: choices[0].delta.content
+    fields: 按顺序取 delta 中第一个非空字段, 比如测 TTFT 时需要把 reasoning_content 也算作首 token
+    """
+
+    DONE_PAYLOADS = (b"[DONE]",)
+
+    def __init__(self, fields: Tuple[str, ...] = ("content",)):
+        self.fields = fields
+
+    def extract(self, data: Dict[str, Any]) -> Optional[str]:
+        if choices := data.get("choices"):
+            delta = choices[0].get("delta") or {}
+            for name in self.fields:
+                if chunk := delta.get(name):
+                    return chunk
+
+
+class ZhiwenResponseExtractor(StreamExtractor):
+    """知问深度搜索: response"""
+
+    DONE_PAYLOADS = (
+        b'{"retcode": 0, "retmsg": "", "data": true}',
+        b'{"response": "", "current_node": "", "state": 0}',
+    )
+
+    def extract(self, data: Dict[str, Any]) -> Optional[str]:
+        chunk = data.get("response")
+        return chunk if isinstance(chunk, str) else None
+
+
+class ZhiwenAnswerExtractor(ZhiwenResponseExtractor):
+    """知问普通搜索: data.answer"""
+
+    def extract(self, data: Dict[str, Any]) -> Optional[str]:
+        chunk = data.get("data").get("answer")
+        return chunk if isinstance(chunk, str) else None
+
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """线性插值百分位, p 取值 0~100"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+@dataclass
+class StreamResult:
+    """
+    一次 stream 请求的文本和逐 chunk 时间.
+    timestamps: 每个内容 chunk 到达时间(相对请求开始, 单位 s, 单调时钟), 用 array 紧凑存储
+    """
+
+    text: str
+    timestamps: array = field(default_factory=lambda: array("d"))
+    usage: Optional[Dict] = None
+    e2e_latency: Optional[float] = None
+
+    PERCENTILES = (50, 90, 99)
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def completion_tokens(self) -> Optional[int]:
+        return self.usage.get("completion_tokens") if self.usage else None
+
+    @property
+    def prompt_tokens(self) -> Optional[int]:
+        return self.usage.get("prompt_tokens") if self.usage else None
+
+    @property
+    def cached_tokens(self) -> Optional[int]:
+        """命中 prefix cache 的 prompt token 数, OpenAI 格式在 prompt_tokens_details 中, 部分后端直接放在 usage 中"""
+        if not self.usage:
+            return None
+        details = self.usage.get("prompt_tokens_details") or {}
+        return details.get("cached_tokens", self.usage.get("cached_tokens"))
+
+    @property
+    def ttft(self) -> Optional[float]:
+        return self.timestamps[0] if self.timestamps else None
+
+    @property
+    def itl(self) -> List[float]:
+        """相邻 chunk 的间隔"""
+        ts = self.timestamps
+        return [ts[i] - ts[i - 1] for i in range(1, len(ts))]
+
+    @property
+    def chunks_per_token(self) -> Optional[float]:
+        if self.completion_tokens:
+            return self.chunk_count / self.completion_tokens
+
+    @property
+    def tpot(self) -> Optional[float]:
+        """首 token 之后每个 token 的平均耗时; 没有 usage 时按 chunk 计"""
+        if self.chunk_count < 2:
+            return None
+        tokens = self.completion_tokens or self.chunk_count
+        if tokens < 2:
+            return None
+        return (self.timestamps[-1] - self.timestamps[0]) / (tokens - 1)
+
+    @property
+    def decode_rate(self) -> Optional[float]:
+        """decode 阶段 tokens/s"""
+        if tpot := self.tpot:
+            return 1 / tpot
+
+    def itl_percentiles(self, ps: Sequence[float] = None) -> Dict[str, Optional[float]]:
+        itl = self.itl
+        return {f"p{p}": percentile(itl, p) for p in ps or self.PERCENTILES}
+
+    def summary(self) -> Dict:
+        return dict(
+            ttft=self.ttft,
+            tpot=self.tpot,
+            decode_rate=self.decode_rate,
+            e2e_latency=self.e2e_latency,
+            chunk_count=self.chunk_count,
+            completion_tokens=self.completion_tokens,
+            chunks_per_token=self.chunks_per_token,
+            itl=self.itl_percentiles(),
+        )
+
+
+class SSEDecoder:
+    """
+    按行切分原始字节, 只保留 data: 行的负载(bytes). 每个 data 行视为一个事件, 与服务端逐行推送的格式一致.
+    """
+
+    PREFIX = b"data:"
+    WHITESPACE = b" \t\r"
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # buffer 中已确认没有换行符的长度, 很长的一行分多次到达时不重复扫描
+        self._scanned = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += chunk
+
+        payloads = []
+        start, ws = 0, self.WHITESPACE
+        with memoryview(buffer) as view:
+            while (end := buffer.find(b"\n", max(start, self._scanned))) != -1:
+                if buffer.startswith(self.PREFIX, start, end):
+                    # 去掉首尾空白后只拷贝一次
+                    a, b = start + len(self.PREFIX), end
+                    while a < b and buffer[a] in ws:
+                        a += 1
+                    while b > a and buffer[b - 1] in ws:
+                        b -= 1
+                    payloads.append(view[a:b].tobytes())
+                start = end + 1
+
+        del buffer[:start]
+        self._scanned = len(buffer)
+        return payloads
+
+    def flush(self) -> List[bytes]:
+        """stream 结束时处理最后一行没有换行符的数据"""
+        payloads = self.feed(b"\n") if self._buffer else []
+        self._buffer.clear()
+        self._scanned = 0
+        return payloads
+
+
+class StreamDecoder:
+    """
+    用法:
+        decoder = StreamDecoder(OpenAIDeltaExtractor())
+        text = decoder.decode(response.iter_bytes())
+        decoder.usage
+
+    process_chunk=False 时不提取文本, 只解析包含 usage 的负载.
+    record_timing=True 时记录每个内容 chunk 的到达时间, start 为请求发出的时间(perf_counter),
+    不指定时以开始解析的时间为准(不包含等待响应头的时间).
+    """
+
+    def __init__(self, extractor: StreamExtractor = None, process_chunk=True, record_timing=False, start=None):
+        self.extractor = extractor or OpenAIDeltaExtractor()
+        self.process_chunk = process_chunk
+        self.sse = SSEDecoder()
+        self.chunks: List[str] = []
+        self.usage: Optional[Dict] = None
+        self.done = False
+        self.start = start if start is not None else perf_counter()
+        self.timestamps = array("d") if record_timing else None
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def _handle_payload(self, payload: bytes):
+        if payload in self.extractor.DONE_PAYLOADS:
+            self.done = True
+            return
+
+        if not self.process_chunk and b'"usage"' not in payload:
+            return
+
+        try:
+            data = json.loads(payload)
+            if self._debug:
+                logger.debug(f"per stream link payload: {data}")
+
+            if self.process_chunk and (chunk := self.extractor.extract(data)):
+                self.chunks.append(chunk)
+                if self.timestamps is not None:
+                    self.timestamps.append(perf_counter() - self.start)
+
+            if isinstance(data, dict) and (usage := data.get("usage")):
+                self.usage = usage
+
+        except Exception as e:
+            logger.error(f"Process stream request failed: {e}, init_payload: {payload}")
+            raise
+
+    def feed(self, chunk: bytes):
+        """解析一段原始字节. 遇到结束负载后不再处理后续数据."""
+        for payload in self.sse.feed(chunk):
+            if self.done:
+                return
+            self._handle_payload(payload)
+
+    def finish(self):
+        for payload in self.sse.flush():
+            if self.done:
+                return
+            self._handle_payload(payload)
+
+    def decode(self, byte_iter: Iterable[bytes]) -> str:
+        for chunk in byte_iter:
+            self.feed(chunk)
+            if self.done:
+                break
+        else:
+            self.finish()
+
+        return self.text
+
+    async def adecode(self, byte_iter: AsyncIterable[bytes]) -> str:
+        async for chunk in byte_iter:
+            self.feed(chunk)
+            if self.done:
+                break
+        else:
+            self.finish()
+
+        return self.text
+
+    def result(self) -> StreamResult:
+        return StreamResult(
+            text=self.text,
+            timestamps=self.timestamps if self.timestamps is not None else array("d"),
+            usage=self.usage,
+            e2e_latency=perf_counter() - self.start,
+        )
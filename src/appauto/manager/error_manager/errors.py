@@ -1,7 +1,10 @@
 class NeedRetryOnHttpRC401(Exception):
     """Raised when http response status code is 401"""
 
-    pass
+    def __init__(self, *args, token: str = None):
+        super().__init__(*args)
+        # token used by the failed request, None if it was not a bearer token
+        self.token = token
 
 
 class OperationNotSupported(Exception):
@@ -14,3 +17,15 @@ class ModelGibberishError(Exception):
     """Raised when model output is gibberish."""
 
     pass
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker of an endpoint path or model is open."""
+
+    pass
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the deadline budget is used up."""
+
+    pass
@@ -0,0 +1,17 @@
+import asyncio
+from typing import Awaitable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_with_concurrency(aws: Iterable[Awaitable[T]], concurrency: int, return_exceptions=False) -> List[T]:
+    """
+    与 asyncio.gather 相同, 但同一时刻最多 concurrency 个协程在执行. 结果顺序与 aws 一致.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*[run(aw) for aw in aws], return_exceptions=return_exceptions)
@@ -1,24 +1,136 @@
+"""
+带查询能力的 list.
+
+filter / first / get 的条件写法: 属性名=值, 值按正则整体匹配 str(getattr(item, 属性名)).
+- 正则在第一次使用时编译并缓存, 不含正则元字符的值直接按字符串相等比较.
+- 默认逐个元素比较, 元素的属性变化(比如 refresh 之后)总能反映在结果中.
+- 调用 reindex() 后开启属性索引: 每个属性第一次被查询时建立 {str(属性值): [下标]} 的索引, 之后的 filter 复用;
+  list 本身被修改时索引自动重建, 元素的属性值变化不会被感知, 需要再次调用 reindex().
+  适合元素不再变化、需要反复 filter 的大列表.
+"""
+
 import re
-from typing import List, TypeVar
+import functools
+from typing import Dict, List, Optional, Pattern, Set, TypeVar
 
 T = TypeVar("T")
 
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(value: str) -> Pattern:
+    return re.compile(f"^{value}$")
+
+
+def _is_literal(value: str) -> bool:
+    return not _REGEX_META.intersection(value)
+
 
 class CustomList(List[T]):
+    def reindex(self) -> "CustomList[T]":
+        """开启属性索引并丢弃已建立的索引, 返回自身"""
+        self.__dict__["_indexes"] = {}
+        return self
+
+    @property
+    def indexed(self) -> bool:
+        return "_indexes" in self.__dict__
+
+    def _index(self, name: str) -> Dict[str, List[int]]:
+        indexes = self.__dict__["_indexes"]
+        if (index := indexes.get(name)) is None:
+            index = indexes[name] = {}
+            for i, item in enumerate(self):
+                index.setdefault(str(getattr(item, name)), []).append(i)
+        return index
+
+    def _positions(self, name: str, value) -> Set[int]:
+        index, value = self._index(name), str(value)
+        if _is_literal(value):
+            return set(index.get(value, ()))
+
+        pattern = _compile(value)
+        return {i for key, positions in index.items() if pattern.match(key) for i in positions}
+
+    def _match(self, item, name: str, value) -> bool:
+        value, actual = str(value), str(getattr(item, name))
+        return actual == value if _is_literal(value) else bool(_compile(value).match(actual))
+
     def _match_all(self, item, **kwargs):
-        return all([re.match(f"^{value}$", str(getattr(item, name))) for name, value in kwargs.items()])
+        return all(self._match(item, name, value) for name, value in kwargs.items())
 
     def _match_any(self, item, **kwargs):
-        return any([re.match(f"^{value}$", str(getattr(item, name))) for name, value in kwargs.items()])
+        return any(self._match(item, name, value) for name, value in kwargs.items())
 
     def filter(self, index: slice = None, OR: dict = None, **kwargs) -> List[T]:
-        result = CustomList()
-        funcs = {id(OR): self._match_any, id(kwargs): self._match_all}
+        """满足 kwargs 中所有条件, 且(指定 OR 时)满足 OR 中任一条件的元素, 保持原有顺序"""
+        if not self.indexed:
+            result = CustomList(
+                item
+                for item in self
+                if (not kwargs or self._match_all(item, **kwargs)) and (not OR or self._match_any(item, **OR))
+            )
+            return CustomList(result[index]) if index else result
 
-        for item in self:
-            if all(funcs[id(c)](item, **c) for c in [OR, kwargs] if c):
-                result.append(item)
+        positions = None
+        for name, value in kwargs.items():
+            matched = self._positions(name, value)
+            positions = matched if positions is None else positions & matched
+            if not positions:
+                break
+
+        if OR and (positions is None or positions):
+            matched = set().union(*(self._positions(name, value) for name, value in OR.items()))
+            positions = matched if positions is None else positions & matched
+
+        if positions is None:
+            result = CustomList(self)
+        else:
+            result = CustomList([self[i] for i in sorted(positions)])
 
         if index:
             result = CustomList(result[index])
         return result
+
+    def first(self, OR: dict = None, **kwargs) -> Optional[T]:
+        """按顺序返回第一个满足条件的元素, 找到后不再继续比较; 没有时返回 None"""
+        for item in self:
+            if (not kwargs or self._match_all(item, **kwargs)) and (not OR or self._match_any(item, **OR)):
+                return item
+        return None
+
+    def get(self, OR: dict = None, **kwargs) -> T:
+        """同 first, 没有满足条件的元素时抛出 ValueError"""
+        if (item := self.first(OR, **kwargs)) is None:
+            raise ValueError(f"no item matches: {kwargs or ''}{f' OR {OR}' if OR else ''}")
+        return item
+
+
+def _invalidate_index(name: str):
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if (indexes := self.__dict__.get("_indexes")) is not None:
+            indexes.clear()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(CustomList, _name, _invalidate_index(_name))
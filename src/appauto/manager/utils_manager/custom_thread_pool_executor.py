@@ -1,7 +1,9 @@
 import time
+import contextvars
 from typing import List
 from concurrent.futures import ThreadPoolExecutor, Future
 from appauto.manager.config_manager import LoggingConfig
+from appauto.manager.connection_manager.circuit_breaker import Deadline
 
 logger = LoggingConfig.get_logger()
 
@@ -24,14 +26,17 @@ class CustomThreadPoolExecutor(ThreadPoolExecutor):
         # Wrap the function call to allow tracking on CustomFuture
         def wrapper(*args, **kwargs):
             try:
+                # Tasks still queued when the submitter's Deadline runs out fail without running
+                Deadline.check()
                 result = fn(*args, **kwargs)
                 custom_future.set_result(result)
             except Exception as e:
                 custom_future.set_exception(e)
             return custom_future
 
-        # Submit the wrapped function and return the CustomFuture
-        super().submit(wrapper, *args, **kwargs)
+        # Run in a copy of the caller's context, so that context vars (e.g. Deadline) propagate to worker threads
+        ctx = contextvars.copy_context()
+        super().submit(ctx.run, wrapper, *args, **kwargs)
         return custom_future
 
     def map(self, fn, *iterables, timeout=None, chunksize=1):
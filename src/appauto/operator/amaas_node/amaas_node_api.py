@@ -4,6 +4,7 @@ from typing import Dict, TypeVar, Literal, TYPE_CHECKING, List
 from appauto.manager.component_manager.components.amaas import AMaaS
 from appauto.manager.config_manager.config_logging import LoggingConfig
 from appauto.organizer.model_params.constructor import AMaaSModelParams
+from .model_sweep import ModelSweep
 
 from appauto.manager.component_manager.components.amaas.models.model_store import (
     LLMModelStore,
@@ -124,6 +125,22 @@ class AMaaSNodeApi(AMaaS):
             f"timeout while waiting for gpu released. total: {worker.gpu_sum}, empty: {worker.gpu_empty_count}"
         )
 
+    def sweep_with_default(
+        self,
+        types: List[Literal["llm", "vlm", "embedding", "rerank", "parser", "audio"]],
+        tps: List[Literal[1, 2, 4, 8]],
+        priority: List[Literal["P0", "P1", "P2", "P3"]] = None,
+        **kwargs,
+    ) -> ModelSweep:
+        """
+        批量版 launch_model_with_default: 并发 check 所有 (model_store, tp), 再按空闲 GPU 装箱并行拉起 -> 试验场景 -> 停止.
+        kwargs 见 ModelSweep, 结果见 sweep.tasks / sweep.summary()
+        """
+        sweep = ModelSweep.of_types(self, types, tps, priority, **kwargs)
+        sweep.run()
+        logger.info(f"sweep finished: {sweep.summary()}")
+        return sweep
+
     def get_models_store(
         self,
         model_store_type: Literal["llm", "vlm", "embedding", "rerank", "parser", "audio"],
@@ -0,0 +1,331 @@
+"""
+模型中心批量拉起测试(sweep).
+
+逐个 (model_store, tp) 串行执行 检测 -> 拉起 -> 试验场景 -> 停止 -> 等待 GPU 释放 时, 大部分模型只占用 1~2 张卡,
+其余 GPU 一直空闲. ModelSweep 先并发完成所有 check, 再按 GPU 数量从大到小把拉起任务装箱到所有 worker 的空闲 GPU 上,
+每个模型 running 后立即做试验场景检查, 停止并释放 GPU 后调度下一个任务.
+
+空闲 GPU: 拓扑快照(TopologySnapshot)中没有实例、且未被本次 sweep 预留的 GPU;
+同时受 Worker.gpu_empty_count / gpu_empty_vram 约束(已预留但平台尚未感知的部分从中扣除), 以及每张卡的剩余显存.
+同一个 model_store 同时只能运行一个模型(run 会检查同名模型), 不同 tp 的任务之间串行.
+"""
+
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from time import time, sleep
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from addict import Dict as ADDict
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.error_manager.errors import OperationNotSupported
+from appauto.manager.utils_manager.custom_thread_pool_executor import CustomThreadPoolExecutor
+from appauto.manager.component_manager.components.amaas.models import TopologySnapshot
+from appauto.manager.component_manager.components.amaas.models.model_store import BaseModelStore
+from appauto.manager.component_manager.components.amaas.scene.scene import LLM, VLM, Embedding, Rerank
+from appauto.organizer.model_params.constructor import AMaaSModelParams
+
+if TYPE_CHECKING:
+    from .amaas_node_api import AMaaSNodeApi
+    from appauto.manager.component_manager.components.amaas.models.base import BaseModel
+
+logger = LoggingConfig.get_logger()
+
+GPUKey = Tuple[str, int]
+
+
+@dataclass
+class SweepTask:
+    model_store: BaseModelStore
+    type_: str
+    tp: int
+    params: Optional[ADDict] = None
+    # pending -> checked -> launching -> passed / failed; 检测阶段可能为 skipped / check_failed
+    status: str = "pending"
+    error: Optional[str] = None
+    worker_name: Optional[str] = None
+    gpus: Tuple[GPUKey, ...] = ()
+    timestamps: Dict[str, float] = field(default_factory=dict)
+
+    def __str__(self):
+        return f"SweepTask({self.model_store.name}, tp: {self.tp}, status: {self.status})"
+
+    @property
+    def gpu_count(self) -> int:
+        return len(self.params.gpu_ids) if self.params and self.params.gpu_ids else self.tp
+
+    @property
+    def required_vram(self) -> int:
+        return self.model_store.required_vram or 0
+
+    @property
+    def vram_per_gpu(self) -> float:
+        return self.required_vram / max(self.gpu_count, 1)
+
+    def elapsed(self, start: str, end: str) -> Optional[float]:
+        if start in self.timestamps and end in self.timestamps:
+            return self.timestamps[end] - self.timestamps[start]
+        return None
+
+    def report(self) -> Dict:
+        return dict(
+            model=self.model_store.name,
+            type=self.type_,
+            tp=self.tp,
+            status=self.status,
+            worker=self.worker_name,
+            gpus=[idx for _, idx in self.gpus],
+            launch_s=self.elapsed("launched", "running"),
+            scene_s=self.elapsed("running", "scene_checked"),
+            total_s=self.elapsed("launched", "released"),
+            error=self.error,
+        )
+
+
+def default_scene_check(api: "AMaaSNodeApi", task: SweepTask, model: "BaseModel"):
+    """按模型类型发一次最简单的试验场景请求, 返回为空时报错"""
+    kwargs = dict(object_id=model.name, amaas=api)
+    match task.type_:
+        case "llm":
+            res = LLM(api.mgt_ip, api.port, **kwargs).talk("你好", max_tokens=64)
+        case "vlm":
+            res = VLM(api.mgt_ip, api.port, **kwargs).talk("请解释这张图", max_tokens=64)
+        case "embedding":
+            res = Embedding(api.mgt_ip, api.port, **kwargs).talk(["你好", "您好"])
+        case "rerank":
+            res = Rerank(api.mgt_ip, api.port, **kwargs).talk(documents=["叶文洁是三体中的人物", "今天天气很好"])
+        case _:
+            return
+
+    assert res, f"{model.name} scene check got empty result: {res}"
+
+
+class ModelSweep:
+    """
+    用法:
+        sweep = ModelSweep.of_types(amaas.api, ["llm", "embedding"], tps=[1, 2, 4], priority=["P0", "P1", "P2"])
+        tasks = sweep.run()
+        logger.info(sweep.summary())
+    """
+
+    def __init__(
+        self,
+        api: "AMaaSNodeApi",
+        tasks: List[SweepTask],
+        check_concurrency: int = 16,
+        scene_check: Callable[["AMaaSNodeApi", SweepTask, "BaseModel"], None] = default_scene_check,
+        running_timeout_s: int = 900,
+        release_timeout_s: int = 300,
+        interval_s: int = 10,
+    ):
+        self.api = api
+        self.tasks = tasks
+        self.check_concurrency = check_concurrency
+        self.scene_check = scene_check
+        self.running_timeout_s = running_timeout_s
+        self.release_timeout_s = release_timeout_s
+        self.interval_s = interval_s
+
+        self.reserved: Dict[GPUKey, SweepTask] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @classmethod
+    def of_types(
+        cls,
+        api: "AMaaSNodeApi",
+        types: List[str],
+        tps: List[int],
+        priority: List[str] = None,
+        **kwargs,
+    ) -> "ModelSweep":
+        tasks = [
+            SweepTask(m_s, type_, tp) for type_ in types for m_s in api.get_models_store(type_, priority) for tp in tps
+        ]
+        return cls(api, tasks, **kwargs)
+
+    def run(self) -> List[SweepTask]:
+        self.started_at = time()
+        self.check_all()
+
+        queue = sorted((t for t in self.tasks if t.status == "checked"), key=lambda t: t.gpu_count, reverse=True)
+        logger.info(f"sweep: {len(queue)} of {len(self.tasks)} tasks passed check, start launching.")
+
+        with CustomThreadPoolExecutor(max_workers=max(len(queue), 1)) as executor:
+            inflight: Dict[Future, SweepTask] = {}
+
+            while queue or inflight:
+                snapshot = self.api.topology()
+
+                max_gpus = max((w.gpu_sum for w in snapshot.workers.values()), default=0)
+                busy = {t.model_store.name for t in inflight.values()}
+                for task in list(queue):
+                    if task.gpu_count > max_gpus:
+                        queue.remove(task)
+                        task.status, task.error = "failed", f"no worker has {task.gpu_count} gpus"
+                        logger.error(f"{task}: {task.error}")
+                        continue
+
+                    if task.model_store.name in busy:
+                        continue
+
+                    if placement := self.place(task, snapshot):
+                        queue.remove(task)
+                        task.worker_name, task.gpus = placement
+                        for key in task.gpus:
+                            self.reserved[key] = task
+                        task.params = ADDict(
+                            task.params,
+                            worker_id=snapshot.workers[task.worker_name].id,
+                            gpu_ids=[snapshot.gpus[key].gpu_id for key in task.gpus],
+                        )
+                        inflight[executor.submit(self.launch, task)] = task
+                        busy.add(task.model_store.name)
+
+                if not inflight:
+                    # 没有运行中的任务时仍无法放置, 说明资源永远不够(或被 sweep 以外的模型占用)
+                    for task in queue:
+                        task.status, task.error = "failed", f"no worker can host {task.gpu_count} gpus"
+                        logger.error(f"{task}: {task.error}")
+                    break
+
+                done, _ = wait(inflight, timeout=self.interval_s, return_when=FIRST_COMPLETED)
+                for fu in done:
+                    task = inflight.pop(fu)
+                    for key in task.gpus:
+                        self.reserved.pop(key, None)
+
+        self.finished_at = time()
+        return self.tasks
+
+    def check_all(self):
+        """并发生成默认参数并 check, 不支持的 tp 记为 skipped, 其他异常(check 不通过、生成参数失败等)记为 check_failed"""
+
+        def check(task: SweepTask):
+            try:
+                task.params = AMaaSModelParams(self.api.node, task.model_store, task.tp).gen_default_params
+                self.api.model_store_check(task.model_store, task.params)
+                task.status = "checked"
+            except OperationNotSupported as e:
+                task.status, task.error = "skipped", str(e)
+            except Exception as e:
+                task.status, task.error = "check_failed", str(e)
+                logger.error(f"{task} check failed: {e}")
+            task.timestamps["checked"] = time()
+
+        with CustomThreadPoolExecutor(max_workers=self.check_concurrency) as executor:
+            for fu in [executor.submit(check, task) for task in self.tasks]:
+                fu.result()
+
+    def free_gpus(self, snapshot: TopologySnapshot) -> Dict[str, List[GPUKey]]:
+        """每个 worker 上可以使用的 GPU, 按 index 排序"""
+        free: Dict[str, List[GPUKey]] = {}
+        for key in sorted(snapshot.gpus):
+            if key not in self.reserved and not snapshot.instances_on_gpu.get(key):
+                free.setdefault(key[0], []).append(key)
+        return free
+
+    def _gpu_vram_free(self, snapshot: TopologySnapshot, key: GPUKey) -> Optional[int]:
+        gpu = snapshot.gpus[key]
+        if gpu.memory_total is None or gpu.memory_used is None:
+            return None
+        return gpu.memory_total - gpu.memory_used
+
+    def place(self, task: SweepTask, snapshot: TopologySnapshot) -> Optional[Tuple[str, Tuple[GPUKey, ...]]]:
+        """
+        best-fit: 在所有放得下的 worker 中选择剩余空闲 GPU 最少的, 减少碎片; 指定了 gpu_ids 时只能放在这些 GPU 上.
+        """
+        candidates = []
+        for worker_name, keys in self.free_gpus(snapshot).items():
+            worker = snapshot.workers[worker_name]
+
+            # 已预留但平台还未感知(尚无实例)的 GPU / 显存, 需要从 worker 的空闲统计中扣除
+            pending = [
+                k for k, t in self.reserved.items() if k[0] == worker_name and not snapshot.instances_on_gpu.get(k)
+            ]
+            if worker.gpu_empty_count is not None and worker.gpu_empty_count - len(pending) < task.gpu_count:
+                continue
+            if task.required_vram and worker.gpu_empty_vram is not None:
+                if worker.gpu_empty_vram - sum(self.reserved[k].vram_per_gpu for k in pending) < task.required_vram:
+                    continue
+
+            if task.params.gpu_ids:
+                wanted = {str(g) for g in task.params.gpu_ids}
+                keys = [k for k in keys if snapshot.gpus[k].gpu_id in wanted or str(k[1]) in wanted]
+                if len(keys) < len(wanted):
+                    continue
+
+            keys = [
+                k
+                for k in keys
+                if not task.vram_per_gpu
+                or (free := self._gpu_vram_free(snapshot, k)) is None
+                or free >= task.vram_per_gpu
+            ]
+            if len(keys) >= task.gpu_count:
+                candidates.append((len(keys) - task.gpu_count, worker_name, tuple(keys[: task.gpu_count])))
+
+        if not candidates:
+            return None
+
+        _, worker_name, keys = min(candidates)
+        return worker_name, keys
+
+    def launch(self, task: SweepTask) -> SweepTask:
+        logger.info(f"launch {task} on {task.worker_name}, gpus: {[idx for _, idx in task.gpus]}")
+
+        task.status = "launching"
+        task.timestamps["launched"] = time()
+        model = None
+        try:
+            # 创建和等待分开, 等待失败时也能停止本任务拉起的模型
+            model = task.model_store.run(**task.params)
+            model.wait_for_running(self.interval_s, self.running_timeout_s)
+            task.timestamps["running"] = time()
+
+            if self.scene_check:
+                self.scene_check(self.api, task, model)
+            task.timestamps["scene_checked"] = time()
+            task.status = "passed"
+
+        except Exception as e:
+            task.status, task.error = "failed", str(e)
+            logger.error(f"{task} failed: {e}")
+
+        finally:
+            try:
+                if model is not None:
+                    model.stop()
+                else:
+                    # 创建请求失败时模型可能已经存在; 同一 model_store 的任务串行, 按名称停止不会影响其他任务
+                    self.api.stop_model(task.model_store, task.type_)
+                self.wait_gpu_release(task)
+            except Exception as e:
+                logger.error(f"error occurred while releasing {task}: {e}")
+            task.timestamps["released"] = time()
+
+        return task
+
+    def wait_gpu_release(self, task: SweepTask):
+        start = time()
+        while time() - start <= self.release_timeout_s:
+            snapshot = self.api.topology()
+            if not any(snapshot.instances_on_gpu.get(key) for key in task.gpus):
+                return
+            sleep(self.interval_s)
+
+        raise TimeoutError(f"timeout while waiting for {task} releasing gpus: {task.gpus}")
+
+    def summary(self) -> Dict:
+        """serial_s: 各任务拉起到释放的耗时之和, 即串行执行时的大致耗时"""
+        serial_s = sum(t.elapsed("launched", "released") or 0 for t in self.tasks)
+        wall_s = (self.finished_at or time()) - (self.started_at or time())
+        counts: Dict[str, int] = {}
+        for t in self.tasks:
+            counts[t.status] = counts.get(t.status, 0) + 1
+
+        return dict(
+            wall_s=wall_s,
+            serial_s=serial_s,
+            speedup=serial_s / wall_s if wall_s else None,
+            counts=counts,
+            tasks=[t.report() for t in self.tasks],
+        )
@@ -0,0 +1,219 @@
+"""
+冷启动耗时: 从 model_store.run 到第一个生成 token.
+
+发起 run 后以较短间隔(默认 0.5s)轮询模型列表和实例列表, 记录模型 status 与每个实例 state 第一次出现的时间,
+running 后立即发 TTFT 探测请求(只等第一个 token). 结果按阶段拆分, 比如:
+    {"submit": 1.2, "pending": 0.5, "analyzing": 3.1, "scheduled": 0.8, "starting": 2.0, "loading": 85.3,
+     "first_token": 0.9}
+加载变慢时可以直接看出是哪个阶段变慢, 而不是笼统的超时.
+
+用法:
+    results = ColdStartBench.sweep(amaas, amaas.init_model_store.llm.filter(name="Qwen3-8B"), tps=[1, 2], repeat=3)
+"""
+
+import threading
+from random import choice
+from dataclasses import dataclass, field, asdict
+from time import time, sleep
+from typing import Dict, List, Optional, TYPE_CHECKING
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.component_manager.components.amaas.models.base import BaseModel
+from appauto.manager.component_manager.components.amaas.models.model_instance import ModelInstance
+from appauto.manager.component_manager.components.amaas.records import InstanceRecord, ModelRecord
+from appauto.manager.component_manager.components.amaas.scene.llm import LLM
+from .common import append_jsonl, default_output, mark_phase, stop_model
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.manager.component_manager.components.amaas.models.base import BaseModelStore
+
+logger = LoggingConfig.get_logger()
+
+
+@dataclass
+class ColdStartResult:
+    model: str
+    tp: int
+    version: Optional[str] = None
+    submitted_at: float = 0
+    # 状态第一次出现时距离发起 run 的秒数
+    model_states: Dict[str, float] = field(default_factory=dict)
+    instance_states: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    running_s: Optional[float] = None
+    first_token_s: Optional[float] = None
+    ttft: Optional[float] = None
+    error: Optional[str] = None
+
+    def states(self) -> Dict[str, float]:
+        """
+        状态时间线: 实例出现之前用模型的 status, 之后用最早出现的实例的 state(更细), 按时间排序.
+        """
+        instance = min(self.instance_states.values(), key=lambda states: min(states.values()), default={})
+        first_seen = min(instance.values(), default=float("inf"))
+
+        merged = {state: t for state, t in self.model_states.items() if t < first_seen}
+        for state, t in instance.items():
+            merged[state] = min(t, merged.get(state, t))
+        if "running" in self.model_states:
+            merged.setdefault("running", self.model_states["running"])
+        return dict(sorted(merged.items(), key=lambda kv: kv[1]))
+
+    def phases(self) -> Dict[str, float]:
+        """每个状态持续的时间; submit 为发起 run 到第一次观测到状态, first_token 为 running 到首 token"""
+        states = list(self.states().items())
+        phases = {"submit": states[0][1]} if states else {}
+        for (state, t), (_, t_next) in zip(states, states[1:]):
+            phases[state] = t_next - t
+
+        if self.running_s is not None and self.first_token_s is not None:
+            phases["first_token"] = self.first_token_s - self.running_s
+        return phases
+
+    def to_row(self) -> Dict:
+        return dict(**asdict(self), phases=self.phases())
+
+
+class ColdStartBench:
+    def __init__(
+        self,
+        amaas: "AMaaS",
+        model_store: "BaseModelStore",
+        tp: int,
+        params: Dict = None,
+        version: str = None,
+        interval_s: float = 0.5,
+        timeout_s: int = 900,
+        probe_prompt: str = "你好",
+        probe_timeout_s: int = 60,
+        keep_model: bool = False,
+    ):
+        """
+        params: model_store.run 的参数, 不指定时使用 get_run_rule 的默认值并随机选择 worker
+        version: 写入结果中便于区分版本, 不指定时使用模型的 backend_version
+        """
+        self.amaas = amaas
+        self.model_store = model_store
+        self.tp = tp
+        self.params = params
+        self.version = version
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.probe_prompt = probe_prompt
+        self.probe_timeout_s = probe_timeout_s
+        self.keep_model = keep_model
+
+    def default_params(self) -> Dict:
+        rule = self.model_store.get_run_rule()
+        params = dict(worker_id=choice(self.amaas.workers).object_id, tp=self.tp, access_limit=rule.data.access_limit)
+        if rule.data.max_total_tokens:
+            params["max_total_tokens"] = rule.data.max_total_tokens
+        return params
+
+    def _poll(self, result: ColdStartResult) -> Optional[BaseModel]:
+        """一次轮询: 模型列表 + 实例列表, 记录新出现的状态"""
+        res = self.amaas.get("get_self", url_map=BaseModel.GET_URL_MAP, encode_result=ModelRecord, cache=False)
+        item = next((m for m in res.data.get("items") if m.name == self.model_store.name), None)
+        if item is None:
+            return None
+
+        model = BaseModel(self.amaas.mgt_ip, self.amaas.port, object_id=item.id, data=item, amaas=self.amaas)
+
+        now = time() - result.submitted_at
+        result.model_states.setdefault(model.status, now)
+
+        instances = self.amaas.paginate(
+            "get_instances", url_map=ModelInstance.GET_URL_MAP, encode_result=InstanceRecord, cache=False
+        )
+        for ins in instances:
+            if ins.model_id == model.object_id:
+                result.instance_states.setdefault(ins.name, {}).setdefault(ins.state, now)
+        return model
+
+    def _probe(self, result: ColdStartResult):
+        """running 之后网关可能还没有就绪, 探测失败时重试直到 probe_timeout_s"""
+        llm = LLM(self.amaas.mgt_ip, self.amaas.port, object_id=self.model_store.name, amaas=self.amaas)
+        deadline = time() + self.probe_timeout_s
+        while True:
+            try:
+                result.ttft = llm.probe_ttft(self.probe_prompt, max_tokens=16, timeout=self.probe_timeout_s)
+                result.first_token_s = time() - result.submitted_at
+                return
+            except Exception as e:
+                if time() >= deadline:
+                    raise
+                logger.info(f"ttft probe failed, retry: {e}")
+                sleep(self.interval_s)
+
+    def run(self) -> ColdStartResult:
+        params = self.params or self.default_params()
+        result = ColdStartResult(self.model_store.name, self.tp, self.version)
+
+        # run 内部会 sleep 后再查找模型, 放到线程里执行, 以便从发起请求开始就轮询状态
+        errors = []
+
+        def launch():
+            try:
+                self.model_store.run(**params)
+            except Exception as e:
+                errors.append(e)
+
+        mark_phase(f"cold_start {self.model_store.name} tp={self.tp}")
+        result.submitted_at = time()
+        thread = threading.Thread(target=launch, name="cold-start-run", daemon=True)
+        thread.start()
+
+        model = None
+        try:
+            while True:
+                if errors:
+                    raise errors[0]
+
+                model = self._poll(result) or model
+                if model is not None and model.status == "running":
+                    result.running_s = result.model_states["running"]
+                    break
+                if model is not None and model.status == "error":
+                    raise RuntimeError(f"{self.model_store.name} running failed, status is error.")
+                if time() - result.submitted_at > self.timeout_s:
+                    raise TimeoutError(f"Timeout while waiting for {self.model_store.name} running.")
+                sleep(self.interval_s)
+
+            if "llm" in (model.categories or []):
+                self._probe(result)
+            result.version = result.version or model.backend_version
+
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"cold start of {self.model_store.name}(tp: {self.tp}) failed: {e}")
+
+        finally:
+            thread.join()
+            if model is not None and not self.keep_model:
+                mark_phase(f"stop {self.model_store.name}")
+                stop_model(self.amaas, model, self.interval_s * 4, self.timeout_s)
+
+        logger.info(f"cold start of {self.model_store.name}(tp: {self.tp}): {result.phases()}")
+        return result
+
+    @classmethod
+    def sweep(
+        cls,
+        amaas: "AMaaS",
+        model_stores: List["BaseModelStore"],
+        tps: List[int],
+        repeat: int = 1,
+        output: str = None,
+        **kwargs,
+    ) -> List[ColdStartResult]:
+        """依次测每个 model_store x tp, 每次 repeat 遍, 每条结果追加到 output(jsonl)"""
+        output = output or default_output("cold_start")
+        results = []
+        for model_store in model_stores:
+            for tp in tps:
+                for _ in range(repeat):
+                    result = cls(amaas, model_store, tp, **kwargs).run()
+                    append_jsonl(output, [result.to_row()])
+                    results.append(result)
+
+        logger.info(f"cold start results: {output}")
+        return results
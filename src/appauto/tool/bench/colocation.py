@@ -0,0 +1,209 @@
+"""
+多模型同节点干扰: 几个模型放在同一个 worker 上时, 彼此对延迟和吞吐的影响.
+
+同一个 worker 上的模型共享 CPU(KT 的专家计算)、PCIe 和主机内存, 只检查请求能否成功看不出干扰. 每个模型测三个阶段:
+- alone: 只拉起该模型, 单独压测;
+- loaded: 所有模型都拉起, 只压测该模型, 其他模型空闲(看常驻带来的影响, 比如主机内存、CPU 绑核);
+- contended: 所有模型同时压测(看同时有负载时的干扰).
+每个阶段的负载相同(开环, 固定速率). 干扰比例 = 该阶段 / alone: 延迟、TTFT 大于 1 表示变慢, 吞吐小于 1 表示下降.
+contended 阶段所有模型的延迟比例都不超过 tolerance 时认为这组模型可以放在同一个节点上.
+
+开始前这些模型都不能处于运行状态, 结束后全部停止. worker 上的其他模型不受控制, 测试时最好保持空闲.
+
+用法:
+    stores = [m_s for m_s in amaas.init_model_store.llm if m_s.name in ("Qwen3-8B", "Qwen3-32B")]
+    result = ColocationBench(amaas, stores, worker_id=1, rate=2, duration_s=60).run()
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Sequence, TYPE_CHECKING
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
+from appauto.manager.component_manager.components.amaas.scene.llm import LLM
+from .common import RequestSample, aopen_loop, append_jsonl, default_output, load_summary, mark_phase, stop_model
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.manager.component_manager.components.amaas.models.llm import LLMModel, LLMModelStore
+
+logger = LoggingConfig.get_logger()
+
+PHASES = ("alone", "loaded", "contended")
+
+
+def ratio(value: Optional[float], base: Optional[float]) -> Optional[float]:
+    return value / base if value is not None and base else None
+
+
+class ColocationBench:
+    def __init__(
+        self,
+        amaas: "AMaaS",
+        model_stores: Sequence["LLMModelStore"],
+        worker_id: int = None,
+        tp: int = 1,
+        rate: float = 2,
+        duration_s: float = 60,
+        prompt: str = "请介绍一下你自己",
+        max_tokens: int = 256,
+        tolerance: float = 1.5,
+        interval_s: int = 10,
+        timeout_s: int = 1800,
+        output: str = None,
+    ):
+        """
+        worker_id: 所有模型拉起在该 worker 上, 不指定时选择空闲 GPU 最多的 worker
+        rate: 每个模型的请求速率(req/s), 各阶段相同
+        tolerance: contended 阶段允许的 p99 延迟比例
+        """
+        assert len(model_stores) >= 2, "at least 2 models are required"
+
+        self.amaas = amaas
+        self.model_stores = list(model_stores)
+        self.worker_id = worker_id
+        self.tp = tp
+        self.rate = rate
+        self.duration_s = duration_s
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.tolerance = tolerance
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.output = output or default_output("colocation")
+
+        # {phase: {model: load_summary}}
+        self.phases: Dict[str, Dict[str, Dict]] = {}
+        self.errors: List[str] = []
+
+    @property
+    def names(self) -> List[str]:
+        return [m_s.name for m_s in self.model_stores]
+
+    def launch(self, model_store: "LLMModelStore", models: List["LLMModel"]) -> "LLMModel":
+        """创建后先加入 models 再等待 running, 等待失败(比如一直无法 running)时也能被停止"""
+        model = model_store.run(self.worker_id, self.tp, access_limit=max(4, int(self.rate * 4)))
+        models.append(model)
+        model.wait_for_running(self.interval_s, self.timeout_s)
+        return model
+
+    def stop(self, models: List["LLMModel"]):
+        for model in models:
+            try:
+                stop_model(self.amaas, model, self.interval_s, self.timeout_s)
+            except Exception as e:
+                logger.error(f"error occurred while stopping {model.name}: {e}")
+
+    async def _load(self, names: List[str]) -> List[RequestSample]:
+        scenes = [LLM(self.amaas.mgt_ip, self.amaas.port, object_id=name, amaas=self.amaas) for name in names]
+
+        def sender(llm: LLM):
+            template = llm.chat_template(self.prompt, max_tokens=self.max_tokens)
+
+            async def send(i: int):
+                return await llm.atalk(None, payload=template.render(seed=i), return_metrics=True)
+
+            return send
+
+        try:
+            runs = [
+                aopen_loop(sender(llm), self.rate, self.duration_s, seed=i, tag=name)
+                for i, (name, llm) in enumerate(zip(names, scenes))
+            ]
+            return [s for samples in await asyncio.gather(*runs) for s in samples]
+        finally:
+            for llm in scenes:
+                await llm.aclose()
+
+    def load(self, phase: str, names: List[str]):
+        """同时压测 names 中的模型, 结果按模型记录到 phase 阶段"""
+        mark_phase(f"colocation {phase} {','.join(names)}")
+        samples = HttpPoolRegistry.run(self._load(names))
+        for name in names:
+            summary = load_summary([s for s in samples if s.tag == name])
+            self.phases.setdefault(phase, {})[name] = summary
+            logger.info(
+                f"{phase}: {name}, throughput: {summary['throughput_rps']} req/s, "
+                f"latency p99: {summary['latency']['p99']}, ttft p50: {summary['ttft']['p50']}"
+            )
+            append_jsonl(self.output, [dict(phase=phase, model=name, worker_id=self.worker_id, **summary)])
+
+    def run(self) -> Dict:
+        if self.worker_id is None:
+            self.worker_id = max(self.amaas.workers, key=lambda w: w.gpu_empty_count or 0).object_id
+        logger.info(f"colocation of {self.names} on worker {self.worker_id}")
+
+        for model_store in self.model_stores:
+            mark_phase(f"colocation launch {model_store.name}")
+            models = []
+            try:
+                self.launch(model_store, models)
+                self.load("alone", [model_store.name])
+            except Exception as e:
+                self.errors.append(f"alone {model_store.name}: {e}")
+                logger.error(f"colocation alone of {model_store.name} failed: {e}")
+            finally:
+                self.stop(models)
+
+        mark_phase(f"colocation launch {','.join(self.names)}")
+        models = []
+        try:
+            for model_store in self.model_stores:
+                self.launch(model_store, models)
+            for name in self.names:
+                self.load("loaded", [name])
+            self.load("contended", self.names)
+        except Exception as e:
+            # 比如同一节点同时只能运行一个 MoE 模型
+            self.errors.append(f"co-located: {e}")
+            logger.error(f"colocation of {self.names} failed: {e}")
+        finally:
+            mark_phase("colocation cleanup")
+            self.stop(models)
+
+        result = self.summary()
+        for name, row in result["interference"].items():
+            logger.info(f"interference of {name}: {row}")
+        logger.info(f"colocation compatible: {result['compatible']}, results: {self.output}")
+        append_jsonl(self.output, [result])
+        return result
+
+    def interference(self, name: str) -> Dict[str, Dict]:
+        """{phase: 各指标相对 alone 的比例}"""
+        base = self.phases.get("alone", {}).get(name)
+        if base is None:
+            return {}
+
+        rows = {}
+        for phase in PHASES[1:]:
+            if (summary := self.phases.get(phase, {}).get(name)) is None:
+                continue
+            rows[phase] = dict(
+                latency_p50=ratio(summary["latency"]["p50"], base["latency"]["p50"]),
+                latency_p99=ratio(summary["latency"]["p99"], base["latency"]["p99"]),
+                ttft_p50=ratio(summary["ttft"]["p50"], base["ttft"]["p50"]),
+                throughput=ratio(summary["throughput_rps"], base["throughput_rps"]),
+                error_rate=summary["error_rate"],
+            )
+        return rows
+
+    def summary(self) -> Dict:
+        interference = {name: self.interference(name) for name in self.names}
+        contended = [rows.get("contended") for rows in interference.values()]
+        compatible = not self.errors and all(
+            row is not None
+            and row["latency_p99"] is not None
+            and row["latency_p99"] <= self.tolerance
+            and not row["error_rate"]
+            for row in contended
+        )
+        return dict(
+            models=self.names,
+            worker_id=self.worker_id,
+            tp=self.tp,
+            rate=self.rate,
+            duration_s=self.duration_s,
+            tolerance=self.tolerance,
+            compatible=compatible,
+            errors=self.errors,
+            interference=interference,
+        )
@@ -0,0 +1,191 @@
+"""
+bench 公共工具: 延迟统计, 结果落盘, 开环压测.
+"""
+
+import json
+import asyncio
+import httpx
+from random import Random
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass
+from time import perf_counter, sleep, time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
+from appauto.manager.component_manager.components.amaas.models.base import BaseModel
+from appauto.manager.component_manager.components.amaas.records import ModelRecord, json_default
+from appauto.manager.connection_manager.sse import StreamResult, percentile
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.manager.component_manager.components.amaas.base_component import BaseComponent
+
+PERCENTILES = (50, 90, 99)
+
+# 当前运行中的采样器(见 dashboard_sampler), bench 通过 mark_phase 标记阶段, 没有采样器时忽略
+_phase_listener: Optional[Callable[[str], None]] = None
+
+
+def summarize(values: Sequence[float], ps: Sequence[float] = PERCENTILES) -> Dict[str, Optional[float]]:
+    """count / mean / 百分位 / max, values 为空时除 count 外都是 None"""
+    values = [v for v in values if v is not None]
+    return dict(
+        count=len(values),
+        mean=sum(values) / len(values) if values else None,
+        **{f"p{p}": percentile(values, p) for p in ps},
+        max=max(values) if values else None,
+    )
+
+
+def default_output(name: str) -> Path:
+    return Path(f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+
+def set_phase_listener(listener: Optional[Callable[[str], None]]):
+    global _phase_listener
+    _phase_listener = listener
+
+
+def mark_phase(name: str):
+    """标记 bench 进入新的阶段, 便于与后台采样的平台负载对齐"""
+    if _phase_listener is not None:
+        _phase_listener(name)
+
+
+def append_jsonl(path: Union[str, Path], rows: Iterable[Dict]):
+    with Path(path).open("a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, default=json_default) + "\n")
+
+
+def stop_model(amaas: "AMaaS", model: BaseModel, interval_s: float = 10, timeout_s: float = 600):
+    """停止模型并等待其从模型列表中消失, 之后才能再次拉起同一个模型(也保证下一轮是真正的冷启动)"""
+    model.stop()
+    start = time()
+    while time() - start <= timeout_s:
+        # 轮询不走 response_cache, 按 id 查找所有类别的模型
+        res = amaas.get("get_self", url_map=BaseModel.GET_URL_MAP, encode_result=ModelRecord, cache=False)
+        if not [m for m in res.data.get("items") if m.id == model.object_id]:
+            return
+        sleep(interval_s)
+    raise TimeoutError(f"timeout while waiting for {model.name} stopped.")
+
+
+@dataclass
+class RequestSample:
+    # 相对压测开始的发出时间(s)
+    start: float
+    latency: Optional[float] = None
+    ttft: Optional[float] = None
+    tokens: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    # 失败时的 http 状态码, 非 http 错误为 None
+    status: Optional[int] = None
+    error: Optional[str] = None
+    tag: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def send_one(send: Callable[[int], Awaitable], i: int, t0: float, tag=None) -> RequestSample:
+    """发出一个请求并记录为 RequestSample, start 为相对 t0(perf_counter) 的时间"""
+    start = perf_counter()
+    sample = RequestSample(start - t0, tag=tag)
+    try:
+        res = await send(i)
+        sample.latency = perf_counter() - start
+        if isinstance(res, StreamResult):
+            sample.ttft, sample.tokens = res.ttft, res.completion_tokens
+            sample.prompt_tokens, sample.cached_tokens = res.prompt_tokens, res.cached_tokens
+    except httpx.HTTPStatusError as e:
+        sample.status, sample.error = e.response.status_code, str(e)
+    except Exception as e:
+        sample.error = f"{type(e).__name__}: {e}"
+    return sample
+
+
+async def aopen_loop(
+    send: Callable[[int], Awaitable],
+    rate: float,
+    duration_s: float,
+    poisson: bool = False,
+    seed: int = 42,
+    tag: Any = None,
+) -> List[RequestSample]:
+    """
+    开环压测: 按固定速率(或 poisson 到达)发出请求, 不等待前面的请求完成; 服务变慢时排队体现在延迟上, 而不是降低发压.
+    send(i) 发出第 i 个请求, 返回 StreamResult(如 atalk(..., return_metrics=True))时记录 TTFT 和 token 数.
+    """
+    rnd = Random(seed)
+    t0 = perf_counter()
+    tasks, i, next_at = [], 0, 0.0
+    while next_at < duration_s:
+        if (delay := next_at - (perf_counter() - t0)) > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send_one(send, i, t0, tag)))
+        i += 1
+        next_at += rnd.expovariate(rate) if poisson else 1 / rate
+
+    return list(await asyncio.gather(*tasks))
+
+
+def open_loop(
+    send: Callable[[int], Awaitable], rate: float, duration_s: float, closing: Iterable["BaseComponent"] = (), **kwargs
+) -> List[RequestSample]:
+    """aopen_loop 的同步入口; closing 中的组件在事件循环结束前释放异步连接"""
+
+    async def main():
+        try:
+            return await aopen_loop(send, rate, duration_s, **kwargs)
+        finally:
+            for component in closing:
+                await component.aclose()
+
+    return HttpPoolRegistry.run(main())
+
+
+def load_summary(samples: List[RequestSample], wall_s: float = None) -> Dict:
+    """
+    吞吐默认按第一个请求发出到最后一个请求完成的时间计算;
+    多组并发压测之间对比时传入统一的 wall_s, 避免被限流的一组因为很快失败而时间窗口偏小.
+    """
+    ok = [s for s in samples if s.ok]
+    if (wall := wall_s) is None:
+        end = max((s.start + s.latency for s in ok), default=0)
+        wall = end - min((s.start for s in samples), default=0)
+    tokens = sum(s.tokens or 0 for s in ok)
+    # 只统计返回了 cached_tokens 的请求
+    cache_reported = [s for s in ok if s.cached_tokens is not None and s.prompt_tokens]
+
+    status: Dict[str, int] = {}
+    for s in samples:
+        if not s.ok:
+            key = str(s.status or "error")
+            status[key] = status.get(key, 0) + 1
+
+    return dict(
+        requests=len(samples),
+        ok=len(ok),
+        error_rate=(len(samples) - len(ok)) / len(samples) if samples else None,
+        errors=status,
+        throughput_rps=len(ok) / wall if wall > 0 else None,
+        tokens_per_s=tokens / wall if wall > 0 else None,
+        cache_hit_rate=(
+            sum(s.cached_tokens for s in cache_reported) / sum(s.prompt_tokens for s in cache_reported)
+            if cache_reported
+            else None
+        ),
+        latency=summarize([s.latency for s in ok]),
+        ttft=summarize([s.ttft for s in ok]),
+    )
+
+
+def jain_index(values: Sequence[float]) -> Optional[float]:
+    """Jain 公平性指数: (Σx)² / (n·Σx²), 1 为完全公平, 1/n 为全部资源被一个对象占用"""
+    values = [v for v in values if v is not None]
+    if not values or not any(values):
+        return None
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
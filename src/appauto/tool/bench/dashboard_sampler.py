@@ -0,0 +1,206 @@
+"""
+后台采样数据概览(dashboard): resource_counts / system_load / model_usage / active_models.
+
+压测或测试运行期间按固定间隔请求 dashboard 接口, 嵌套字段展开成列(比如 system_load.workers.w1.gpu_util),
+列表元素优先用 name / id 作为路径, 这样每个 worker / GPU 的指标是独立的一列.
+落盘格式为 jsonl, 每 flush_every 个样本写一个列式 block, 字段名不随每个样本重复:
+    {"type": "meta", "start": 1760000000.0, "interval_s": 5}
+    {"type": "block", "t": [0.0, 5.0], "phase": ["warmup", "warmup"], "columns": {"system_load.cpu": [12.5, 80.1]}}
+    {"type": "marker", "t": 7.2, "name": "replicas=2"}
+t 为距离采样开始的秒数. 每个样本带当时所处的阶段(最近一次 mark 的名称), 客户端吞吐下降时可以按阶段对照平台负载.
+
+用法:
+    with DashboardSampler(amaas, interval_s=5) as sampler:
+        mark_phase("warmup")  # 或 sampler.mark("warmup")
+        ...
+    series = DashboardSeries.load(sampler.output)
+    series.by_phase("system_load.cpu")
+"""
+
+import json
+import threading
+from pathlib import Path
+from time import monotonic, time
+from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.component_manager.components.amaas.dashboard import DashBoard
+from appauto.manager.component_manager.components.amaas.records import json_default
+from .common import default_output, summarize, set_phase_listener
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas import AMaaS
+
+logger = LoggingConfig.get_logger()
+
+SECTIONS = ("resource_counts", "system_load", "model_usage", "active_models")
+
+
+def flatten(obj: Any, prefix: str = "") -> Dict[str, Any]:
+    """嵌套 dict / list 展开成 {路径: 标量}"""
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, list):
+        items = [
+            (str(v.get("name") or v.get("id") or i) if isinstance(v, dict) else str(i), v) for i, v in enumerate(obj)
+        ]
+    else:
+        return {prefix: obj}
+
+    flat = {}
+    for key, value in items:
+        flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+class DashboardSampler:
+    def __init__(
+        self,
+        amaas: "AMaaS",
+        interval_s: float = 5,
+        output: Union[str, Path] = None,
+        sections=SECTIONS,
+        flush_every: int = 12,
+        timeout: float = 10,
+    ):
+        self.amaas = amaas
+        self.interval_s = interval_s
+        self.output = Path(output or default_output("dashboard"))
+        self.sections = sections
+        self.flush_every = flush_every
+        self.timeout = timeout
+
+        self.phase: Optional[str] = None
+        self.samples = 0
+        self.errors = 0
+        self._start = 0.0
+        self._block: Dict[str, List] = {}
+        self._block_size = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _write(self, row: Dict):
+        with self.output.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False, default=json_default) + "\n")
+
+    def mark(self, name: str):
+        """进入新的阶段, 之后的样本都带上该阶段名称"""
+        with self._lock:
+            self.phase = name
+            if self._thread is not None:
+                self._write(dict(type="marker", t=round(time() - self._start, 3), name=name))
+
+    def fetch(self) -> Dict[str, Any]:
+        res = self.amaas.get(
+            "get_self", url_map=DashBoard.GET_URL_MAP, timeout=self.timeout, encode_result=False, cache=False
+        )
+        data = res.json().get("data") or {}
+        return flatten({key: data.get(key) for key in self.sections})
+
+    def sample(self):
+        start = monotonic()
+        try:
+            row = self.fetch()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"error occurred while sampling dashboard: {e}")
+            return
+        row["fetch_s"] = round(monotonic() - start, 4)
+
+        with self._lock:
+            n = self._block_size
+            block = self._block
+            block.setdefault("t", []).append(round(time() - self._start, 3))
+            block.setdefault("phase", []).append(self.phase)
+            columns = block.setdefault("columns", {})
+            # 新出现的列在之前的样本上补 None, 已有列在本次缺失时同样补 None
+            for key, value in row.items():
+                columns.setdefault(key, [None] * n).append(value)
+            for key, values in columns.items():
+                if len(values) == n:
+                    values.append(None)
+
+            self._block_size += 1
+            self.samples += 1
+            if self._block_size >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        if self._block_size:
+            self._write(dict(type="block", **self._block))
+        self._block, self._block_size = {}, 0
+
+    def _run(self):
+        # 按固定节拍采样, 单次请求耗时不会让间隔漂移
+        next_at = monotonic()
+        while not self._stop.is_set():
+            self.sample()
+            next_at += self.interval_s
+            self._stop.wait(max(next_at - monotonic(), 0))
+
+    def start(self) -> "DashboardSampler":
+        self._start = time()
+        self._write(dict(type="meta", start=self._start, interval_s=self.interval_s, sections=list(self.sections)))
+        if self.phase is not None:
+            self._write(dict(type="marker", t=0, name=self.phase))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dashboard-sampler", daemon=True)
+        self._thread.start()
+        set_phase_listener(self.mark)
+        logger.info(f"dashboard sampler started, every {self.interval_s}s -> {self.output}")
+        return self
+
+    def stop(self):
+        set_phase_listener(None)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._flush()
+        logger.info(f"dashboard sampler stopped, samples: {self.samples}, errors: {self.errors}")
+
+    def __enter__(self) -> "DashboardSampler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class DashboardSeries:
+    """读取 DashboardSampler 的输出, 合并为 {列名: [值]}"""
+
+    def __init__(self, meta: Dict, t: List[float], phase: List[Optional[str]], columns: Dict[str, List], markers):
+        self.meta = meta
+        self.t = t
+        self.phase = phase
+        self.columns = columns
+        self.markers: List[Dict] = markers
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DashboardSeries":
+        meta, t, phase, columns, markers = {}, [], [], {}, []
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            row = json.loads(line)
+            if row["type"] == "meta":
+                meta = row
+            elif row["type"] == "marker":
+                markers.append(row)
+            elif row["type"] == "block":
+                n = len(t)
+                t.extend(row["t"])
+                phase.extend(row["phase"])
+                for key, values in row["columns"].items():
+                    columns.setdefault(key, [None] * n).extend(values)
+                for values in columns.values():
+                    values.extend([None] * (len(t) - len(values)))
+        return cls(meta, t, phase, columns, markers)
+
+    def by_phase(self, column: str) -> Dict[Optional[str], Dict]:
+        """按阶段统计某一列(数值)的 count / mean / 百分位 / max"""
+        groups: Dict[Optional[str], List[float]] = {}
+        for phase, value in zip(self.phase, self.columns.get(column, [])):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                groups.setdefault(phase, []).append(value)
+        return {phase: summarize(values) for phase, values in groups.items()}
@@ -0,0 +1,229 @@
+"""
+HiCache(cache_storage) 容量扫描: 同一个模型依次以不同 cache_storage 拉起, 跑相同的共享前缀多轮对话负载.
+
+负载: sessions 个会话共用一段固定的系统提示(共享前缀), 每个会话依次进行 turns 轮对话, 每一轮带上之前的全部历史;
+会话之间并发(最多 concurrency 个), 同一会话内的轮次串行. 整个负载重复 passes 遍, 后面几遍重放相同的会话,
+GPU 显存放不下全部历史时能否命中取决于 HiCache 的容量.
+每个 cache_storage 记录每一遍的 prefix cache 命中率(usage 中的 cached_tokens / prompt_tokens)、TTFT 和吞吐,
+得到 容量 - 收益 曲线, 用于容量规划.
+
+用法:
+    store = amaas.find_model_store("Qwen3-8B")
+    rows = HiCacheSweep(amaas, store, tp=1, multipliers=(1, 2, 4, 8)).run()
+"""
+
+import json
+from random import Random
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, TYPE_CHECKING
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
+from appauto.manager.component_manager.components.amaas.scene.llm import LLM
+from appauto.manager.utils_manager.async_utils import gather_with_concurrency
+from .common import RequestSample, append_jsonl, default_output, load_summary, mark_phase, send_one, stop_model
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.manager.component_manager.components.amaas.models.llm import LLMModel, LLMModelStore
+
+logger = LoggingConfig.get_logger()
+
+TOPICS = ("数据库索引", "分布式事务", "缓存淘汰", "负载均衡", "消息队列", "限流算法", "一致性哈希", "日志采集")
+
+
+class SharedPrefixWorkload:
+    """确定性的共享前缀多轮对话负载, 相同参数每次生成相同的请求"""
+
+    def __init__(
+        self,
+        sessions: int = 16,
+        turns: int = 4,
+        prefix_chars: int = 8000,
+        max_tokens: int = 64,
+        concurrency: int = 8,
+        seed: int = 42,
+    ):
+        self.sessions = sessions
+        self.turns = turns
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+
+        rnd = Random(seed)
+        rules, size = [], 0
+        while size < prefix_chars:
+            rule = f"规则 {len(rules) + 1}: 回答{rnd.choice(TOPICS)}相关的问题时, 先给出结论, 再说明原因, 编号 {rnd.random():.8f}."
+            rules.append(rule)
+            size += len(rule)
+        self.system_prompt = "你是一名资深的后端工程师.\n" + "\n".join(rules)
+        self.questions = [
+            [
+                f"关于{rnd.choice(TOPICS)}, 第 {turn + 1} 个问题(会话 {session}): 请简要说明其原理."
+                for turn in range(turns)
+            ]
+            for session in range(sessions)
+        ]
+
+    def payload(self, model: str, messages: List[Dict]) -> bytes:
+        data = dict(model=model, messages=messages, stream=True, temperature=0, max_tokens=self.max_tokens)
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    async def run(self, llm: LLM, model: str, t0: float, tag=None) -> List[RequestSample]:
+        samples: List[RequestSample] = []
+
+        async def session(i: int):
+            messages = [{"role": "system", "content": self.system_prompt}]
+            for question in self.questions[i]:
+                messages.append({"role": "user", "content": question})
+                answer = {}
+
+                async def send(_):
+                    res = await llm.atalk(None, payload=self.payload(model, messages), return_metrics=True)
+                    answer["text"] = res.text
+                    return res
+
+                samples.append(await send_one(send, i, t0, tag))
+                # 失败时用空回答继续, 保持后续轮次的请求不变
+                messages.append({"role": "assistant", "content": answer.get("text", "")})
+
+        await gather_with_concurrency([session(i) for i in range(self.sessions)], self.concurrency)
+        return samples
+
+
+class HiCacheSweep:
+    def __init__(
+        self,
+        amaas: "AMaaS",
+        model_store: "LLMModelStore",
+        tp: int = 1,
+        sizes: Sequence[int] = None,
+        multipliers: Sequence[float] = (1, 2, 4, 8),
+        worker_id: int = None,
+        max_total_tokens: int = 50000,
+        access_limit: int = None,
+        workload: SharedPrefixWorkload = None,
+        passes: int = 2,
+        interval_s: int = 10,
+        timeout_s: int = 1800,
+        output: str = None,
+    ):
+        """
+        sizes: 要测试的 cache_storage, 不指定时为 get_min_hicache 得到的最小值乘以 multipliers
+        access_limit: 不指定时不小于负载的并发数, 避免网关限流影响结果
+        """
+        self.amaas = amaas
+        self.model_store = model_store
+        self.tp = tp
+        self.sizes = list(sizes) if sizes else None
+        self.multipliers = multipliers
+        self.worker_id = worker_id
+        self.max_total_tokens = max_total_tokens
+        self.workload = workload or SharedPrefixWorkload()
+        self.access_limit = access_limit or max(self.workload.concurrency, 4)
+        self.passes = passes
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.output = output or default_output("hicache_sweep")
+
+        self.min_size: Optional[int] = None
+        self.rows: List[Dict] = []
+
+    def min_cache_storage(self) -> int:
+        res = self.model_store.get_min_hicache(self.max_total_tokens, self.tp)
+        # 接口返回的字段名随版本不同
+        for key in ("min_cache_storage", "min_hicache", "cache_storage"):
+            if isinstance(value := res.data.get(key), (int, float)) and value > 0:
+                return int(value)
+        raise ValueError(f"min hicache not found in {res.data}, specify sizes explicitly.")
+
+    def resolve_sizes(self) -> List[int]:
+        if self.sizes:
+            self.min_size = min(self.sizes)
+            return sorted(self.sizes)
+        self.min_size = self.min_cache_storage()
+        return sorted({int(self.min_size * m) for m in self.multipliers})
+
+    def launch(self, size: int) -> "LLMModel":
+        """只创建模型, 不等待 running(见 run)"""
+        worker_id = self.worker_id or max(self.amaas.workers, key=lambda w: w.gpu_empty_count or 0).object_id
+        return self.model_store.run(
+            worker_id,
+            self.tp,
+            access_limit=self.access_limit,
+            max_total_tokens=self.max_total_tokens,
+            cache_storage=size,
+        )
+
+    def measure(self, size: int) -> List[Dict]:
+        llm = LLM(self.amaas.mgt_ip, self.amaas.port, object_id=self.model_store.name, amaas=self.amaas)
+
+        async def main():
+            try:
+                results = []
+                for i in range(self.passes):
+                    mark_phase(f"hicache size={size} pass={i}")
+                    t0 = perf_counter()
+                    samples = await self.workload.run(llm, self.model_store.name, t0, tag=i)
+                    results.append(load_summary(samples, wall_s=perf_counter() - t0))
+                return results
+            finally:
+                await llm.aclose()
+
+        return [
+            dict(
+                model=self.model_store.name,
+                tp=self.tp,
+                cache_storage=size,
+                min_cache_storage=self.min_size,
+                round=i,
+                **s,
+            )
+            for i, s in enumerate(HttpPoolRegistry.run(main()))
+        ]
+
+    def run(self) -> List[Dict]:
+        sizes = self.resolve_sizes()
+        logger.info(f"hicache sweep of {self.model_store.name}: {sizes}")
+
+        for size in sizes:
+            mark_phase(f"hicache launch size={size}")
+            model = None
+            try:
+                # 创建和等待分开, 等待失败时也能停止模型, 否则后续 size 都会因为同名模型已存在而无法拉起
+                model = self.launch(size)
+                model.wait_for_running(self.interval_s, self.timeout_s)
+                rows = self.measure(size)
+            except Exception as e:
+                logger.error(f"hicache sweep of {self.model_store.name} failed at cache_storage={size}: {e}")
+                rows = [dict(model=self.model_store.name, tp=self.tp, cache_storage=size, error=str(e))]
+            finally:
+                if model is not None:
+                    stop_model(self.amaas, model, self.interval_s, self.timeout_s)
+
+            for row in rows:
+                logger.info(
+                    f"cache_storage: {size}, round: {row.get('round')}, hit rate: {row.get('cache_hit_rate')}, "
+                    f"ttft p50: {(row.get('ttft') or {}).get('p50')}, throughput: {row.get('throughput_rps')}"
+                )
+            append_jsonl(self.output, rows)
+            self.rows.extend(rows)
+
+        logger.info(f"hicache sweep results: {self.output}")
+        return self.rows
+
+    def curve(self) -> List[Dict]:
+        """每个 cache_storage 取最后一遍(重放)的结果: 容量 -> 命中率 / TTFT / 吞吐"""
+        last = {}
+        for row in self.rows:
+            if "error" not in row:
+                last[row["cache_storage"]] = row
+        return [
+            dict(
+                cache_storage=size,
+                cache_hit_rate=row["cache_hit_rate"],
+                ttft_p50=row["ttft"]["p50"],
+                ttft_p99=row["ttft"]["p99"],
+                throughput_rps=row["throughput_rps"],
+                tokens_per_s=row["tokens_per_s"],
+            )
+            for size, row in sorted(last.items())
+        ]
@@ -0,0 +1,230 @@
+"""
+多租户压测: 每个租户一个用户 + 一个 API 密钥, 按权重分配请求速率并发压测.
+
+压测默认用 api_keys[0], 测不到按密钥计量、access_limit 限流和网关在租户之间的公平性. 这里:
+- TenantPool 创建 N 个普通用户, 每个用户以自己的身份创建一个 API 密钥, 退出 with 时删除密钥和用户;
+- MultiTenantBench 给每个租户一个开环压测, 速率 = 总速率 * 权重 / 权重之和, 所有租户同时开始;
+- 每个租户输出吞吐、延迟/TTFT 百分位、429 比例和排队比例(TTFT 超过 queue_ttft_s 的成功请求);
+- 公平性用 Jain 指数, 按 吞吐 / 权重 计算: 1 表示每个租户拿到的吞吐与权重成正比.
+
+用法:
+    with TenantPool(amaas, 4, weights=[1, 1, 2, 4]) as tenants:
+        result = MultiTenantBench(amaas, "Qwen3-8B", tenants, rate=16, duration_s=60).run()
+"""
+
+import asyncio
+from uuid import uuid4
+from dataclasses import dataclass
+from typing import Dict, List, Optional, TYPE_CHECKING
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.connection_manager.http_pool import HttpPoolRegistry
+from appauto.manager.component_manager.components.amaas import AMaaS
+from appauto.manager.component_manager.components.amaas.scene.llm import LLM
+from .common import (
+    RequestSample,
+    aopen_loop,
+    append_jsonl,
+    default_output,
+    jain_index,
+    load_summary,
+    mark_phase,
+    summarize,
+)
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas.api_key import APIKey
+    from appauto.manager.component_manager.components.amaas.users import AMaaSUser
+
+logger = LoggingConfig.get_logger()
+
+
+@dataclass
+class Tenant:
+    name: str
+    weight: float
+    api_key: "APIKey"
+    # create_users=False 时为 None, 密钥属于 admin
+    user: Optional["AMaaSUser"] = None
+    passwd: Optional[str] = None
+
+
+class TenantPool:
+    def __init__(
+        self,
+        amaas: AMaaS,
+        size: int,
+        weights: List[float] = None,
+        prefix: str = "bench-tenant",
+        passwd: str = "Bench@123456",
+        create_users: bool = True,
+    ):
+        """
+        weights: 每个租户的权重, 不指定时都为 1
+        create_users: False 时只用当前用户创建 N 个密钥, 测按密钥的计量和限流
+        """
+        assert weights is None or len(weights) == size, f"expect {size} weights, got: {weights}"
+        self.amaas = amaas
+        self.size = size
+        self.weights = weights or [1] * size
+        self.prefix = prefix
+        self.passwd = passwd
+        self.create_users = create_users
+        self.tenants: List[Tenant] = []
+
+    def provision(self) -> List[Tenant]:
+        run_id = uuid4().hex[:6]
+        try:
+            for i, weight in enumerate(self.weights):
+                name = f"{self.prefix}-{run_id}-{i}"
+                user = owner = None
+                if self.create_users:
+                    user = self.amaas.create_user(name, self.passwd, False, desc="multi-tenant bench")
+                    owner = AMaaS(
+                        self.amaas.mgt_ip, self.amaas.port, name, self.passwd, ssl_enabled=self.amaas.ssl_enabled
+                    )
+                api_key = (owner or self.amaas).create_api_key(name)
+                self.tenants.append(Tenant(name, weight, api_key, user, self.passwd if user else None))
+        except Exception:
+            self.cleanup()
+            raise
+
+        logger.info(f"provisioned tenants: {[t.name for t in self.tenants]}")
+        return self.tenants
+
+    def cleanup(self):
+        """删除密钥和用户, 单个失败不影响其他租户"""
+        for t in self.tenants:
+            for obj in (t.api_key, t.user):
+                if obj is None:
+                    continue
+                try:
+                    obj.delete()
+                except Exception as e:
+                    logger.error(f"error occurred while deleting {type(obj).__name__} of {t.name}: {e}")
+        self.tenants = []
+
+    def __enter__(self) -> List[Tenant]:
+        return self.provision()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+
+
+class MultiTenantBench:
+    def __init__(
+        self,
+        amaas: AMaaS,
+        model: str,
+        tenants: List[Tenant],
+        rate: float,
+        duration_s: float = 60,
+        auth: str = "api_key",
+        prompt: str = "请介绍一下你自己",
+        max_tokens: int = 256,
+        poisson: bool = True,
+        queue_ttft_s: float = None,
+        output: str = None,
+    ):
+        """
+        rate: 所有租户的总请求速率(req/s), 按权重分配
+        auth: api_key 用租户的密钥认证; user 用租户用户登录的 token
+        queue_ttft_s: TTFT 超过该值的成功请求计为排队, 不指定时取全部成功请求 TTFT p50 的 2 倍
+        """
+        assert auth in ("api_key", "user"), f"unsupported auth: {auth}"
+        self.amaas = amaas
+        self.model = model
+        self.tenants = tenants
+        self.rate = rate
+        self.duration_s = duration_s
+        self.auth = auth
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.poisson = poisson
+        self.queue_ttft_s = queue_ttft_s
+        self.output = output or default_output("multi_tenant")
+
+    def scene(self, tenant: Tenant) -> LLM:
+        if self.auth == "user":
+            assert tenant.user is not None, f"tenant {tenant.name} has no user, use auth=api_key"
+            return LLM(self.amaas.mgt_ip, self.amaas.port, tenant.name, tenant.passwd, object_id=self.model)
+        return LLM(self.amaas.mgt_ip, self.amaas.port, object_id=self.model, api_key=tenant.api_key.value)
+
+    async def _load(self) -> List[RequestSample]:
+        total_weight = sum(t.weight for t in self.tenants)
+        scenes = [self.scene(t) for t in self.tenants]
+
+        def sender(llm: LLM):
+            template = llm.chat_template(self.prompt, max_tokens=self.max_tokens)
+
+            async def send(i: int):
+                return await llm.atalk(None, payload=template.render(seed=i), return_metrics=True)
+
+            return send
+
+        try:
+            runs = [
+                aopen_loop(
+                    sender(llm),
+                    self.rate * t.weight / total_weight,
+                    self.duration_s,
+                    poisson=self.poisson,
+                    seed=i,
+                    tag=t.name,
+                )
+                for i, (t, llm) in enumerate(zip(self.tenants, scenes))
+            ]
+            return [s for samples in await asyncio.gather(*runs) for s in samples]
+        finally:
+            for llm in scenes:
+                await llm.aclose()
+
+    def summary(self, samples: List[RequestSample]) -> Dict:
+        ok = [s for s in samples if s.ok]
+        wall = max((s.start + s.latency for s in ok), default=self.duration_s)
+        queue_ttft_s = self.queue_ttft_s
+        if queue_ttft_s is None and (p50 := summarize([s.ttft for s in ok])["p50"]) is not None:
+            queue_ttft_s = p50 * 2
+
+        total_weight = sum(t.weight for t in self.tenants)
+        per_tenant = {}
+        for t in self.tenants:
+            mine = [s for s in samples if s.tag == t.name]
+            mine_ok = [s for s in mine if s.ok]
+            queued = [s for s in mine_ok if queue_ttft_s is not None and (s.ttft or 0) > queue_ttft_s]
+            row = dict(
+                weight=t.weight,
+                rate=self.rate * t.weight / total_weight,
+                **load_summary(mine, wall_s=wall),
+                rate_429=sum(s.status == 429 for s in mine) / len(mine) if mine else None,
+                queued_rate=len(queued) / len(mine_ok) if mine_ok else None,
+            )
+            row["weighted_rps"] = (row["throughput_rps"] or 0) / t.weight
+            per_tenant[t.name] = row
+
+        return dict(
+            model=self.model,
+            tenants=len(self.tenants),
+            auth=self.auth,
+            rate=self.rate,
+            duration_s=self.duration_s,
+            queue_ttft_s=queue_ttft_s,
+            overall=load_summary(samples, wall_s=wall),
+            fairness=jain_index([row["weighted_rps"] for row in per_tenant.values()]),
+            per_tenant=per_tenant,
+        )
+
+    def run(self) -> Dict:
+        mark_phase(f"multi_tenant tenants={len(self.tenants)} rate={self.rate}")
+        samples = HttpPoolRegistry.run(self._load())
+        mark_phase("multi_tenant done")
+        result = self.summary(samples)
+
+        for name, row in result["per_tenant"].items():
+            logger.info(
+                f"tenant: {name}, weight: {row['weight']}, throughput: {row['throughput_rps']} req/s, "
+                f"429: {row['rate_429']}, queued: {row['queued_rate']}, latency p99: {row['latency']['p99']}"
+            )
+        logger.info(f"fairness(jain): {result['fairness']}, results: {self.output}")
+
+        append_jsonl(self.output, [result])
+        return result
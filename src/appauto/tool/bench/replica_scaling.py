@@ -0,0 +1,144 @@
+"""
+副本扩容收益: 把一个运行中的模型从 1 个副本逐个扩到 N 个.
+
+每一步通过 create_replica 增加一个副本, 记录从发起请求到 ready_replicas 追上的扩容耗时,
+然后发一轮开环压测, 记录总吞吐、每副本吞吐、扩容效率(相对第一步的线性扩展)以及延迟百分位.
+- 固定速率(默认): 各步骤负载相同, 看副本增加后延迟的改善;
+- scale_rate=True: 速率随副本数线性增加, 看吞吐能否线性扩展. 效率随副本数明显下降时, 瓶颈通常在 AMaaS 路由层而不是推理实例.
+
+响应中不包含实际处理请求的副本, 每副本吞吐按 总吞吐 / 副本数 计算.
+
+用法:
+    model = amaas.model.llm.get(name="Qwen3-8B")
+    steps = ReplicaScalingBench(amaas, model, max_replicas=4, rate=8, duration_s=60).run()
+"""
+
+from time import time, sleep
+from typing import Dict, List, Optional, TYPE_CHECKING
+from appauto.manager.config_manager.config_logging import LoggingConfig
+from appauto.manager.component_manager.components.amaas.scene.llm import LLM
+from .common import append_jsonl, default_output, load_summary, mark_phase, open_loop
+
+if TYPE_CHECKING:
+    from appauto.manager.component_manager.components.amaas import AMaaS
+    from appauto.manager.component_manager.components.amaas.models.llm import LLMModel
+    from appauto.manager.component_manager.components.amaas.models.model_instance import ModelInstance
+
+logger = LoggingConfig.get_logger()
+
+
+class ReplicaScalingBench:
+    def __init__(
+        self,
+        amaas: "AMaaS",
+        model: "LLMModel",
+        max_replicas: int,
+        rate: float,
+        duration_s: float = 60,
+        tp: int = 1,
+        worker_ids: List[int] = None,
+        prompt: str = "请介绍一下你自己",
+        max_tokens: int = 256,
+        interval_s: float = 2,
+        timeout_s: int = 900,
+        keep_replicas: bool = False,
+        scale_rate: bool = False,
+        output: str = None,
+    ):
+        """
+        rate: 每一步压测的请求速率(req/s); scale_rate=True 时为每个副本的速率
+        worker_ids: 新副本依次放在这些 worker 上, 不指定时每次选择空闲 GPU 最多的 worker
+        """
+        self.amaas = amaas
+        self.model = model
+        self.max_replicas = max_replicas
+        self.rate = rate
+        self.duration_s = duration_s
+        self.tp = tp
+        self.worker_ids = worker_ids
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.keep_replicas = keep_replicas
+        self.scale_rate = scale_rate
+        self.output = output or default_output("replica_scaling")
+
+        self.created: List["ModelInstance"] = []
+        self.steps: List[Dict] = []
+
+    def _worker_id(self, step: int) -> int:
+        if self.worker_ids:
+            return self.worker_ids[step % len(self.worker_ids)]
+        return max(self.amaas.workers, key=lambda w: w.gpu_empty_count or 0).object_id
+
+    def scale_to(self, replicas: int) -> float:
+        """增加一个副本并等待 ready_replicas >= replicas, 返回耗时"""
+        start = time()
+        ins = self.model.create_replica(self._worker_id(replicas), self.tp)
+        self.created.append(ins)
+
+        while time() - start <= self.timeout_s:
+            self.model.refresh()
+            if (self.model.ready_replicas or 0) >= replicas:
+                return time() - start
+            sleep(self.interval_s)
+
+        raise TimeoutError(f"timeout while scaling {self.model.name} to {replicas} replicas.")
+
+    def load(self, rate: float) -> Dict:
+        llm = LLM(self.amaas.mgt_ip, self.amaas.port, object_id=self.model.name, amaas=self.amaas)
+        template = llm.chat_template(self.prompt, max_tokens=self.max_tokens)
+
+        async def send(i: int):
+            return await llm.atalk(None, payload=template.render(seed=i), return_metrics=True)
+
+        return load_summary(open_loop(send, rate, self.duration_s, closing=[llm]))
+
+    def run(self) -> List[Dict]:
+        self.model.refresh()
+        baseline: Optional[float] = None
+
+        try:
+            for replicas in range(self.model.ready_replicas or 1, self.max_replicas + 1):
+                mark_phase(f"scale_up replicas={replicas}")
+                scale_up_s = self.scale_to(replicas) if replicas > (self.model.ready_replicas or 0) else None
+
+                rate = self.rate * replicas if self.scale_rate else self.rate
+                mark_phase(f"load replicas={replicas}")
+                summary = self.load(rate)
+                throughput = summary["throughput_rps"] or 0
+                baseline = baseline or throughput / replicas
+
+                step = dict(
+                    model=self.model.name,
+                    replicas=replicas,
+                    scale_up_s=scale_up_s,
+                    rate=rate,
+                    per_replica_rps=throughput / replicas,
+                    efficiency=throughput / (baseline * replicas) if baseline else None,
+                    **summary,
+                )
+                logger.info(
+                    f"replicas: {replicas}, scale up: {scale_up_s}, throughput: {throughput:.2f} req/s, "
+                    f"efficiency: {step['efficiency']}, latency p99: {summary['latency']['p99']}"
+                )
+                append_jsonl(self.output, [step])
+                self.steps.append(step)
+
+        finally:
+            mark_phase("cleanup")
+            if not self.keep_replicas:
+                self.cleanup()
+
+        logger.info(f"replica scaling results: {self.output}")
+        return self.steps
+
+    def cleanup(self):
+        """停止本次新增的副本"""
+        for ins in self.created:
+            try:
+                ins.stop()
+            except Exception as e:
+                logger.error(f"error occurred while stopping {ins}: {e}")
+        self.created.clear()
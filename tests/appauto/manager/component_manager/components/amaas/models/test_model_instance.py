@@ -85,3 +85,18 @@ class TestAMaaSLLMModelInstance:
                     logger.info(ins.model_name)
                     logger.info(ins.model_id)
                     logger.info(ins.worker)
+
+    def test_follow_logs(self, amaas: AMaaS, tmp_path):
+        llm = choice([llm for llm in amaas.model.llm if llm.instances])
+        ins = llm.instances[0]
+
+        follower = ins.follow_logs(output=tmp_path / "engine.log")
+        lines = follower.poll()
+        logger.info(f"{ins.name}: {len(lines)} lines, {follower.fetched_bytes} bytes")
+        assert follower.offset > 0
+
+        # 没有新日志时不会再下载已读取的部分
+        fetched = follower.fetched_bytes
+        follower.poll()
+        logger.info(f"fetched again: {follower.fetched_bytes - fetched} bytes")
+        assert (tmp_path / "engine.log").read_text().count("\n") == follower.lines
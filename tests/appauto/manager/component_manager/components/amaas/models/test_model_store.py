@@ -1,6 +1,7 @@
 from random import choice
 
 from appauto.manager.component_manager.components.amaas import AMaaS
+from appauto.manager.component_manager.components.amaas.models import RunningPoller
 from appauto.manager.config_manager import LoggingConfig
 
 logger = LoggingConfig.get_logger()
@@ -229,3 +230,23 @@ class TestAMaaSModelStore:
         )
         logger.info(model.object_id)
         logger.info(model.name)
+
+    def test_wait_for_running_batched(self, amaas: AMaaS):
+        # 多个模型共用一个 RunningPoller, 每轮只请求一次模型列表
+        names = ["Qwen3-8B", "Qwen3-32B"]
+        assert not [m for m in amaas.model.llm if m.name in names]
+
+        worker = choice(amaas.workers)
+        for m_s in [m_s for m_s in amaas.init_model_store.llm if m_s.name in names]:
+            rule = m_s.get_run_rule()
+            m_s.run(
+                worker_id=worker.object_id,
+                tp=1,
+                access_limit=rule.data.access_limit,
+                max_total_tokens=rule.data.max_total_tokens,
+            )
+
+        poller = RunningPoller.of(amaas)
+        futures = [poller.watch(m, timeout_s=1800) for m in amaas.model.llm if m.name in names]
+        models = poller.wait(futures)
+        logger.info(f"running: {[m.name for m in models]}, ticks: {poller.ticks}")
@@ -41,3 +41,14 @@ class TestAMaaSWorker:
                 logger.info(ins.name)
                 logger.info(ins.object_id)
                 logger.info(ins)
+
+    def test_instance_index(self, amaas: AMaaS):
+        index = amaas.instance_index()
+        logger.info(f"instance count: {len(index)}")
+
+        for worker in amaas.workers:
+            names = {ins.name for ins in worker.instances_obj()}
+            assert names == {item.name for item in worker.model_instances if item.name in index.by_name}
+
+            for gpu in worker.gpus:
+                logger.info(f"{gpu}: {[ins.name for ins in index.of_gpu(worker.name, gpu.index)]}")
@@ -1,3 +1,4 @@
+import asyncio
 from appauto.manager.component_manager.components.amaas import AMaaS
 from appauto.manager.config_manager import LoggingConfig
 
@@ -21,3 +22,47 @@ class TestAMaaSSceneLLM:
             logger.info(f"get response of enable_stream and not_process_stream: {res}")
             res = llm.talk("test", stream=True, process_stream=True)
             logger.info(f"get response of enable_stream and process_stream: {res}")
+
+    def test_llm_chat_async(self, amaas: AMaaS):
+        async def batch_talk(llm, count):
+            try:
+                return await asyncio.gather(*[llm.atalk("test", max_tokens=32) for _ in range(count)])
+            finally:
+                await llm.aclose()
+
+        for llm in amaas.scene.llm:
+            res = asyncio.run(batch_talk(llm, 8))
+            logger.info(f"get responses of async stream: {res}")
+            assert len(res) == 8
+
+    def test_llm_chat_metrics(self, amaas: AMaaS):
+        for llm in amaas.scene.llm:
+            res = llm.talk("test", stream=True, process_stream=True, return_metrics=True)
+            logger.info(f"get stream metrics: {res.summary()}")
+            assert res.text
+            assert res.ttft is not None
+
+    def test_llm_probe_ttft(self, amaas: AMaaS):
+        for llm in amaas.scene.llm:
+            ttft = llm.probe_ttft("请详细介绍一下北京的历史", max_tokens=2048)
+            logger.info(f"get ttft of {llm.object_id}: {ttft}")
+            assert ttft is not None
+
+    def test_llm_chat_template(self, amaas: AMaaS):
+        for llm in amaas.scene.llm:
+            template = llm.chat_template("请详细介绍一下北京的历史" * 100, max_tokens=32)
+            for seed in range(4):
+                res = llm.talk(None, payload=template.render(seed=seed))
+                logger.info(f"get response of seed {seed}: {res}")
+                assert res
+            logger.info(f"get encode stats: {template.stats()}")
+
+    def test_llm_adaptive_concurrency(self, amaas: AMaaS):
+        for model in amaas.model.llm:
+            if (llm := amaas.scene.llm.first(object_id=model.name)) is None:
+                continue
+            controller = model.concurrency()
+            res = controller.map(lambda i: llm.talk(f"{i} + 1 = ?", stream=False, max_tokens=16), range(32))
+            logger.info(controller.stats())
+            assert len(res) == 32
+            assert controller.max_in_flight <= controller.ceiling
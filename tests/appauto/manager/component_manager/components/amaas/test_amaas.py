@@ -35,3 +35,67 @@ class TestAMaaS:
         logger.info(license.status)
         logger.info(license.license_info)
         logger.info(license.device_info)
+
+    def test_response_cache(self, amaas: AMaaS):
+        amaas.enable_cache()
+        try:
+            for _ in range(3):
+                logger.info(amaas.model.llm)
+                logger.info(amaas.init_model_store.llm)
+
+            stats = amaas.response_cache.stats()
+            logger.info(stats)
+            assert stats["hits"] >= 4
+        finally:
+            amaas.disable_cache()
+
+    def test_token_refresh(self, amaas: AMaaS):
+        manager = amaas.token_manager
+        logger.info(amaas.model.llm)
+        count, stale = manager.refresh_count, manager.token
+
+        # 模拟多个请求同时收到 401, 只应登录一次
+        amaas.refresh_token(stale)
+        amaas.refresh_token(stale)
+        logger.info(manager)
+
+        assert manager.refresh_count == count + 1
+        assert amaas.http.client.headers["Authorization"] == f"Bearer {manager.token}"
+        logger.info(amaas.model.llm)
+
+    def test_topology(self, amaas: AMaaS):
+        prev = amaas.topology()
+        logger.info(prev)
+        for key, gpu in prev.gpus.items():
+            logger.info(f"{key}: {[ins.name for ins in prev.instances_of_gpu(*key)]}")
+
+        cur = amaas.topology()
+        logger.info(cur.diff(prev))
+        assert cur.workers.keys() == prev.workers.keys()
+
+    def test_paginate(self, amaas: AMaaS):
+        stores = amaas.init_model_store
+        logger.info(f"init model store: {len(stores.data)}")
+
+        # 每页 5 条, 与一次性取回的结果一致
+        names = [item.name for item in amaas.paginate("get_self", dict(source="init"), stores.GET_URL_MAP, per_page=5)]
+        assert names == [item.name for item in stores.data]
+
+        name = stores.data[-1].name
+        store = amaas.find_model_store(name)
+        logger.info(store)
+        assert store.name == name
+        assert amaas.find_model_store("not-exists") is None
+
+    def test_tenant_pool(self, amaas: AMaaS):
+        from appauto.tool.bench.multi_tenant import TenantPool
+
+        pool = TenantPool(amaas, 2, weights=[1, 2])
+        with pool as tenants:
+            names = [t.name for t in tenants]
+            logger.info(names)
+            assert {u.data.username for u in amaas.users} >= set(names)
+            assert all(t.api_key.value for t in tenants)
+
+        # 退出后密钥和用户都已删除
+        assert not {u.data.username for u in amaas.users} & set(names)
@@ -0,0 +1,74 @@
+import json
+import tracemalloc
+from appauto.manager.connection_manager.http import HttpClient
+from appauto.manager.component_manager.components.amaas.records import (
+    InstanceRecord,
+    EmbeddingVector,
+    GPURecord,
+    json_default,
+)
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+INSTANCES = json.dumps(
+    {
+        "retcode": 0,
+        "data": {
+            "items": [
+                {
+                    "id": i,
+                    "name": f"ins-{i}",
+                    "state": "running",
+                    "worker_name": "worker-1",
+                    "gpu_indexes": ["worker-1:0", "worker-1:1"],
+                    "computed_resource_claim": {"vram": {"0": 1024, "1": 1024}},
+                }
+                for i in range(1000)
+            ]
+        },
+    }
+)
+
+
+def peak_alloc(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestRecords:
+    def test_addict_compatible(self):
+        res = HttpClient().encode_result(INSTANCES, InstanceRecord)
+        ins = res.data.get("items")[1]
+
+        assert res.retcode == 0
+        assert isinstance(ins, InstanceRecord)
+        assert ins.name == ins["name"] == ins.get("name") == "ins-1"
+        assert ins.gpu_indexes == ["worker-1:0", "worker-1:1"]
+        assert ins.computed_resource_claim.vram["0"] == 1024
+        assert ins.not_exists == ins["not_exists"] == {}
+        assert ins["computed_resource_claim"]["not_exists"] == {}
+        assert json.loads(json.dumps(res, default=json_default)) == json.loads(INSTANCES)
+
+    def test_nested_path(self):
+        text = json.dumps({"data": {"worker-1": {"0": {"index": 0, "name": "gpu0"}}}})
+        res = HttpClient().encode_result(text, GPURecord)
+        gpu = res.data.get("worker-1")["0"]
+        assert isinstance(gpu, GPURecord) and gpu.index == 0
+
+    def test_embedding_vector(self):
+        text = json.dumps({"data": [{"index": i, "embedding": [0.1] * 8} for i in (1, 0)]})
+        res = HttpClient().encode_result(text, EmbeddingVector)
+        assert [v.index for v in sorted(res.data, key=lambda v: v.index)] == [0, 1]
+        assert res.data[0].as_array().tolist() == [0.1] * 8
+
+    def test_alloc(self):
+        client = HttpClient()
+        before = peak_alloc(lambda: [ins.name for ins in client.encode_result(INSTANCES).data["items"]])
+        after = peak_alloc(lambda: [ins.name for ins in client.encode_result(INSTANCES, InstanceRecord).data["items"]])
+        logger.info(f"peak allocations of addict: {before}, record: {after}")
+        assert after < before
@@ -0,0 +1,44 @@
+import addict
+from array import array
+from appauto.manager.connection_manager.adaptive_concurrency import AdaptiveConcurrency
+from appauto.manager.connection_manager.sse import StreamResult
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+
+class TestAdaptiveConcurrency:
+    def test_latency_of(self):
+        assert AdaptiveConcurrency.latency_of(4.0) == 4.0
+        assert AdaptiveConcurrency.latency_of(4.0, addict.Dict(usage=dict(completion_tokens=200))) == 0.02
+        assert AdaptiveConcurrency.latency_of(4.0, addict.Dict(choices=[])) == 4.0
+        assert AdaptiveConcurrency.latency_of(4.0, StreamResult("hi", array("d", [0.3, 0.4]))) == 0.3
+        assert AdaptiveConcurrency.latency_of(4.0, StreamResult("", usage=dict(completion_tokens=8))) == 0.5
+
+    def test_only_overload_decreases_by_default(self):
+        controller = AdaptiveConcurrency(ceiling=16, initial=8)
+        # 输出长度差异很大的请求, 整体耗时相差 50 倍
+        for latency in [0.1, 5.0] * 20:
+            controller._on_success(latency)
+        assert controller.decreases == 0
+
+        controller._on_overload()
+        assert controller.decreases == 1 and controller.limit == 4
+
+    def test_latency_decrease_once_per_spike(self):
+        controller = AdaptiveConcurrency(ceiling=16, initial=8, latency_tolerance=2.0)
+        for _ in range(20):
+            controller._on_success(0.001)
+        # 持续变慢时只降低一次, 之后需要重新积累短期平均
+        controller._on_success(0.05)
+        assert controller.decreases == 1 and controller.limit == 4
+        controller._last_decrease = 0
+        controller._on_success(0.002)
+        assert controller.decreases == 1
+
+    def test_call_uses_result_tokens(self):
+        controller = AdaptiveConcurrency(ceiling=4, latency_tolerance=2.0)
+        answer = addict.Dict(usage=dict(completion_tokens=1000))
+        assert controller.call(lambda: answer) is answer
+        assert controller.short_latency < 0.001
+        assert controller.in_flight == 0
@@ -0,0 +1,145 @@
+import pytest
+import httpx
+from time import sleep
+from concurrent.futures import wait
+from appauto.manager.connection_manager.http import HttpClient
+from appauto.manager.connection_manager.circuit_breaker import CircuitBreaker, Deadline
+from appauto.manager.error_manager.errors import CircuitOpenError, DeadlineExceeded
+from appauto.manager.utils_manager.custom_thread_pool_executor import CustomThreadPoolExecutor
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+URL = "http://127.0.0.1:10001/api/v1/chat/completions"
+
+
+@pytest.fixture
+def breaker_enabled():
+    CircuitBreaker.reset_all()
+    CircuitBreaker.configure(enabled=True, failure_threshold=2, reset_timeout=0.05, max_reset_timeout=1)
+    yield
+    CircuitBreaker.configure(enabled=False, failure_threshold=5, reset_timeout=1.0, max_reset_timeout=60.0)
+    CircuitBreaker.reset_all()
+
+
+def mock_client(handler, breaker_scope=None) -> HttpClient:
+    return HttpClient(transport=httpx.MockTransport(handler), breaker_scope=breaker_scope)
+
+
+class TestCircuitBreaker:
+    def test_state_transitions(self, breaker_enabled):
+        breaker = CircuitBreaker.of(URL, "Qwen3-8B")
+        fail = httpx.Response(503)
+
+        for _ in range(2):
+            assert breaker.before_request() is False
+            breaker.on_response(fail)
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        # 半开时只放行一个探测请求, 失败后重新熔断且 reset_timeout 翻倍
+        sleep(0.06)
+        assert breaker.before_request() is True
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        breaker.on_error(httpx.ConnectError("refused"))
+        breaker.after_request(True)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.reset_timeout == pytest.approx(0.1)
+
+        sleep(0.11)
+        assert breaker.before_request() is True
+        breaker.on_response(httpx.Response(200))
+        breaker.after_request(True)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.reset_timeout == pytest.approx(0.05)
+        assert breaker.before_request() is False
+
+    def test_non_transport_error_is_not_failure(self, breaker_enabled):
+        breaker = CircuitBreaker.of(URL)
+        for _ in range(3):
+            breaker.on_error(httpx.DecodingError("bad body"))
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_scope(self, breaker_enabled):
+        """同一个网关下, 一个模型熔断不影响其他模型和控制面"""
+        dead = mock_client(lambda request: httpx.Response(503), breaker_scope="dead-model")
+        alive = mock_client(lambda request: httpx.Response(200, json={"retcode": 0}), breaker_scope="alive-model")
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                dead.post(URL)
+        with pytest.raises(CircuitOpenError):
+            dead.post(URL)
+
+        assert alive.post(URL).retcode == 0
+        assert mock_client(lambda request: httpx.Response(200, json={"retcode": 0})).get(URL).retcode == 0
+        assert CircuitBreaker.stats()[CircuitBreaker.gen_key(URL, "dead-model")]["state"] == CircuitBreaker.OPEN
+
+        # 没有指定 breaker_scope 时使用 json 请求体中的 model
+        assert CircuitBreaker.of(URL, "dead-model") is dead._breaker(URL, {"model": "other"})
+        assert CircuitBreaker.of(URL, "other") is mock_client(None)._breaker(URL, {"model": "other"})
+
+    def test_probe_released_on_other_exception(self, breaker_enabled):
+        """探测请求抛出非 http 异常时, 不会一直停在半开状态"""
+        status = {"code": 503}
+
+        def handler(request):
+            if status["code"] is None:
+                raise RuntimeError("unexpected")
+            return httpx.Response(status["code"], text="not json")
+
+        client = mock_client(handler, "m")
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                client.get(URL)
+        sleep(0.06)
+
+        status["code"] = None
+        with pytest.raises(RuntimeError):
+            client.get(URL)
+        breaker = CircuitBreaker.of(URL, "m")
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # 下一个请求可以继续探测
+        status["code"] = 200
+        client.get(URL)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestDeadline:
+    def test_clamp(self):
+        assert Deadline.remaining() is None
+        assert Deadline.clamp(30) == 30
+
+        with Deadline.within(10):
+            assert Deadline.clamp(30) <= 10
+            assert Deadline.clamp(1) == 1
+            with Deadline.within(60):
+                assert Deadline.remaining() <= 10
+        assert Deadline.remaining() is None
+
+    def test_propagates_to_thread_pool(self):
+        with Deadline.within(5):
+            with CustomThreadPoolExecutor(max_workers=2) as executor:
+                fus = [executor.submit(Deadline.remaining) for _ in range(4)]
+                wait(fus)
+
+        assert all(0 < fu.result() <= 5 for fu in fus)
+
+    def test_cancel_remaining_tasks(self):
+        """预算用完后, 线程池中还没开始的任务直接失败, 不再执行"""
+        started = []
+
+        def task(i):
+            started.append(i)
+            sleep(0.1)
+
+        with Deadline.within(0.05):
+            with CustomThreadPoolExecutor(max_workers=1) as executor:
+                fus = [executor.submit(task, i) for i in range(5)]
+                wait(fus)
+
+        assert started == [0]
+        assert all(isinstance(fu.exception(), DeadlineExceeded) for fu in fus[1:])
@@ -0,0 +1,71 @@
+from time import perf_counter
+from addict import Dict as ADDict
+from appauto.manager.utils_manager.custom_list import CustomList
+from appauto.manager.config_manager import LoggingConfig
+
+logger = LoggingConfig.get_logger()
+
+
+def make_list(n: int = 2000) -> CustomList:
+    return CustomList(
+        [ADDict(id=i, name=f"Qwen3-{i % 50}B", type=["llm", "vlm", "embedding"][i % 3]) for i in range(n)]
+    )
+
+
+class TestCustomList:
+    def test_filter(self):
+        for items in (make_list(), make_list().reindex()):
+            self.check_filter(items)
+
+    def check_filter(self, items: CustomList):
+        assert [i.id for i in items.filter(name="Qwen3-7B", type="llm")] == [
+            i.id for i in items if i.name == "Qwen3-7B" and i.type == "llm"
+        ]
+        assert len(items.filter(name="Qwen3-1.B")) == len(
+            [i for i in items if i.name[:7] == "Qwen3-1" and len(i.name) == 9]
+        )
+        assert len(items.filter(OR=dict(type="vlm|embedding"))) == len([i for i in items if i.type != "llm"])
+        assert len(items.filter(type="llm", OR=dict(id="3", name="Qwen3-6B"))) == len(
+            [i for i in items if i.type == "llm" and (i.id == 3 or i.name == "Qwen3-6B")]
+        )
+        assert items.filter(index=slice(0, 2), type="vlm") == [items[1], items[4]]
+        assert not items.filter(name="not-exists")
+
+    def test_item_change(self):
+        items = make_list(3)
+        assert len(items.filter(type="llm")) == 1
+
+        items[0].type = "vlm"
+        assert not items.filter(type="llm")
+
+    def test_index_invalidation(self):
+        items = make_list(3).reindex()
+        assert len(items.filter(type="llm")) == 1
+
+        items.append(ADDict(id=3, name="Qwen3-3B", type="llm"))
+        assert len(items.filter(type="llm")) == 2
+
+        items[3].type = "vlm"
+        items.reindex()
+        assert len(items.filter(type="llm")) == 1
+
+    def test_first_get(self):
+        items = make_list()
+        assert items.first(type="embedding") is items[2]
+        assert items.first(name="not-exists") is None
+        assert items.get(OR=dict(id="10|11")).id == 10
+
+        try:
+            items.get(name="not-exists")
+            assert False
+        except ValueError as e:
+            logger.info(e)
+
+    def test_filter_perf(self):
+        for items in (make_list(), make_list().reindex()):
+            start = perf_counter()
+            for i in range(200):
+                items.filter(name=f"Qwen3-{i % 50}B", type="llm")
+            logger.info(
+                f"200 filters over {len(items)} items (indexed: {items.indexed}): {perf_counter() - start:.4f}s"
+            )
@@ -23,6 +23,14 @@ class TestAmaaSModelParams:
     def test_wait_gpu_release(self):
         amaas.wait_gpu_release()
 
+    def test_sweep_with_default(self):
+        sweep = amaas.sweep_with_default(["llm", "embedding", "rerank"], [1, 2, 4], priority=["P0", "P1", "P2"])
+        summary = sweep.summary()
+        logger.info(f"wall: {summary['wall_s']:.0f}s, serial: {summary['serial_s']:.0f}s, counts: {summary['counts']}")
+
+        failed = [t for t in summary["tasks"] if t["status"] in ["failed", "check_failed"]]
+        assert not failed, failed
+
     def test_launch_model_with_perf(self):
         tp = 2
         model_name = "DeepSeek-R1-0528-GPU-weight"
@@ -8,6 +8,7 @@ def pytest_addoption(parser):
     parser.addoption("--AMAAS_PORT", action="store", default=c.get("amaas_port", "10001"), help="test amaas port")
     parser.addoption("--AMAAS_USER", action="store", default="admin", help="test amaas username")
     parser.addoption("--AMAAS_PASSWD", action="store", default="123456", help="test amaas passwd")
+    parser.addoption("--DASHBOARD_INTERVAL", action="store", default="0", help="dashboard sample interval")
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -33,3 +34,23 @@ def amaas_passwd(request):
 @pytest.fixture
 def amaas(ip, amaas_port, amaas_user, amaas_passwd) -> AMaaS:
     return AMaaS(ip, amaas_port, amaas_user, amaas_passwd)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dashboard_sampler(request, ip, amaas_port, amaas_user, amaas_passwd):
+    """指定 --DASHBOARD_INTERVAL 时整个测试过程中后台采样 dashboard, 每个用例为一个阶段"""
+    interval = float(request.config.getoption("--DASHBOARD_INTERVAL"))
+    if not interval:
+        yield None
+        return
+
+    from appauto.tool.bench.dashboard_sampler import DashboardSampler
+
+    with DashboardSampler(AMaaS(ip, amaas_port, amaas_user, amaas_passwd), interval) as sampler:
+        yield sampler
+
+
+@pytest.fixture(autouse=True)
+def dashboard_phase(request, dashboard_sampler):
+    if dashboard_sampler is not None:
+        dashboard_sampler.mark(request.node.nodeid)